@@ -2,7 +2,7 @@ from flask import Flask, render_template, redirect, url_for, session, flash, req
 import traceback
 import os
 from dotenv import load_dotenv
-from modules.database import get_db_connection
+from modules.database import get_db_connection, init_db
 
 # Load environment variables
 load_dotenv()
@@ -24,6 +24,13 @@ app.config['MYSQL_USER'] = app.config['DB_USER']
 app.config['MYSQL_PASSWORD'] = app.config['DB_PASSWORD']
 app.config['MYSQL_DB'] = app.config['DB_NAME']
 
+# Share one pooled connection per request across all blueprints and helpers
+init_db(app)
+
+# Tell in-memory listing indexes and caches about writes to houses
+from modules.listing_events import init_listing_events
+init_listing_events(app)
+
 # Import and register blueprints
 try:
     from modules.auth import auth_bp
@@ -40,6 +47,13 @@ except Exception as e:
     print(f"❌ Error registering blueprints: {e}")
     traceback.print_exc()
 
+# Create any missing tables once per worker, then report pending schema
+# migrations (python migrate.py upgrade applies them)
+from modules.schema import init_schema
+from modules.migrations import check_migrations
+init_schema(app)
+check_migrations(app)
+
 # Remove the conflicting home route from app.py since it's handled by user_routes.py
 # The user_bp already has a route for '/' that properly fetches houses
 
@@ -1,33 +1,32 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
 import mysql.connector
-from config import Config
+from modules.database import get_db_connection
+from modules.schema import existing_tables
 
 
 def check_database():
     try:
-        conn = mysql.connector.connect(
-            host=Config.MYSQL_HOST,
-            user=Config.MYSQL_USER,
-            password=Config.MYSQL_PASSWORD,
-            database=Config.MYSQL_DB
-        )
+        tables = sorted(existing_tables())
+        conn = get_db_connection()
         cursor = conn.cursor()
 
         # Get all tables
-        cursor.execute("SHOW TABLES")
-        tables = cursor.fetchall()
         print("📊 **YOUR CURRENT TABLES:**")
         for table in tables:
-            print(f"✅ {table[0]}")
+            print(f"✅ {table}")
 
         # Count records in each table
         print("\n📈 **RECORD COUNTS:**")
         for table in tables:
-            cursor.execute(f"SELECT COUNT(*) FROM {table[0]}")
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
             count = cursor.fetchone()[0]
-            print(f"📁 {table[0]}: {count} records")
+            print(f"📁 {table}: {count} records")
 
         # Show sample data from houses table (if exists)
-        if any('house' in table[0].lower() for table in tables):
+        if any('house' in table.lower() for table in tables):
             print("\n🏠 **SAMPLE HOUSE DATA:**")
             cursor.execute("SELECT * FROM houses LIMIT 3")
             houses = cursor.fetchall()
@@ -42,4 +41,4 @@ def check_database():
 
 
 if __name__ == "__main__":
-    check_database()
\ No newline at end of file
+    check_database()
@@ -23,6 +23,48 @@ class ProductionConfig:
     DB_PASSWORD = os.environ.get('DB_PASSWORD') or ''
     DB_NAME = os.environ.get('DB_NAME') or 'ghana_rentals'
     DB_PORT = int(os.environ.get('DB_PORT', 3306))
+    DB_BACKEND = os.environ.get('DB_BACKEND', 'mysql')  # 'sqlite' for local benchmarks
+    DB_PATH = os.environ.get('DB_PATH', 'rental_service.db')  # SQLite only
+    
+    # Connection Pool Configuration (per gunicorn worker)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))
+    DB_POOL_VALIDATE = True
+    DB_DEBUG_HEADERS = os.environ.get('DB_DEBUG_HEADERS', '').lower() == 'true'
+    DB_QUERY_STATS = os.environ.get('DB_QUERY_STATS', 'true').lower() == 'true'  # /admin/perf/queries
+    DB_SCHEMA_BOOTSTRAP = os.environ.get('DB_SCHEMA_BOOTSTRAP', 'true').lower() == 'true'
+
+    # Timeouts and circuit breaker (fail fast while the database is down)
+    DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', 5))
+    DB_QUERY_TIMEOUT = float(os.environ.get('DB_QUERY_TIMEOUT', 10))  # seconds, MySQL SELECTs
+    DB_BREAKER_FAILURES = int(os.environ.get('DB_BREAKER_FAILURES', 5))
+    DB_BREAKER_RESET = float(os.environ.get('DB_BREAKER_RESET', 30))
+    DB_MIGRATION_CHECK = os.environ.get('DB_MIGRATION_CHECK', 'true').lower() == 'true'
+    DB_AUTO_MIGRATE = os.environ.get('DB_AUTO_MIGRATE', '').lower() == 'true'
+    
+    # Read Replica Configuration (optional; analytics and dashboard reads)
+    DB_READ_HOST = os.environ.get('DB_READ_HOST')
+    DB_READ_MAX_LAG = float(os.environ.get('DB_READ_MAX_LAG', 10))  # seconds behind primary
+    DB_READ_PIN_SECONDS = float(os.environ.get('DB_READ_PIN_SECONDS', 30))  # read-your-writes window
+    
+    # Web Server Configuration (read by gunicorn.conf.py)
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 2))  # worker processes
+    GUNICORN_WORKER_CLASS = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')  # or 'sync'
+    GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 4))  # per worker; keep <= DB_POOL_SIZE
+    GUNICORN_TIMEOUT = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+    GUNICORN_PRELOAD = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+    DB_POOL_PREWARM = int(os.environ.get('DB_POOL_PREWARM', 2))  # connections opened per worker at boot
+    REFERENCE_DATA_TTL = int(os.environ.get('REFERENCE_DATA_TTL', 300))  # regions/neighborhoods version check
+    SEARCH_INDEX_ENABLED = os.environ.get('SEARCH_INDEX_ENABLED', 'true').lower() == 'true'  # in-memory /houses index
+    LISTING_SYNC_INTERVAL = float(os.environ.get('LISTING_SYNC_INTERVAL', 2))  # seconds between change-feed polls
+    FACET_CACHE_TTL = int(os.environ.get('FACET_CACHE_TTL', 60))  # /houses sidebar counts
+    FACET_CACHE_SIZE = int(os.environ.get('FACET_CACHE_SIZE', 512))
+    HOUSES_CACHE_TTL = int(os.environ.get('HOUSES_CACHE_TTL', 30))  # /houses result pages; 0 turns it off
+    HOUSES_CACHE_SIZE = int(os.environ.get('HOUSES_CACHE_SIZE', 1024))
+    PAGE_CACHE_TTL = int(os.environ.get('PAGE_CACHE_TTL', 60))  # anonymous full pages; 0 turns it off
+    PAGE_CACHE_SIZE = int(os.environ.get('PAGE_CACHE_SIZE', 512))
+    SUGGEST_ENABLED = os.environ.get('SUGGEST_ENABLED', 'true').lower() == 'true'  # /api/suggest trie
+    FUZZY_SEARCH_ENABLED = os.environ.get('FUZZY_SEARCH_ENABLED', 'true').lower() == 'true'  # typo-tolerant /houses search
     
     # File Upload Configuration
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'uploads')
@@ -104,6 +146,42 @@ class DevelopmentConfig:
     DB_PASSWORD = ''
     DB_NAME = 'ghana_rentals'
     DB_PORT = 3306
+    DB_BACKEND = os.environ.get('DB_BACKEND', 'mysql')  # 'sqlite' runs without a MySQL server
+    DB_PATH = os.environ.get('DB_PATH', 'rental_service.db')
+    DB_READ_PATH = os.environ.get('DB_READ_PATH')  # SQLite read-only "replica"
+    
+    # Connection Pool Configuration
+    DB_POOL_SIZE = 5
+    DB_POOL_TIMEOUT = 10
+    DB_POOL_VALIDATE = True
+    DB_DEBUG_HEADERS = True
+    DB_QUERY_STATS = True
+    DB_SCHEMA_BOOTSTRAP = os.environ.get('DB_SCHEMA_BOOTSTRAP', 'true').lower() == 'true'
+    DB_CONNECT_TIMEOUT = 5
+    DB_QUERY_TIMEOUT = 10
+    DB_BREAKER_FAILURES = 5
+    DB_BREAKER_RESET = 30
+    DB_MIGRATION_CHECK = os.environ.get('DB_MIGRATION_CHECK', 'true').lower() == 'true'
+    DB_AUTO_MIGRATE = os.environ.get('DB_AUTO_MIGRATE', '').lower() == 'true'
+    
+    # Web Server Configuration
+    WEB_CONCURRENCY = 1
+    GUNICORN_WORKER_CLASS = 'gthread'
+    GUNICORN_THREADS = 4
+    GUNICORN_TIMEOUT = 120
+    GUNICORN_PRELOAD = False
+    DB_POOL_PREWARM = 1
+    REFERENCE_DATA_TTL = 60
+    SEARCH_INDEX_ENABLED = os.environ.get('SEARCH_INDEX_ENABLED', 'true').lower() == 'true'
+    LISTING_SYNC_INTERVAL = 2
+    FACET_CACHE_TTL = 60
+    FACET_CACHE_SIZE = 512
+    HOUSES_CACHE_TTL = 30
+    HOUSES_CACHE_SIZE = 1024
+    PAGE_CACHE_TTL = 60
+    PAGE_CACHE_SIZE = 512
+    SUGGEST_ENABLED = os.environ.get('SUGGEST_ENABLED', 'true').lower() == 'true'
+    FUZZY_SEARCH_ENABLED = os.environ.get('FUZZY_SEARCH_ENABLED', 'true').lower() == 'true'
     
     # File Upload Configuration
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'uploads')
@@ -0,0 +1,150 @@
+"""
+Shared pytest fixtures
+Unless DB_BACKEND is set, tests run against a throwaway SQLite database built
+from the schema registry, so no MySQL server is needed.
+"""
+
+import os
+import sys
+import tempfile
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+if not os.environ.get('DB_BACKEND'):
+    os.environ['DB_BACKEND'] = 'sqlite'
+    os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(prefix='rental-tests-'), 'rental_service.db')
+os.environ.setdefault('DB_MIGRATION_CHECK', 'false')
+os.environ.setdefault('DB_SCHEMA_BOOTSTRAP', 'false')
+os.environ.setdefault('DB_DEBUG_HEADERS', 'true')
+# Other workers' writes are polled for explicitly in test_search_index.py; keep
+# the throttled poll from landing in random requests' query budgets
+os.environ.setdefault('LISTING_SYNC_INTERVAL', '3600')
+# Most tests measure what a page does against the database; test_page_cache.py
+# turns the anonymous full-page cache back on
+os.environ.setdefault('PAGE_CACHE_TTL', '0')
+
+from werkzeug.security import generate_password_hash
+
+REGIONS = ['Greater Accra', 'Ashanti', 'Western']
+NEIGHBORHOODS = {1: ['East Legon', 'Osu', 'Madina'], 2: ['Adum', 'Bantama'], 3: ['Takoradi', 'Anaji']}
+PROPERTY_TYPES = ['single_room', 'chamber_hall', 'self_contained', 'apartment', 'house']
+USERS = [
+    ('admin', 'admin@example.com', 'Site Admin', 'admin'),
+    ('landlord', 'landlord@example.com', 'Kofi Landlord', 'landlord'),
+    ('tenant', 'tenant@example.com', 'Ama Tenant', 'tenant'),
+]
+HOUSE_COUNT = 60
+# Neighborhood centres; house i sits within ~1 km of its neighborhood's, except
+# every tenth house, which has no coordinates
+CENTRES = {'East Legon': (5.6360, -0.1610), 'Osu': (5.5560, -0.1820), 'Madina': (5.6690, -0.1660),
+           'Adum': (6.6930, -1.6240), 'Bantama': (6.7050, -1.6350),
+           'Takoradi': (4.8980, -1.7600), 'Anaji': (4.9280, -1.7780)}
+
+
+def house_location(i, name):
+    """(latitude, longitude) of seeded house i, or None"""
+    if i % 10 == 9:
+        return None
+    lat, lng = CENTRES[name]
+    return round(lat + ((i * 7) % 11 - 5) * 0.0015, 6), round(lng + ((i * 13) % 11 - 5) * 0.0015, 6)
+
+
+def seed_sample_data(conn):
+    """Small but realistic data set: regions, users, listings, analytics rows"""
+    from modules.geo import encode_geohash
+
+    cursor = conn.cursor()
+    password_hash = generate_password_hash('password')
+    for username, email, full_name, role in USERS:
+        cursor.execute("""
+            INSERT INTO users (username, email, password_hash, full_name, phone, role)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (username, email, password_hash, full_name, '0240000000', role))
+
+    for region in REGIONS:
+        cursor.execute("INSERT INTO regions (name) VALUES (%s)", (region,))
+    neighborhoods = []
+    for region_id, names in NEIGHBORHOODS.items():
+        for name in names:
+            cursor.execute("INSERT INTO neighborhoods (region_id, name) VALUES (%s, %s)", (region_id, name))
+            neighborhoods.append((cursor.lastrowid, region_id, name))
+
+    for i in range(HOUSE_COUNT):
+        neighborhood_id, region_id, name = neighborhoods[i % len(neighborhoods)]
+        property_type = PROPERTY_TYPES[i % len(PROPERTY_TYPES)]
+        location = house_location(i, name)
+        lat, lng = location or (None, None)
+        cursor.execute("""
+            INSERT INTO houses (title, description, region_id, neighborhood_id, exact_location,
+                                latitude, longitude, geohash,
+                                property_type, completion_status, price, image_paths,
+                                contact_name, contact_phone, contact_email, created_by,
+                                is_featured, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+                    DATE_SUB(NOW(), INTERVAL %s HOUR))
+        """, (f"{property_type.replace('_', ' ').title()} in {name} #{i + 1}",
+              f"A well kept {property_type.replace('_', ' ')} close to {name} market and transport. " * 3,
+              region_id, neighborhood_id, f"Near {name} junction",
+              lat, lng, encode_geohash(lat, lng) if location else None, property_type, 'completed',
+              300 + (i * 37) % 4000, '["house_placeholder.jpg"]', 'Kofi Landlord', '0240000000',
+              'landlord@example.com', 2, i % 7 == 0, i))
+
+    for house_id in range(1, 11):
+        cursor.execute("""
+            INSERT INTO property_views (property_id, user_id, ip_address, session_id)
+            VALUES (%s, %s, %s, %s)
+        """, (house_id, 3, '127.0.0.1', 'seed'))
+        cursor.execute("""
+            INSERT INTO property_performance (property_id, date, views_count)
+            VALUES (%s, CURRENT_DATE, %s)
+        """, (house_id, house_id * 3))
+    cursor.execute("""
+        INSERT INTO search_analytics (user_id, search_term, filters_applied, results_count, ip_address)
+        VALUES (%s, %s, %s, %s, %s)
+    """, (3, 'room', '{"property_type": "single_room", "region": "1"}', 12, '127.0.0.1'))
+    cursor.execute("""
+        INSERT INTO reports (user_id, report_type, title, description, priority, status)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, (3, 'maintenance', 'Leaking tap', 'The kitchen tap leaks', 'high', 'pending'))
+    conn.commit()
+    cursor.close()
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import app as flask_app
+    from modules.database import get_backend, get_db_connection
+    from modules.schema import ensure_schema
+    from modules.migrations import migrate
+    from modules.read_model import rebuild_listing_read_model
+
+    flask_app.config['TESTING'] = True
+    with flask_app.app_context():
+        ensure_schema(force=True)
+        migrate(verbose=False)
+        if get_backend() == 'sqlite':
+            conn = get_db_connection()
+            seed_sample_data(conn)
+            conn.close()
+            # Seeded straight into houses, after migration 7 filled the read model
+            rebuild_listing_read_model()
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login_as(client):
+    """Put a seeded user into the test client's session without a login request"""
+    def login(username):
+        user_id = next(i + 1 for i, user in enumerate(USERS) if user[0] == username)
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
+            sess['username'] = username
+            sess['role'] = USERS[user_id - 1][3]
+            sess['logged_in'] = True
+    return login
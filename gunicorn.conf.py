@@ -0,0 +1,63 @@
+"""
+Gunicorn configuration for GhanaRentals
+
+    gunicorn -c gunicorn.conf.py
+
+Worker count, class and threads come from config_production.py (and so from
+the environment). With preload the app is imported once in the master; each
+worker then drops the master's pooled connections, opens its own, loads
+reference data and compiles templates before it accepts traffic.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+if os.environ.get('FLASK_ENV', 'development') == 'production':
+    from config_production import ProductionConfig as ServerConfig
+else:
+    from config_production import DevelopmentConfig as ServerConfig
+
+wsgi_app = 'wsgi:application'
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+workers = ServerConfig.WEB_CONCURRENCY
+worker_class = ServerConfig.GUNICORN_WORKER_CLASS
+threads = ServerConfig.GUNICORN_THREADS
+timeout = ServerConfig.GUNICORN_TIMEOUT
+graceful_timeout = 30
+keepalive = 5
+preload_app = ServerConfig.GUNICORN_PRELOAD
+
+# Recycle workers now and then so slow leaks can't build up; jitter keeps
+# them from restarting together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    """Master: the app is loaded (with preload); release its connections before forking"""
+    from modules.database import close_pools
+    close_pools()
+    server.log.info(f"✅ Ready: {workers} x {worker_class} workers, {threads} threads, preload={preload_app}")
+
+
+def post_fork(server, worker):
+    """Worker: forget the pools copied from the master; their sockets are not ours"""
+    from modules.database import discard_inherited_pools
+    discard_inherited_pools()
+
+
+def post_worker_init(worker):
+    """Worker: warm up before the first request is accepted"""
+    from modules.warmup import warm_worker
+    warm_worker(worker.wsgi)
+
+
+def worker_exit(server, worker):
+    from modules.database import close_pools
+    close_pools()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Schema Migration Runner
+Usage:
+    python migrate.py status           # list applied and pending migrations
+    python migrate.py schema           # create any missing tables
+    python migrate.py upgrade [target] # apply pending migrations
+    python migrate.py reference        # after editing regions/neighborhoods by hand
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# The startup checks would otherwise do the work we are about to run
+os.environ.setdefault('DB_MIGRATION_CHECK', 'false')
+os.environ.setdefault('DB_SCHEMA_BOOTSTRAP', 'false')
+
+from app import app
+from modules.database import get_db_connection
+from modules.migrations import MIGRATIONS, pending_migrations, migrate
+from modules.read_model import refresh_place_names
+from modules.reference_data import bump_reference_data_version
+from modules.schema import ensure_schema
+
+
+def status():
+    pending = {m['version'] for m in pending_migrations()}
+    print("📋 Schema migrations:")
+    for migration in MIGRATIONS:
+        state = '⏳ pending' if migration['version'] in pending else '✅ applied'
+        print(f"   {migration['version']:>3}  {migration['name']:<40} {state}")
+    return True
+
+
+def schema():
+    print("🧱 Creating missing tables...")
+    state = ensure_schema(force=True, verbose=True)
+    if state['errors']:
+        return False
+    if not state['created']:
+        print("✅ All tables exist")
+    return True
+
+
+def upgrade(target=None):
+    if not schema():
+        return False
+    print("🚀 Applying schema migrations...")
+    applied = migrate(target=target)
+    if applied:
+        print(f"✅ Applied {len(applied)} migration(s): {', '.join(str(v) for v in applied)}")
+    else:
+        print("✅ Schema is up to date")
+    return True
+
+
+def reference():
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        bump_reference_data_version(cursor)
+        refresh_place_names(cursor)
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    print("✅ Reference data version bumped and listing place names refreshed; "
+          "workers reload regions and neighborhoods within REFERENCE_DATA_TTL")
+    return True
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+
+    with app.app_context():
+        try:
+            if command == 'status':
+                return status()
+            if command == 'schema':
+                return schema()
+            if command == 'upgrade':
+                target = int(sys.argv[2]) if len(sys.argv) > 2 else None
+                return upgrade(target)
+            if command == 'reference':
+                return reference()
+            print(__doc__)
+            return False
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+            return False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -1,8 +1,13 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
-from modules.database import get_db_connection
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from modules.database import get_db_connection, pin_reads_to_primary
+from modules.streaming import count_rows, stream_page, stream_rows
+from modules.listings import LISTING_CARD_COLUMNS, LISTING_CARD_FROM, fetch_listing_cards
+from modules.reference_data import get_neighborhoods, get_regions
+from modules.listing_events import record_listing_change
+from modules.house_images import attach_images, load_house_images, save_house_images
+from modules.geo import location_columns
 import os
 import uuid
-import json
 from werkzeug.utils import secure_filename
 from functools import wraps
 
@@ -79,7 +84,7 @@ def dashboard():
     """Admin-only dashboard with metrics"""
     from modules.metrics import get_all_metrics
 
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor()
 
     try:
@@ -123,36 +128,78 @@ def dashboard():
 
 
 
+# Sort options for the query performance page
+QUERY_STAT_SORTS = ['total_ms', 'calls', 'p95_ms', 'max_ms', 'rows']
+
+
+def _query_perf_snapshot(sort):
+    """Query stats plus pool/replica/breaker state for this worker"""
+    from modules.query_stats import query_stats
+    from modules.database import get_pool_stats, get_replica_health, get_breaker_stats
+    from modules.degraded import last_good
+    from modules.search_index import get_search_index_stats
+    from modules.cache import get_cache_stats
+    from modules.suggest import get_suggest_stats
+    from modules.fuzzy import get_fuzzy_stats
+
+    return {
+        'pid': os.getpid(),
+        'sort': sort,
+        'queries': query_stats.snapshot(sort=sort),
+        'pools': get_pool_stats(),
+        'replica': get_replica_health(),
+        'breakers': get_breaker_stats(),
+        'degraded': last_good.stats(),
+        'search_index': get_search_index_stats(),
+        'caches': get_cache_stats(),
+        'suggest': get_suggest_stats(),
+        'fuzzy': get_fuzzy_stats(),
+    }
+
+
+@admin_bp.route('/admin/perf/queries')
+@admin_only
+def perf_queries():
+    """Admin-only: per-statement timings recorded by this worker"""
+    sort = request.args.get('sort', 'total_ms')
+    if sort not in QUERY_STAT_SORTS:
+        sort = 'total_ms'
+
+    snapshot = _query_perf_snapshot(sort)
+    if request.args.get('format') == 'json':
+        return jsonify(snapshot)
+
+    return render_template('admin/perf_queries.html',
+                           sorts=QUERY_STAT_SORTS,
+                           **snapshot)
+
+
+@admin_bp.route('/admin/perf/queries/reset', methods=['POST'])
+@admin_only
+def perf_queries_reset():
+    """Admin-only: clear this worker's query stats"""
+    from modules.query_stats import query_stats
+
+    query_stats.reset()
+    flash('Query statistics cleared for this worker.', 'success')
+    return redirect(url_for('admin.perf_queries'))
+
+
 @admin_bp.route('/admin/landlord-dashboard')
 @landlord_only
 def landlord_dashboard():
     """Landlord-only dashboard"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     # Get only the landlord's properties
-    cursor.execute("""
-        SELECT h.*, r.name as region_name, n.name as neighborhood_name
-        FROM houses h
-        LEFT JOIN regions r ON h.region_id = r.id
-        LEFT JOIN neighborhoods n ON h.neighborhood_id = n.id
+    properties = fetch_listing_cards(cursor, f"""
+        SELECT {LISTING_CARD_COLUMNS}
+        {LISTING_CARD_FROM}
         WHERE h.created_by = %s
         ORDER BY h.created_at DESC
     """, (session['user_id'],))
 
-    properties = cursor.fetchall()
-
-    # Parse image_paths for each property
-    for prop in properties:
-        if prop['image_paths']:
-            try:
-                if isinstance(prop['image_paths'], str):
-                    prop['image_paths'] = json.loads(prop['image_paths'].replace("'", '"'))
-            except:
-                prop['image_paths'] = [prop['image_paths']] if prop['image_paths'] else []
-        else:
-            prop['image_paths'] = []
-
     cursor.close()
     conn.close()
 
@@ -207,12 +254,10 @@ def add_house():
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)  # CHANGED: Add dictionary=True
 
-    # Get regions and neighborhoods for dropdowns
-    cursor.execute("SELECT * FROM regions")
-    regions = cursor.fetchall()
-
-    cursor.execute("SELECT * FROM neighborhoods")
-    neighborhoods = cursor.fetchall()
+    # Regions for the dropdown; the form loads the chosen region's
+    # neighborhoods from /api/regions/<id>/neighborhoods
+    regions = get_regions()
+    neighborhoods = []
 
     if request.method == 'POST':
         try:
@@ -222,6 +267,8 @@ def add_house():
             region_id = request.form.get('region_id')
             neighborhood_id = request.form.get('neighborhood_id')
             exact_location = request.form['exact_location']
+            latitude, longitude, geohash = location_columns(request.form.get('latitude'),
+                                                            request.form.get('longitude'))
             property_type = request.form['property_type']
             completion_status = request.form['completion_status']
             months_left = request.form.get('months_left') or None
@@ -236,11 +283,11 @@ def add_house():
             # Insert house into database
             cursor.execute("""
                 INSERT INTO houses 
-                (title, description, region_id, neighborhood_id, exact_location, 
+                (title, description, region_id, neighborhood_id, exact_location, latitude, longitude, geohash,
                  property_type, completion_status, months_left, price, created_by, is_featured,
                  contact_name, contact_phone, contact_email)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (title, description, region_id, neighborhood_id, exact_location,
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (title, description, region_id, neighborhood_id, exact_location, latitude, longitude, geohash,
                   property_type, completion_status, months_left, price, session['user_id'], is_featured,
                   contact_name, contact_phone, contact_email))
 
@@ -252,15 +299,11 @@ def add_house():
                 files = request.files.getlist('images')
                 image_paths = save_uploaded_files(files, house_id)
 
-            # If no images uploaded, use placeholder
-            if not image_paths:
-                image_paths = ['house_placeholder.jpg']
-
-            # Update house with image paths
-            cursor.execute("UPDATE houses SET image_paths = %s WHERE id = %s",
-                          (json.dumps(image_paths), house_id))
+            save_house_images(cursor, house_id, image_paths)
+            record_listing_change(cursor, house_id)
 
             conn.commit()
+            pin_reads_to_primary()
             flash(f'House added successfully with {len(image_paths)} images!', 'success')
             return redirect('/admin/manage-houses')
 
@@ -286,12 +329,10 @@ def landlord_add_property():
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)  # CHANGED: Add dictionary=True
 
-    # Get regions and neighborhoods for dropdowns
-    cursor.execute("SELECT * FROM regions")
-    regions = cursor.fetchall()
-
-    cursor.execute("SELECT * FROM neighborhoods")
-    neighborhoods = cursor.fetchall()
+    # Regions for the dropdown; the form loads the chosen region's
+    # neighborhoods from /api/regions/<id>/neighborhoods
+    regions = get_regions()
+    neighborhoods = []
 
     if request.method == 'POST':
         try:
@@ -301,6 +342,8 @@ def landlord_add_property():
             region_id = request.form.get('region_id')
             neighborhood_id = request.form.get('neighborhood_id')
             exact_location = request.form['exact_location']
+            latitude, longitude, geohash = location_columns(request.form.get('latitude'),
+                                                            request.form.get('longitude'))
             property_type = request.form['property_type']
             completion_status = request.form['completion_status']
             months_left = request.form.get('months_left') or None
@@ -317,11 +360,11 @@ def landlord_add_property():
             # Insert house into database
             cursor.execute("""
                 INSERT INTO houses 
-                (title, description, region_id, neighborhood_id, exact_location, 
+                (title, description, region_id, neighborhood_id, exact_location, latitude, longitude, geohash,
                  property_type, completion_status, months_left, price, created_by, is_featured,
                  contact_name, contact_phone, contact_email)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (title, description, region_id, neighborhood_id, exact_location,
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (title, description, region_id, neighborhood_id, exact_location, latitude, longitude, geohash,
                   property_type, completion_status, months_left, price, session['user_id'], is_featured,
                   contact_name, contact_phone, contact_email))
 
@@ -333,15 +376,11 @@ def landlord_add_property():
                 files = request.files.getlist('images')
                 image_paths = save_uploaded_files(files, house_id)
 
-            # If no images uploaded, use placeholder
-            if not image_paths:
-                image_paths = ['house_placeholder.jpg']
-
-            # Update house with image paths
-            cursor.execute("UPDATE houses SET image_paths = %s WHERE id = %s",
-                          (json.dumps(image_paths), house_id))
+            save_house_images(cursor, house_id, image_paths)
+            record_listing_change(cursor, house_id)
 
             conn.commit()
+            pin_reads_to_primary()
             flash('Property added successfully!', 'success')
             return redirect('/admin/landlord-dashboard')
 
@@ -376,12 +415,10 @@ def landlord_edit_property(property_id):
         flash('Property not found or access denied.', 'error')
         return redirect('/admin/landlord-dashboard')
 
-    # Get regions and neighborhoods for dropdowns
-    cursor.execute("SELECT * FROM regions")
-    regions = cursor.fetchall()
-
-    cursor.execute("SELECT * FROM neighborhoods")
-    neighborhoods = cursor.fetchall()
+    # Regions for the dropdown, and the current region's neighborhoods; the
+    # form loads others from /api/regions/<id>/neighborhoods
+    regions = get_regions()
+    neighborhoods = get_neighborhoods(property_data['region_id']) if property_data['region_id'] else []
 
     if request.method == 'POST':
         try:
@@ -391,6 +428,8 @@ def landlord_edit_property(property_id):
             region_id = request.form.get('region_id')
             neighborhood_id = request.form.get('neighborhood_id')
             exact_location = request.form['exact_location']
+            latitude, longitude, geohash = location_columns(request.form.get('latitude'),
+                                                            request.form.get('longitude'))
             property_type = request.form['property_type']
             completion_status = request.form['completion_status']
             months_left = request.form.get('months_left') or None
@@ -405,13 +444,7 @@ def landlord_edit_property(property_id):
             contact_email = request.form.get('contact_email')
 
             # Get current image paths
-            current_images = []
-            if property_data['image_paths']:
-                try:
-                    if isinstance(property_data['image_paths'], str):
-                        current_images = json.loads(property_data['image_paths'].replace("'", '"'))
-                except:
-                    current_images = [property_data['image_paths']] if property_data['image_paths'] else []
+            current_images = [image['path'] for image in load_house_images(cursor, [property_id])[property_id]]
 
             # Handle image deletions
             delete_images = request.form.getlist('delete_images')
@@ -423,25 +456,25 @@ def landlord_edit_property(property_id):
                 new_images = save_uploaded_files(files, property_id)
                 updated_images.extend(new_images)
 
-            # If no images left, use placeholder
-            if not updated_images:
-                updated_images = ['house_placeholder.jpg']
-
             # Update property in database
             cursor.execute("""
                 UPDATE houses 
                 SET title = %s, description = %s, region_id = %s, neighborhood_id = %s,
-                    exact_location = %s, property_type = %s, completion_status = %s,
+                    exact_location = %s, latitude = %s, longitude = %s, geohash = %s,
+                    property_type = %s, completion_status = %s,
                     months_left = %s, price = %s, is_featured = %s, 
-                    image_paths = %s, updated_at = CURRENT_TIMESTAMP,
+                    updated_at = CURRENT_TIMESTAMP,
                     contact_name = %s, contact_phone = %s, contact_email = %s
                 WHERE id = %s AND created_by = %s
-            """, (title, description, region_id, neighborhood_id, exact_location,
+            """, (title, description, region_id, neighborhood_id, exact_location, latitude, longitude, geohash,
                   property_type, completion_status, months_left, price, is_featured,
-                  json.dumps(updated_images), contact_name, contact_phone, contact_email,
+                  contact_name, contact_phone, contact_email,
                   property_id, session['user_id']))
+            save_house_images(cursor, property_id, updated_images)
+            record_listing_change(cursor, property_id)
 
             conn.commit()
+            pin_reads_to_primary()
             flash('Property updated successfully!', 'success')
             return redirect('/admin/landlord-dashboard')
 
@@ -455,15 +488,7 @@ def landlord_edit_property(property_id):
     else:
         # GET request - load existing property data
         try:
-            # Parse image_paths if it's a string
-            if property_data['image_paths']:
-                try:
-                    if isinstance(property_data['image_paths'], str):
-                        property_data['image_paths'] = json.loads(property_data['image_paths'].replace("'", '"'))
-                except:
-                    property_data['image_paths'] = [property_data['image_paths']] if property_data['image_paths'] else []
-            else:
-                property_data['image_paths'] = []
+            attach_images(cursor, [property_data])
 
         except Exception as e:
             flash(f'Error loading property: {str(e)}', 'error')
@@ -502,7 +527,9 @@ def landlord_delete_property(property_id):
 
         cursor.execute("DELETE FROM houses WHERE id = %s AND created_by = %s",
                        (property_id, session['user_id']))
+        record_listing_change(cursor, property_id, 'delete')
         conn.commit()
+        pin_reads_to_primary()
         flash('Property deleted successfully!', 'success')
     except Exception as e:
         conn.rollback()
@@ -516,38 +543,20 @@ def landlord_delete_property(property_id):
 @admin_bp.route('/admin/manage-houses')
 @admin_only
 def manage_houses():
-    """Admin-only: Manage all houses"""
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-
+    """Admin-only: Manage all houses (streamed, so memory stays flat)"""
     try:
-        # Get all houses
-        cursor.execute("""
-            SELECT h.* 
+        house_count = count_rows("SELECT COUNT(*) FROM houses")
+        houses = stream_rows("""
+            SELECT h.*, ci.path AS cover_image
             FROM houses h
+            LEFT JOIN house_images ci ON ci.house_id = h.id AND ci.position = 0
             ORDER BY h.created_at DESC
         """)
-        houses = cursor.fetchall()
-
-        # Parse image_paths for each house
-        for house in houses:
-            if house['image_paths']:
-                try:
-                    if isinstance(house['image_paths'], str):
-                        house['image_paths'] = json.loads(house['image_paths'].replace("'", '"'))
-                except:
-                    house['image_paths'] = [house['image_paths']] if house['image_paths'] else []
-            else:
-                house['image_paths'] = []
-
     except Exception as e:
         flash(f'Error loading houses: {str(e)}', 'error')
-        houses = []
-    finally:
-        cursor.close()
-        conn.close()
+        house_count, houses = 0, iter(())
 
-    return render_template('admin/manage_houses.html', houses=houses)
+    return stream_page('admin/manage_houses.html', houses=houses, house_count=house_count)
 
 @admin_bp.route('/admin/edit-house/<int:house_id>', methods=['GET', 'POST'])
 @admin_only
@@ -556,12 +565,9 @@ def edit_house(house_id):
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
 
-    # Get regions and neighborhoods for dropdowns
-    cursor.execute("SELECT * FROM regions")
-    regions = cursor.fetchall()
-
-    cursor.execute("SELECT * FROM neighborhoods")
-    neighborhoods = cursor.fetchall()
+    # Regions for the dropdown; the house's own neighborhoods are added once
+    # it is loaded, the form fetches others from /api/regions/<id>/neighborhoods
+    regions = get_regions()
 
     if request.method == 'POST':
         try:
@@ -571,6 +577,8 @@ def edit_house(house_id):
             region_id = request.form.get('region_id')
             neighborhood_id = request.form.get('neighborhood_id')
             exact_location = request.form['exact_location']
+            latitude, longitude, geohash = location_columns(request.form.get('latitude'),
+                                                            request.form.get('longitude'))
             property_type = request.form['property_type']
             completion_status = request.form['completion_status']
             months_left = request.form.get('months_left') or None
@@ -584,16 +592,7 @@ def edit_house(house_id):
             contact_email = request.form.get('contact_email')
 
             # Get current image paths
-            cursor.execute("SELECT image_paths FROM houses WHERE id = %s", (house_id,))
-            current_data = cursor.fetchone()
-            current_images = []
-
-            if current_data and current_data['image_paths']:
-                try:
-                    if isinstance(current_data['image_paths'], str):
-                        current_images = json.loads(current_data['image_paths'].replace("'", '"'))
-                except:
-                    current_images = [current_data['image_paths']] if current_data['image_paths'] else []
+            current_images = [image['path'] for image in load_house_images(cursor, [house_id])[house_id]]
 
             # Remove deleted images
             updated_images = [img for img in current_images if img not in delete_images]
@@ -604,24 +603,24 @@ def edit_house(house_id):
                 new_images = save_uploaded_files(files, house_id)
                 updated_images.extend(new_images)
 
-            # If no images left, use placeholder
-            if not updated_images:
-                updated_images = ['house_placeholder.jpg']
-
             # Update house in database
             cursor.execute("""
                 UPDATE houses 
                 SET title = %s, description = %s, region_id = %s, neighborhood_id = %s,
-                    exact_location = %s, property_type = %s, completion_status = %s,
+                    exact_location = %s, latitude = %s, longitude = %s, geohash = %s,
+                    property_type = %s, completion_status = %s,
                     months_left = %s, price = %s, is_featured = %s, 
-                    image_paths = %s, updated_at = CURRENT_TIMESTAMP,
+                    updated_at = CURRENT_TIMESTAMP,
                     contact_name = %s, contact_phone = %s, contact_email = %s
                 WHERE id = %s
-            """, (title, description, region_id, neighborhood_id, exact_location,
+            """, (title, description, region_id, neighborhood_id, exact_location, latitude, longitude, geohash,
                   property_type, completion_status, months_left, price, is_featured,
-                  json.dumps(updated_images), contact_name, contact_phone, contact_email, house_id))
+                  contact_name, contact_phone, contact_email, house_id))
+            save_house_images(cursor, house_id, updated_images)
+            record_listing_change(cursor, house_id)
 
             conn.commit()
+            pin_reads_to_primary()
             flash('House updated successfully!', 'success')
             return redirect('/admin/manage-houses')
 
@@ -642,15 +641,7 @@ def edit_house(house_id):
                 flash('House not found!', 'error')
                 return redirect('/admin/manage-houses')
 
-            # Parse image_paths if it's a string
-            if house['image_paths']:
-                try:
-                    if isinstance(house['image_paths'], str):
-                        house['image_paths'] = json.loads(house['image_paths'].replace("'", '"'))
-                except:
-                    house['image_paths'] = [house['image_paths']] if house['image_paths'] else []
-            else:
-                house['image_paths'] = []
+            attach_images(cursor, [house])
 
         except Exception as e:
             flash(f'Error loading house: {str(e)}', 'error')
@@ -662,7 +653,7 @@ def edit_house(house_id):
     return render_template('admin/edit_house.html',
                            house=house,
                            regions=regions,
-                           neighborhoods=neighborhoods)
+                           neighborhoods=get_neighborhoods(house['region_id']) if house['region_id'] else [])
 
 @admin_bp.route('/admin/delete-house/<int:house_id>', methods=['POST'])
 @admin_only
@@ -679,7 +670,9 @@ def delete_house(house_id):
             shutil.rmtree(house_folder)
 
         cursor.execute("DELETE FROM houses WHERE id = %s", (house_id,))
+        record_listing_change(cursor, house_id, 'delete')
         conn.commit()
+        pin_reads_to_primary()
         flash('House deleted successfully!', 'success')
     except Exception as e:
         conn.rollback()
@@ -693,23 +686,16 @@ def delete_house(house_id):
 @admin_bp.route('/admin/manage-users')
 @admin_only
 def manage_users():
-    """Admin-only: Manage users"""
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-
+    """Admin-only: Manage users (streamed, so memory stays flat)"""
     try:
-        # Get all users
-        cursor.execute("SELECT * FROM users ORDER BY created_at DESC")
-        users = cursor.fetchall()
+        user_count = count_rows("SELECT COUNT(*) FROM users")
+        users = stream_rows("SELECT * FROM users ORDER BY created_at DESC")
 
-        return render_template('admin/manage_users.html', users=users)
+        return stream_page('admin/manage_users.html', users=users, user_count=user_count)
 
     except Exception as e:
         flash(f'Error loading users: {str(e)}', 'error')
         return redirect('/admin/dashboard')
-    finally:
-        cursor.close()
-        conn.close()
 
 @admin_bp.route('/admin/edit-user/<int:user_id>', methods=['GET', 'POST'])
 @admin_only
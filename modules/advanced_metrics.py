@@ -4,7 +4,7 @@ import json
 
 def get_revenue_analytics():
     """Get comprehensive revenue analytics"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
     
     metrics = {}
@@ -92,7 +92,7 @@ def get_revenue_analytics():
 
 def get_user_engagement_metrics():
     """Get comprehensive user engagement metrics"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
     
     metrics = {}
@@ -177,7 +177,7 @@ def get_user_engagement_metrics():
 
 def get_property_performance_metrics():
     """Get comprehensive property performance metrics"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
     
     metrics = {}
@@ -291,7 +291,7 @@ def get_property_performance_metrics():
 
 def get_geographic_analytics():
     """Get comprehensive geographic analytics"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
     
     metrics = {}
@@ -372,7 +372,7 @@ def get_geographic_analytics():
 
 def get_search_analytics():
     """Get comprehensive search analytics"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
     
     metrics = {}
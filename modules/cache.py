@@ -0,0 +1,121 @@
+"""
+Cache Module
+Small per-worker caches for results that are expensive to compute but cheap
+to recompute when stale (facet counts, list pages). Entries expire after a
+TTL and the least recently used ones are evicted past max_entries. Callers
+invalidate them on writes through modules/listing_events.py.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU with per-entry expiry and hit/miss counters"""
+
+    def __init__(self, name, max_entries=256, ttl=60):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()       # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.generation = 0                 # bumped by invalidate(); see put()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, ttl=None, generation=None):
+        """Store value; with generation (read before computing it), skip the
+        store if an invalidation happened meanwhile, as value may be stale"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, else compute(), stored and returned"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            generation = self.generation
+            value = compute()
+            self.put(key, value, generation=generation)
+        return value
+
+    def invalidate(self, predicate=None):
+        """Drop every entry, or those where predicate(key, value) is true; returns the count"""
+        with self._lock:
+            self.generation += 1
+            if predicate is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+            else:
+                keys = [key for key, (value, _) in self._entries.items() if predicate(key, value)]
+                for key in keys:
+                    del self._entries[key]
+                dropped = len(keys)
+            self.invalidations += dropped
+        return dropped
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name, max_entries=None, ttl=None):
+    """The worker's cache called name, created on first use; given limits are (re)applied"""
+    cache = _caches.get(name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                cache = _caches[name] = TTLCache(name)
+    if max_entries is not None:
+        cache.max_entries = max_entries
+    if ttl is not None:
+        cache.ttl = ttl
+    return cache
+
+
+def get_cache_stats():
+    return {name: cache.stats() for name, cache in sorted(_caches.items())}
@@ -1,35 +1,816 @@
 import mysql.connector
 import os
-from flask import current_app
+import queue
+import threading
+import time
+from flask import current_app, g, has_app_context, has_request_context, request, session
 from dotenv import load_dotenv
+from modules.query_stats import query_stats
+from modules import sqlite_backend
 
 # Load environment variables
 load_dotenv()
 
-def get_db_connection():
-    """Get database connection with environment-based configuration"""
+
+class PoolExhaustedError(mysql.connector.errors.PoolError):
+    """Raised when no pooled connection frees up within the checkout timeout"""
+
+
+class DatabaseUnavailableError(mysql.connector.errors.OperationalError):
+    """Raised without touching the network while the circuit breaker is open"""
+
+
+def _get_setting(env_key, config_key, default):
+    """Read a setting from the environment first, then the app config"""
+    value = os.environ.get(env_key)
+    if value not in (None, ''):
+        return value
+    if has_app_context():
+        return current_app.config.get(config_key, default)
+    return default
+
+
+def get_backend():
+    """'mysql' (default) or 'sqlite' (DB_BACKEND), e.g. for tests and local benchmarks"""
+    return str(_get_setting('DB_BACKEND', 'DB_BACKEND', 'mysql')).lower()
+
+
+def _connection_settings(name='primary'):
+    """Connection arguments for the primary database or its read replica"""
+    if get_backend() == 'sqlite':
+        path = _get_setting('DB_PATH', 'DB_PATH', 'rental_service.db')
+        if name == 'replica':
+            # A read-only handle on a copy (or the same file) stands in for the replica
+            return {'backend': 'sqlite', 'path': _get_setting('DB_READ_PATH', 'DB_READ_PATH', path),
+                    'read_only': True}
+        return {'backend': 'sqlite', 'path': path, 'read_only': False}
+
+    settings = {
+        'host': _get_setting('DB_HOST', 'MYSQL_HOST', 'localhost'),
+        'user': _get_setting('DB_USER', 'MYSQL_USER', 'root'),
+        'password': _get_setting('DB_PASSWORD', 'MYSQL_PASSWORD', ''),
+        'database': _get_setting('DB_NAME', 'MYSQL_DB', 'rental_service'),
+        'port': int(_get_setting('DB_PORT', 'MYSQL_PORT', 3306)),
+        'read_only': False,
+    }
+    if name == 'replica':
+        # Any DB_READ_* value that is not set falls back to the primary's
+        settings = {
+            'host': _get_setting('DB_READ_HOST', 'DB_READ_HOST', settings['host']),
+            'user': _get_setting('DB_READ_USER', 'DB_READ_USER', settings['user']),
+            'password': _get_setting('DB_READ_PASSWORD', 'DB_READ_PASSWORD', settings['password']),
+            'database': _get_setting('DB_READ_NAME', 'DB_READ_NAME', settings['database']),
+            'port': int(_get_setting('DB_READ_PORT', 'DB_READ_PORT', settings['port'])),
+            'read_only': True,
+        }
+    return settings
+
+
+def _replica_settings():
+    """Routing thresholds for read-only connections"""
+    return {
+        'max_lag': float(_get_setting('DB_READ_MAX_LAG', 'DB_READ_MAX_LAG', 10)),
+        'lag_check_interval': float(_get_setting('DB_READ_LAG_CHECK_INTERVAL', 'DB_READ_LAG_CHECK_INTERVAL', 5)),
+        'retry_after': float(_get_setting('DB_READ_RETRY_AFTER', 'DB_READ_RETRY_AFTER', 30)),
+        'pin_seconds': float(_get_setting('DB_READ_PIN_SECONDS', 'DB_READ_PIN_SECONDS', 30)),
+    }
+
+
+def replica_configured():
+    """True when a separate read DSN has been configured"""
+    if get_backend() == 'sqlite':
+        return bool(_get_setting('DB_READ_PATH', 'DB_READ_PATH', None))
+    return bool(_get_setting('DB_READ_HOST', 'DB_READ_HOST', None))
+
+
+def _timeout_settings():
+    """Connect/statement timeouts (seconds) and circuit breaker thresholds"""
+    return {
+        'connect_timeout': float(_get_setting('DB_CONNECT_TIMEOUT', 'DB_CONNECT_TIMEOUT', 5)),
+        'query_timeout': float(_get_setting('DB_QUERY_TIMEOUT', 'DB_QUERY_TIMEOUT', 10)),
+        'failure_threshold': int(_get_setting('DB_BREAKER_FAILURES', 'DB_BREAKER_FAILURES', 5)),
+        'reset_after': float(_get_setting('DB_BREAKER_RESET', 'DB_BREAKER_RESET', 30)),
+    }
+
+
+def _pool_settings():
+    """Pool sizing and checkout behaviour for the current worker"""
+    return {
+        'size': int(_get_setting('DB_POOL_SIZE', 'DB_POOL_SIZE', 5)),
+        'timeout': float(_get_setting('DB_POOL_TIMEOUT', 'DB_POOL_TIMEOUT', 10)),
+        'validate': str(_get_setting('DB_POOL_VALIDATE', 'DB_POOL_VALIDATE', True)).lower() not in ('0', 'false', 'no'),
+    }
+
+
+def _open_connection(settings):
+    """Open a new physical database connection"""
+    timeouts = _timeout_settings()
+    if settings.get('backend') == 'sqlite':
+        return sqlite_backend.connect(settings['path'], read_only=settings['read_only'],
+                                      timeout=timeouts['connect_timeout'])
+
+    conn = mysql.connector.connect(
+        host=settings['host'],
+        user=settings['user'],
+        password=settings['password'],
+        database=settings['database'],
+        port=settings['port'],
+        autocommit=True,
+        charset='utf8mb4',
+        use_unicode=True,
+        connection_timeout=max(1, int(timeouts['connect_timeout']))
+    )
+    cursor = conn.cursor()
+    if timeouts['query_timeout'] > 0:
+        # Server-side cap for SELECTs; a hung query fails instead of pinning a worker
+        cursor.execute(f"SET SESSION MAX_EXECUTION_TIME = {int(timeouts['query_timeout'] * 1000)}")
+    if settings.get('read_only'):
+        cursor.execute("SET SESSION TRANSACTION READ ONLY")
+    cursor.close()
+    return conn
+
+
+def _is_alive(conn):
+    """Ping a connection without reconnecting.
+
+    A silent reconnect would only replay connect()'s arguments and lose the
+    session settings _open_connection() applies (MAX_EXECUTION_TIME, READ
+    ONLY on replicas); the pool discards dead connections and opens new ones
+    through _open_connection() instead.
+    """
+    try:
+        conn.ping(reconnect=False, attempts=1, delay=0)
+        return True
+    except Exception:
+        return False
+
+
+def _reset_connection(conn):
+    """Drop leftover results and open transactions before reusing a connection"""
+    if getattr(conn, 'unread_result', False):
+        conn.consume_results()
+    if getattr(conn, 'in_transaction', False):
+        conn.rollback()
+
+
+def _current_route():
+    return request.endpoint if has_request_context() else None
+
+
+# Client/server errors that mean the database is unreachable or overloaded,
+# as opposed to a bad statement: can't connect, gone away, lost connection,
+# too many connections, MAX_EXECUTION_TIME exceeded
+_OUTAGE_ERRNOS = {1040, 2002, 2003, 2005, 2006, 2013, 2055, 3024}
+
+
+def is_outage_error(error):
+    """True for errors that should count against the circuit breaker"""
+    if isinstance(error, (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError)):
+        return True
+    return getattr(error, 'errno', None) in _OUTAGE_ERRNOS
+
+
+class CircuitBreaker:
+    """Stops sending work to a database that keeps failing.
+
+    closed: normal. After failure_threshold consecutive outage errors the
+    breaker opens and callers fail fast with DatabaseUnavailableError. After
+    reset_after seconds it goes half-open and lets one request through as a
+    trial: success closes it, failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, name='primary', failure_threshold=5, reset_after=30.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_started = None
+        self._consecutive_failures = 0
+        self._failures = 0
+        self._rejected = 0
+        self._times_opened = 0
+        self._last_error = None
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_after:
+            self._state = self.HALF_OPEN
+            self._trial_started = None
+        return self._state
+
+    def allow(self):
+        """May a new request use the database? Counts a rejection if not"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN:
+                # One trial at a time; a trial that never reports back expires
+                now = self._clock()
+                if self._trial_started is None or now - self._trial_started >= self.reset_after:
+                    self._trial_started = now
+                    return True
+            self._rejected += 1
+            return False
+
+    def is_open(self):
+        with self._lock:
+            return self._current_state() == self.OPEN
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                print(f"✅ Database circuit '{self.name}' closed")
+            self._state = self.CLOSED
+            self._trial_started = None
+            self._consecutive_failures = 0
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self._failures += 1
+            self._consecutive_failures += 1
+            self._last_error = str(error) if error else None
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._trip()
+
+    def open(self):
+        """Open the circuit by hand, e.g. during database maintenance"""
+        with self._lock:
+            self._trip()
+
+    def _trip(self):
+        if self._state != self.OPEN:
+            self._times_opened += 1
+            print(f"⚠️  Database circuit '{self.name}' open for {self.reset_after}s: {self._last_error}")
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._trial_started = None
+
+    def stats(self):
+        with self._lock:
+            state = self._current_state()
+            return {
+                'name': self.name,
+                'state': state,
+                'consecutive_failures': self._consecutive_failures,
+                'failures': self._failures,
+                'rejected': self._rejected,
+                'times_opened': self._times_opened,
+                'retry_in': round(max(0.0, self.reset_after - (self._clock() - self._opened_at)), 1)
+                if state == self.OPEN else 0,
+                'last_error': self._last_error,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name='primary'):
+    """This worker's circuit breaker for a database"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                settings = _timeout_settings()
+                breaker = CircuitBreaker(name, settings['failure_threshold'], settings['reset_after'])
+                _breakers[name] = breaker
+    return breaker
+
+
+def get_breaker_stats():
+    return {name: breaker.stats() for name, breaker in list(_breakers.items())}
+
+
+class InstrumentedCursor:
+    """Cursor wrapper that reports to the circuit breaker and records every
+    statement in modules.query_stats (unless DB_QUERY_STATS is off)"""
+
+    def __init__(self, cursor, breaker, record_stats=True):
+        self._cursor = cursor
+        self._breaker = breaker
+        self._record_stats = record_stats
+        self._key = None
+        self._count_fetches = False
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _timed(self, method, operation, *args, **kwargs):
+        if self._breaker.is_open():
+            raise DatabaseUnavailableError(msg=f"Database circuit '{self._breaker.name}' is open")
+        started = time.perf_counter()
+        try:
+            result = method(operation, *args, **kwargs)
+        except Exception as e:
+            if is_outage_error(e):
+                self._breaker.record_failure(e)
+            if self._record_stats:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                query_stats.record(operation, elapsed_ms, route=_current_route(), error=True)
+            raise
+        self._breaker.record_success()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if has_app_context():
+            g._db_queries = g.get('_db_queries', 0) + 1
+        if not self._record_stats:
+            return result
+        rows = self._cursor.rowcount
+        # Unbuffered SELECTs only know their row count once the rows are fetched
+        self._count_fetches = rows is None or rows < 0
+        self._key = query_stats.record(operation, elapsed_ms, 0 if self._count_fetches else rows,
+                                       route=_current_route())
+        return result
+
+    def execute(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.executemany, operation, *args, **kwargs)
+
+    def _fetched(self, count):
+        if self._record_stats and self._count_fetches and count:
+            query_stats.add_rows(self._key, count)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        self._fetched(0 if row is None else 1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._fetched(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._fetched(len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._fetched(1)
+            yield row
+
+
+def _instrument(cursor, breaker):
+    record_stats = str(_get_setting('DB_QUERY_STATS', 'DB_QUERY_STATS', True)).lower() not in ('0', 'false', 'no')
+    return InstrumentedCursor(cursor, breaker, record_stats)
+
+
+class PooledConnection:
+    """Connection handed out by the pool; close() returns it instead of disconnecting"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise mysql.connector.errors.OperationalError('Connection has been returned to the pool')
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return _instrument(self.__getattr__('cursor')(*args, **kwargs), get_breaker(self._pool.name))
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """Fixed-size, thread-safe pool of database connections for one worker process"""
+
+    def __init__(self, connect, size=5, timeout=10.0, validate=True, name='primary'):
+        self.name = name
+        self.size = size
+        self.timeout = timeout
+        self.validate = validate
+        self._connect = connect
+        # LIFO so the most recently used (warmest) connection is handed out first
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._created = 0
+        self._discarded = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+
+    def acquire(self):
+        """Borrow a connection, waiting up to the checkout timeout when the pool is full"""
+        started = time.perf_counter()
+        waited = False
+        if not self._slots.acquire(blocking=False):
+            waited = True
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self._waits += 1
+                    self._timeouts += 1
+                    self._wait_time += time.perf_counter() - started
+                raise PoolExhaustedError(
+                    f"No free connection in pool '{self.name}' after {self.timeout}s "
+                    f"({self.size} in use)"
+                )
+
+        try:
+            conn = self._take_idle()
+            if conn is None:
+                conn = self._connect()
+                with self._lock:
+                    self._created += 1
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+                self._wait_time += time.perf_counter() - started
+        return PooledConnection(self, conn)
+
+    def _take_idle(self):
+        """Pop idle connections until a live one is found"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            if not self.validate or _is_alive(conn):
+                return conn
+            self._discard(conn)
+
+    def _discard(self, conn):
+        with self._lock:
+            self._discarded += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def release(self, conn):
+        """Return a borrowed connection to the pool"""
+        try:
+            _reset_connection(conn)
+            self._idle.put(conn)
+        except Exception:
+            self._discard(conn)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def prewarm(self, count):
+        """Open up to count connections ahead of the first request; returns how many"""
+        opened = 0
+        while self._idle.qsize() + self._in_use < min(count, self.size):
+            conn = self._connect()
+            with self._lock:
+                self._created += 1
+            self._idle.put(conn)
+            opened += 1
+        return opened
+
+    def close_all(self):
+        """Disconnect every idle connection"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'name': self.name,
+                'size': self.size,
+                'in_use': self._in_use,
+                'idle': self._idle.qsize(),
+                'created': self._created,
+                'discarded': self._discarded,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'wait_time_ms': round(self._wait_time * 1000, 2),
+                'timeouts': self._timeouts,
+            }
+
+
+# Pools are keyed by process id so forked gunicorn workers never share sockets
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name='primary'):
+    """Get (or lazily create) this worker's connection pool"""
+    key = (os.getpid(), name)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                settings = _connection_settings(name)
+                pool = ConnectionPool(lambda: _open_connection(settings), name=name, **_pool_settings())
+                _pools[key] = pool
+    return pool
+
+
+def close_pools():
+    """Disconnect and forget this worker's pools (after a fork or a settings change)"""
+    pid = os.getpid()
+    with _pools_lock:
+        for key in [key for key in _pools if key[0] == pid]:
+            _pools.pop(key).close_all()
+
+
+def discard_inherited_pools():
+    """Forget pools copied from the parent process by fork.
+
+    Their sockets belong to the parent, so they are dropped without being
+    closed; closing them here would disconnect the parent's sessions.
+    """
+    pid = os.getpid()
+    with _pools_lock:
+        for key in [key for key in _pools if key[0] != pid]:
+            del _pools[key]
+
+
+def prewarm_pools(count=None):
+    """Open connections for this worker's primary (and replica) pool before traffic arrives"""
+    count = count if count is not None else int(_get_setting('DB_POOL_PREWARM', 'DB_POOL_PREWARM', 2))
+    names = ['primary'] + (['replica'] if replica_configured() else [])
+    opened = {}
+    for name in names:
+        breaker = get_breaker(name)
+        try:
+            opened[name] = get_pool(name).prewarm(count)
+            breaker.record_success()
+        except mysql.connector.Error as e:
+            if is_outage_error(e):
+                breaker.record_failure(e)
+            print(f"⚠️  Could not prewarm the {name} pool: {e}")
+            opened[name] = 0
+    return opened
+
+
+def get_pool_stats():
+    """Stats for every pool owned by this worker"""
+    pid = os.getpid()
+    return {name: pool.stats() for (owner, name), pool in list(_pools.items()) if owner == pid}
+
+
+class ReplicaHealth:
+    """Per-worker view of whether the read replica is reachable and caught up"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.down_until = 0.0
+        self.lag = None
+        self.lag_checked_at = 0.0
+        self.fallbacks = 0
+
+    def is_down(self):
+        return time.monotonic() < self.down_until
+
+    def mark_down(self, retry_after):
+        with self._lock:
+            self.down_until = time.monotonic() + retry_after
+            self.fallbacks += 1
+
+    def record_fallback(self):
+        with self._lock:
+            self.fallbacks += 1
+
+    def lag_within(self, conn, max_lag, check_interval):
+        """Check replication lag at most once per interval and compare to max_lag"""
+        now = time.monotonic()
+        if now - self.lag_checked_at >= check_interval:
+            lag = _measure_replica_lag(conn)
+            with self._lock:
+                self.lag = lag
+                self.lag_checked_at = now
+        return self.lag is not None and self.lag <= max_lag
+
+    def stats(self):
+        return {
+            'down': self.is_down(),
+            'lag_seconds': self.lag,
+            'fallbacks': self.fallbacks,
+        }
+
+
+def _measure_replica_lag(conn):
+    """Seconds the replica is behind its source; None when replication is broken"""
+    if get_backend() == 'sqlite':
+        return 0.0
+    cursor = conn.cursor(dictionary=True, buffered=True)
     try:
-        # Use environment variables if available, otherwise fall back to app config
-        host = os.environ.get('DB_HOST') or current_app.config.get('MYSQL_HOST', 'localhost')
-        user = os.environ.get('DB_USER') or current_app.config.get('MYSQL_USER', 'root')
-        password = os.environ.get('DB_PASSWORD') or current_app.config.get('MYSQL_PASSWORD', '')
-        database = os.environ.get('DB_NAME') or current_app.config.get('MYSQL_DB', 'rental_service')
-        port = int(os.environ.get('DB_PORT', current_app.config.get('MYSQL_PORT', 3306)))
-        
-        conn = mysql.connector.connect(
-            host=host,
-            user=user,
-            password=password,
-            database=database,
-            port=port,
-            autocommit=True,
-            charset='utf8mb4',
-            use_unicode=True
-        )
-        return conn
+        for statement in ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"):
+            try:
+                cursor.execute(statement)
+            except mysql.connector.Error:
+                continue
+            row = cursor.fetchone()
+            if not row:
+                # Not configured as a replica (e.g. a standalone read copy)
+                return 0.0
+            lag = row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master'))
+            return float(lag) if lag is not None else None
+        print("Replica lag check failed: no permission for SHOW REPLICA STATUS")
+        return 0.0
+    finally:
+        cursor.close()
+
+
+_replica_health = ReplicaHealth()
+
+
+def get_replica_health():
+    return _replica_health.stats()
+
+
+def pin_reads_to_primary():
+    """Send this session's reads to the primary for a while after it writes.
+
+    Call right after a successful write so the redirect that follows (e.g.
+    back to the landlord dashboard) does not read a replica that has not
+    caught up yet.
+    """
+    if not has_request_context() or not replica_configured():
+        return
+    g._db_pinned = True
+    session['_db_pin_until'] = time.time() + _replica_settings()['pin_seconds']
+
+
+def _reads_pinned():
+    if not has_request_context():
+        return False
+    return g.get('_db_pinned', False) or session.get('_db_pin_until', 0) > time.time()
+
+
+def _open_replica_connection():
+    """Borrow a replica connection, or None if the primary should serve the read"""
+    settings = _replica_settings()
+    if _replica_health.is_down() or not get_breaker('replica').allow():
+        _replica_health.record_fallback()
+        return None
+    try:
+        conn = get_pool('replica').acquire()
+    except mysql.connector.Error as e:
+        print(f"Read replica unavailable, using primary: {e}")
+        _replica_health.mark_down(settings['retry_after'])
+        return None
+    try:
+        healthy = _replica_health.lag_within(conn, settings['max_lag'], settings['lag_check_interval'])
+    except mysql.connector.Error as e:
+        print(f"Read replica lag check failed, using primary: {e}")
+        healthy = False
+    if not healthy:
+        conn.close()
+        _replica_health.record_fallback()
+        return None
+    return conn
+
+
+class RequestConnection:
+    """Handle onto the connection shared by everything in the current request.
+
+    close() is a no-op; the underlying connection goes back to the pool in
+    teardown_appcontext. Cursors are buffered by default so a helper can run
+    its own query while the caller still holds an open cursor.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        kwargs.setdefault('buffered', True)
+        return self._conn.cursor(*args, **kwargs)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+def _borrow_connection():
+    breaker = get_breaker()
+    if not breaker.allow():
+        raise DatabaseUnavailableError(msg="Database circuit 'primary' is open; failing fast")
+    try:
+        return get_pool().acquire()
     except mysql.connector.Error as e:
+        if is_outage_error(e):
+            breaker.record_failure(e)
         print(f"Database connection error: {e}")
         raise e
     except Exception as e:
         print(f"Unexpected database error: {e}")
-        raise e
\ No newline at end of file
+        raise e
+
+
+def _request_connection():
+    """Lazily borrow the connection shared by the current app context"""
+    g._db_handles = g.get('_db_handles', 0) + 1
+    conn = g.get('_db_conn')
+    if conn is None:
+        conn = _borrow_connection()
+        g._db_conn = conn
+        g._db_checkouts = g.get('_db_checkouts', 0) + 1
+    return conn
+
+
+def _request_read_connection():
+    """Lazily borrow the replica connection shared by the current app context"""
+    if '_db_read_conn' not in g:
+        conn = _open_replica_connection()
+        g._db_read_conn = conn
+        if conn is not None:
+            g._db_checkouts = g.get('_db_checkouts', 0) + 1
+    if g._db_read_conn is not None:
+        g._db_handles = g.get('_db_handles', 0) + 1
+    return g._db_read_conn
+
+
+def get_db_connection(readonly=False):
+    """Get a database connection.
+
+    Inside a request (or any app context) every caller shares one pooled
+    connection; outside of one, a connection is borrowed from the pool and
+    close() hands it back.
+
+    readonly=True routes the caller to the read replica (DB_READ_HOST) when
+    one is configured, reachable, not lagging and the session has not just
+    written. Otherwise it transparently gets the primary connection.
+    """
+    if readonly and replica_configured() and not _reads_pinned():
+        if has_app_context():
+            conn = _request_read_connection()
+            if conn is not None:
+                return RequestConnection(conn)
+        else:
+            conn = _open_replica_connection()
+            if conn is not None:
+                return conn
+
+    if has_app_context():
+        return RequestConnection(_request_connection())
+    return _borrow_connection()
+
+
+def get_request_db_stats():
+    """Connections borrowed, handles handed out and statements run in the current app context"""
+    if not has_app_context():
+        return {'checkouts': 0, 'handles': 0, 'queries': 0}
+    return {'checkouts': g.get('_db_checkouts', 0), 'handles': g.get('_db_handles', 0),
+            'queries': g.get('_db_queries', 0)}
+
+
+def release_request_connection(exception=None):
+    """Return the request's shared connection to the pool"""
+    for key in ('_db_conn', '_db_read_conn'):
+        conn = g.pop(key, None)
+        if conn is not None:
+            conn.close()
+
+
+def init_db(app):
+    """Register request-scoped connection handling on the app"""
+    app.teardown_appcontext(release_request_connection)
+
+    @app.after_request
+    def add_db_stats_header(response):
+        if app.config.get('DB_DEBUG_HEADERS'):
+            stats = get_request_db_stats()
+            response.headers['X-DB-Connections'] = str(stats['checkouts'])
+            response.headers['X-DB-Handles'] = str(stats['handles'])
+            response.headers['X-DB-Queries'] = str(stats['queries'])
+        return response
@@ -0,0 +1,47 @@
+"""
+Degraded Mode Module
+Remembers the last good result of each public list page so it can still be
+served (with a notice) while the database is failing or its circuit breaker
+is open.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+
+class LastGoodCache:
+    """Small per-worker LRU of page results keyed by page + normalized filters"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.served = 0
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, datetime.now())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key, *fallback_keys):
+        """(value, stored_at) for the first key with a result, else (None, None)"""
+        with self._lock:
+            for candidate in (key,) + fallback_keys:
+                if candidate in self._entries:
+                    self.served += 1
+                    return self._entries[candidate]
+        return None, None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'served': self.served}
+
+
+last_good = LastGoodCache()
@@ -0,0 +1,140 @@
+"""
+Facets Module
+Result counts per region, property type and price bucket for the /houses
+filter sidebar. Each facet is counted with every other filter applied but
+not its own, so users see what each choice would give before clicking it.
+All three come from one pass: a GROUP BY over (region, type, price bucket,
+inside the price filter) in SQL, or the same cube from the in-memory search
+index. Results are cached by normalized filters and dropped on listing writes.
+"""
+
+from modules.cache import get_cache
+from modules.database import get_db_connection, _get_setting
+from modules.listing_cache import filter_key
+from modules.listing_events import poll_listing_changes, subscribe
+from modules.search import build_text_search
+from modules.search_index import get_listing_index
+
+# [low, high) in GHS; None = no upper bound
+PRICE_BUCKETS = [(0, 500), (500, 1000), (1000, 2000), (2000, 5000), (5000, None)]
+
+
+def bucket_of(price):
+    """Index into PRICE_BUCKETS for a price"""
+    for i, (_, high) in enumerate(PRICE_BUCKETS):
+        if high is None or price < high:
+            return i
+    return len(PRICE_BUCKETS) - 1
+
+
+def bucket_range(i):
+    """(min_price, max_price) filter values that select exactly bucket i"""
+    low, high = PRICE_BUCKETS[i]
+    return str(low), (f"{high - 0.01:.2f}" if high is not None else '')
+
+
+def bucket_label(i):
+    low, high = PRICE_BUCKETS[i]
+    if not low:
+        return f"Under GHS {high}"
+    return f"GHS {low}+" if high is None else f"GHS {low}-{high}"
+
+
+def _cache():
+    return get_cache('facets',
+                     max_entries=int(_get_setting('FACET_CACHE_SIZE', 'FACET_CACHE_SIZE', 512)),
+                     ttl=float(_get_setting('FACET_CACHE_TTL', 'FACET_CACHE_TTL', 60)))
+
+
+@subscribe
+def _drop_cached_facets(changes):
+    """Any listing write can move any count"""
+    _cache().invalidate()
+
+
+def _sql_cube(term, mode, min_price, max_price):
+    """The facet cube from one GROUP BY query"""
+    bucket_sql = "CASE" + ''.join(f" WHEN h.price < {high} THEN {i}"
+                                  for i, (_, high) in enumerate(PRICE_BUCKETS) if high is not None) \
+        + f" ELSE {len(PRICE_BUCKETS) - 1} END"
+    in_price, in_price_params = [], []
+    if min_price is not None:
+        in_price.append("h.price >= %s")
+        in_price_params.append(min_price)
+    if max_price is not None:
+        in_price.append("h.price <= %s")
+        in_price_params.append(max_price)
+    in_price_sql = f"CASE WHEN {' AND '.join(in_price)} THEN 1 ELSE 0 END" if in_price else "1"
+
+    join, where, params = '', '', list(in_price_params)
+    if term.strip():
+        text_search = build_text_search(term, mode)
+        if text_search:
+            join, where = text_search.join_sql, text_search.where_sql
+            params += text_search.join_params + text_search.where_params
+        else:
+            where = " AND h.title LIKE %s"
+            params.append(f'%{term.strip()}%')
+
+    conn = get_db_connection(readonly=True)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+            SELECT h.region_id, h.property_type, {bucket_sql} AS bucket, {in_price_sql} AS in_price,
+                   COUNT(*) AS listings
+            FROM houses h{join}
+            WHERE 1=1{where}
+            GROUP BY h.region_id, h.property_type, bucket, in_price
+        """, params)
+        return {(region_id, property_type, int(bucket), bool(in_range)): count
+                for region_id, property_type, bucket, in_range, count in cursor.fetchall()}
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _reduce(cube, filters):
+    """Disjunctive counts from a cube: each facet ignores its own filter"""
+    region_id, property_type = filters.get('region_id'), filters.get('property_type') or None
+    regions, property_types = {}, {}
+    buckets = [0] * len(PRICE_BUCKETS)
+    total = 0
+    for (region, kind, bucket, in_price), count in cube.items():
+        region_ok = region_id is None or region == region_id
+        kind_ok = property_type is None or kind == property_type
+        if kind_ok and in_price:
+            regions[region] = regions.get(region, 0) + count
+        if region_ok and in_price:
+            property_types[kind] = property_types.get(kind, 0) + count
+        if region_ok and kind_ok:
+            buckets[bucket] += count
+        if region_ok and kind_ok and in_price:
+            total += count
+
+    price_buckets = []
+    for i, count in enumerate(buckets):
+        low, high = bucket_range(i)
+        price_buckets.append({
+            'label': bucket_label(i), 'min': low, 'max': high, 'count': count,
+            'selected': filters.get('min_price') == float(low) and
+            filters.get('max_price') == (float(high) if high else None),
+        })
+    return {'total': total, 'regions': regions, 'property_types': property_types,
+            'price_buckets': price_buckets}
+
+
+def get_facets(filters, term='', mode=None):
+    """Counts for the sidebar; filters as parsed by the /houses view"""
+    poll_listing_changes()  # so other workers' writes clear the cache here too
+    key = filter_key(filters, term, mode)
+    term, mode = key[4], key[5]
+    min_price, max_price = filters.get('min_price'), filters.get('max_price')
+
+    def compute():
+        index = get_listing_index()
+        cube = index.facet_cube(term, mode, min_price, max_price, bucket_of) if index is not None else None
+        if cube is None:
+            cube = _sql_cube(term, mode, min_price, max_price)
+        return _reduce(cube, filters)
+
+    return _cache().get_or_compute(key, compute)
@@ -0,0 +1,273 @@
+"""
+Fuzzy Module
+Typo-tolerant search. Each worker keeps the words of every listing's title
+and description, with how many listings use each, plus the words of region
+and neighborhood names and the chatbot's region aliases (REGION_MAPPING in
+user_routes), with a trigram -> words index over all of them. A misspelt word
+("Kumase", "contain") is matched to the known words sharing the most
+trigrams (Jaccard similarity, as in pg_trgm) without querying the database.
+That gives /houses a "did you mean" rewrite for searches that find nothing
+and a fuzzy mode that also matches close spellings. Place words are not in
+the searchable text, so they turn into a region filter instead.
+
+Listing writes (modules/listing_events.py) re-read just the changed houses
+and adjust the word counts.
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from modules.database import get_db_connection, _get_setting
+from modules.listing_events import load_snapshot, poll_listing_changes, subscribe
+from modules.reference_data import get_neighborhoods, get_regions
+from modules.search import tokenize
+
+FUZZY_MODE = 'fuzzy'
+FUZZY_COLUMNS = "id, title, description"
+SIMILARITY_THRESHOLD = 0.4
+MAX_VARIANTS = 3            # extra spellings a word expands to in fuzzy mode
+LOAD_BATCH_SIZE = 1000
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def trigrams(word):
+    """Trigrams of a word padded like pg_trgm: 'osu' -> {'  o', ' os', 'osu', 'su '}"""
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def similarity(a, b):
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+class FuzzyQuery:
+    """A search rewritten against the index.
+
+    search is the typed text with misspelt words corrected ("did you mean"),
+    expanded every known word plus its close spellings (fuzzy mode, searched
+    in natural mode), and region_id the region a place name in it pointed to.
+    changed is False when there was nothing to correct.
+    """
+
+    def __init__(self):
+        self.search = ''
+        self.expanded = ''
+        self.region_id = None
+        self.region_name = None
+        self.changed = False
+
+
+class FuzzyIndex:
+    """Word counts and trigram postings, with per-house words for incremental updates"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pending = set()
+        self.loaded_at = None
+        self.load_ms = 0.0
+        self.refreshes = 0
+        self.lookups = 0
+        self.compared = 0           # known words scored against a looked-up word
+        self._reset()
+
+    def _reset(self):
+        self.counts = Counter()     # word -> listings whose text uses it
+        self.places = {}            # place name word -> region id
+        self.region_names = {}      # region id -> name
+        self.postings = {}          # trigram -> set of words
+        self._houses = {}           # house id -> its words
+
+    # -- building ------------------------------------------------------------
+
+    def load(self):
+        """(Re)build from reference data, the region aliases and the houses table"""
+        from modules.user_routes import REGION_MAPPING
+
+        started = time.perf_counter()
+        with self._lock:
+            self._reset()
+            self.region_names = {region['id']: region['name'] for region in get_regions()}
+            for region_id, name in self.region_names.items():
+                self._add_place(name, region_id)
+            for neighborhood in get_neighborhoods():
+                self._add_place(neighborhood['name'], neighborhood['region_id'])
+            for place, keywords in REGION_MAPPING.items():
+                region_id = next((rid for rid, name in self.region_names.items()
+                                  if name.lower() in keywords or place in name.lower()), None)
+                if region_id is not None:
+                    for keyword in keywords:
+                        self._add_place(keyword, region_id)
+
+            load_snapshot(f"SELECT {FUZZY_COLUMNS} FROM houses ORDER BY id", self._put, LOAD_BATCH_SIZE)
+        self.loaded_at = datetime.now()
+        self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+        return len(self.counts)
+
+    def _index_word(self, word):
+        for gram in trigrams(word):
+            self.postings.setdefault(gram, set()).add(word)
+
+    def _unindex_word(self, word):
+        for gram in trigrams(word):
+            self.postings[gram].discard(word)
+            if not self.postings[gram]:
+                del self.postings[gram]
+
+    def _add_place(self, name, region_id):
+        for word in tokenize(name):
+            if word not in self.places:
+                if not self.counts[word]:
+                    self._index_word(word)
+                self.places[word] = region_id
+
+    def _put(self, row):
+        """Insert or overwrite one house's words"""
+        self._remove(row['id'])
+        words = frozenset(tokenize(f"{row['title'] or ''} {row['description'] or ''}"))
+        for word in words:
+            if not self.counts[word] and word not in self.places:
+                self._index_word(word)
+            self.counts[word] += 1
+        self._houses[row['id']] = words
+
+    def _remove(self, house_id):
+        for word in self._houses.pop(house_id, ()):
+            self.counts[word] -= 1
+            if not self.counts[word]:
+                del self.counts[word]
+                if word not in self.places:
+                    self._unindex_word(word)
+
+    def mark_changed(self, changes):
+        """listing_events subscriber: note which houses to re-read"""
+        with self._lock:
+            self._pending.update(house_id for house_id, _ in changes)
+
+    def refresh(self):
+        """Re-read the houses that changed (here or, via the feed, in another worker)"""
+        poll_listing_changes()
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if not pending:
+            return 0
+
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            ids = sorted(pending)
+            cursor.execute(f"SELECT {FUZZY_COLUMNS} FROM houses WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                           ids)
+            rows = cursor.fetchall()
+        except Exception:
+            with self._lock:
+                self._pending.update(pending)
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+        with self._lock:
+            found = set()
+            for row in rows:
+                self._put(row)
+                found.add(row['id'])
+            for house_id in pending - found:
+                self._remove(house_id)
+            self.refreshes += 1
+        return len(pending)
+
+    # -- querying ------------------------------------------------------------
+
+    def similar(self, word, limit=MAX_VARIANTS, threshold=SIMILARITY_THRESHOLD):
+        """[(known word, similarity)] closest to word, best first, word itself excluded"""
+        word = word.lower()
+        grams = trigrams(word)
+        with self._lock:
+            self.lookups += 1
+            shared = Counter()
+            for gram in grams:
+                shared.update(self.postings.get(gram, ()))
+            shared.pop(word, None)
+            self.compared += len(shared)
+            matches = []
+            for candidate, overlap in shared.items():
+                score = overlap / (len(grams) + len(trigrams(candidate)) - overlap)
+                if score >= threshold:
+                    matches.append((candidate, score, self.counts[candidate]))
+        matches.sort(key=lambda match: (-match[1], -match[2], match[0]))
+        return [(candidate, round(score, 3)) for candidate, score, _ in matches[:limit]]
+
+    def rewrite(self, term):
+        """A FuzzyQuery for a search box input"""
+        query = FuzzyQuery()
+        fixes, expanded = {}, []        # word -> its replacement ('' drops it)
+        for word in dict.fromkeys(tokenize(term)):
+            close = [candidate for candidate, _ in self.similar(word, limit=MAX_VARIANTS + 1)]
+            if self.counts.get(word):
+                expanded.append(word)
+                expanded.extend(candidate for candidate in close if self.counts.get(candidate))
+                continue
+            place = word if word in self.places else (close[0] if close and not self.counts.get(close[0])
+                                                      else None)
+            if place is not None:
+                # A place name: search its region instead of the text
+                if query.region_id is None:
+                    query.region_id = self.places[place]
+                    query.region_name = self.region_names.get(query.region_id)
+                fixes[word] = ''
+            elif close:
+                fixes[word] = close[0]
+                expanded.extend(candidate for candidate in close if self.counts.get(candidate))
+
+        query.changed = bool(fixes)
+        query.search = ' '.join(fixes.get(word.lower(), word) for word in _WORD.findall(term or '')
+                                if fixes.get(word.lower(), word))
+        query.expanded = ' '.join(dict.fromkeys(expanded))
+        return query
+
+    def stats(self):
+        with self._lock:
+            return {
+                'words': len(self.counts),
+                'trigrams': len(self.postings),
+                'loaded_at': self.loaded_at.isoformat(timespec='seconds') if self.loaded_at else None,
+                'load_ms': self.load_ms,
+                'refreshes': self.refreshes,
+                'lookups': self.lookups,
+                'compared': self.compared,
+                'pending': len(self._pending),
+            }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def fuzzy_search_enabled():
+    return str(_get_setting('FUZZY_SEARCH_ENABLED', 'FUZZY_SEARCH_ENABLED', 'true')).lower() == 'true'
+
+
+def get_fuzzy_index():
+    """This worker's index, built on first use and refreshed; None when disabled"""
+    global _index
+    if not fuzzy_search_enabled():
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = FuzzyIndex()
+                subscribe(index.mark_changed)
+                index.load()
+                _index = index
+                print(f"🔤 Fuzzy index loaded: {len(index.counts)} words in {index.load_ms} ms")
+    _index.refresh()
+    return _index
+
+
+def get_fuzzy_stats():
+    return _index.stats() if _index is not None else None
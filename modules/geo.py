@@ -0,0 +1,165 @@
+"""
+Geo Module
+Radius search for listings. Houses carry latitude/longitude plus a geohash
+(a base-32 string where nearby points share a prefix), which is indexed on
+both backends. A "near" search first narrows to the geohash cells covering
+the circle's bounding box (index range scans), then to the box itself, and
+only then computes the haversine distance for what is left.
+"""
+
+import math
+
+EARTH_RADIUS_KM = 6371.0
+GEOHASH_PRECISION = 9           # ~5 m cells; prefixes give coarser ones
+MAX_COVER_CELLS = 16            # per search; fewer, larger cells beyond that
+DEFAULT_RADIUS_KM = 5.0
+MAX_RADIUS_KM = 100.0
+RADIUS_CHOICES = (1, 2, 5, 10, 25, 50)
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# (lat, lng) degrees spanned by one cell at each geohash length
+_CELL_SIZE = {n: (180.0 / 2 ** ((5 * n) // 2), 360.0 / 2 ** ((5 * n + 1) // 2))
+              for n in range(1, GEOHASH_PRECISION + 1)}
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    """Geohash of a point, e.g. (5.6037, -0.1870) -> 'ebzzgspgf'"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = value = 0
+    return ''.join(chars)
+
+
+def parse_point(lat, lng):
+    """(lat, lng) as floats, or None unless both are valid coordinates"""
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180) or math.isnan(lat) or math.isnan(lng):
+        return None
+    return lat, lng
+
+
+def parse_radius(value):
+    """Search radius in km, clamped to (0, MAX_RADIUS_KM]"""
+    try:
+        radius = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RADIUS_KM
+    if math.isnan(radius) or radius <= 0:
+        return DEFAULT_RADIUS_KM
+    return min(radius, MAX_RADIUS_KM)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lng, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing the circle"""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(lat))
+    dlng = 180.0 if cos_lat < 1e-6 else min(180.0, dlat / cos_lat)
+    return (max(-90.0, lat - dlat), min(90.0, lat + dlat),
+            max(-180.0, lng - dlng), min(180.0, lng + dlng))
+
+
+def cover_cells(box):
+    """Fewest-character geohash prefixes (at most MAX_COVER_CELLS) covering box"""
+    min_lat, max_lat, min_lng, max_lng = box
+    cells = {''}
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        cell_lat, cell_lng = _CELL_SIZE[precision]
+        rows = int(max_lat // cell_lat) - int(min_lat // cell_lat) + 1
+        columns = int(max_lng // cell_lng) - int(min_lng // cell_lng) + 1
+        if rows * columns > MAX_COVER_CELLS:
+            break
+        lats = [min(max_lat, min_lat + i * cell_lat) for i in range(rows)] + [max_lat]
+        lngs = [min(max_lng, min_lng + j * cell_lng) for j in range(columns)] + [max_lng]
+        cells = {encode_geohash(a, b, precision) for a in lats for b in lngs}
+    return sorted(cells)
+
+
+def _next_prefix(prefix):
+    """Smallest geohash string after every one starting with prefix (None: there is none)"""
+    prefix = prefix.rstrip(_BASE32[-1])
+    if not prefix:
+        return None
+    return prefix[:-1] + _BASE32[_BASE32.index(prefix[-1]) + 1]
+
+
+class NearSearch:
+    """SQL for "within radius_km of (lat, lng)", to add to a listing query on houses h"""
+
+    def __init__(self, lat, lng, radius_km=DEFAULT_RADIUS_KM):
+        self.lat, self.lng, self.radius_km = lat, lng, radius_km
+        self.box = bounding_box(lat, lng, radius_km)
+        self.cells = cover_cells(self.box)
+
+        # Great-circle distance in km; MySQL has these functions, and the
+        # SQLite backend registers them (modules/sqlite_backend.py)
+        self.distance_sql = ("(%s * ASIN(SQRT(POWER(SIN(RADIANS(h.latitude - %s) / 2), 2)"
+                             " + COS(RADIANS(%s)) * COS(RADIANS(h.latitude))"
+                             " * POWER(SIN(RADIANS(h.longitude - %s) / 2), 2))))")
+        self.distance_params = [2 * EARTH_RADIUS_KM, lat, lat, lng]
+        self.select_sql = f", {self.distance_sql} AS distance"
+        self.select_params = list(self.distance_params)
+
+        # One index range per run of adjacent cells: prefix <= geohash < next prefix
+        spans = []
+        for cell in self.cells:
+            if spans and spans[-1][1] == cell:
+                spans[-1][1] = _next_prefix(cell)
+            else:
+                spans.append([cell, _next_prefix(cell)])
+        ranges, range_params = [], []
+        for low, high in spans:
+            if not low:
+                ranges.append("h.geohash IS NOT NULL")
+            elif high is None:
+                ranges.append("h.geohash >= %s")
+                range_params.append(low)
+            else:
+                ranges.append("(h.geohash >= %s AND h.geohash < %s)")
+                range_params.extend([low, high])
+        self.where_sql = (f" AND ({' OR '.join(ranges)})"
+                          " AND h.latitude BETWEEN %s AND %s AND h.longitude BETWEEN %s AND %s"
+                          f" AND {self.distance_sql} <= %s")
+        self.where_params = range_params + list(self.box) + self.distance_params + [radius_km]
+
+    @property
+    def sort_column(self):
+        """sort_column for modules/pagination.py's 'distance' sort"""
+        return self.distance_sql, self.distance_params
+
+
+def near_search_from_args(args):
+    """NearSearch for ?lat=&lng=&radius= request args, else None"""
+    point = parse_point(args.get('lat'), args.get('lng'))
+    if point is None:
+        return None
+    return NearSearch(point[0], point[1], parse_radius(args.get('radius')))
+
+
+def location_columns(lat, lng):
+    """(latitude, longitude, geohash) to store for a house form's coordinates"""
+    point = parse_point(lat, lng) if lat not in (None, '') and lng not in (None, '') else None
+    if point is None:
+        return None, None, None
+    return point[0], point[1], encode_geohash(*point)
@@ -0,0 +1,117 @@
+"""
+House Images Module
+A house's pictures live in house_images, one row per image in display order
+(position 0 is the cover), with the file's size and pixel dimensions. List
+views join just the cover row (modules/listings.py); detail and edit pages
+load every image of the houses they show in one batched query. The old
+houses.image_paths JSON column is still written, as a mirror, but no longer
+read.
+"""
+
+import json
+import os
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional: dimensions are left NULL without it
+    Image = None
+
+UPLOAD_FOLDER = os.path.join('static', 'uploads')
+PLACEHOLDER_IMAGE = 'house_placeholder.jpg'
+BACKFILL_BATCH_SIZE = 500
+
+IMAGE_COLUMNS = ('house_id', 'position', 'path', 'width', 'height', 'bytes')
+
+
+def legacy_image_paths(value):
+    """Paths from an old houses.image_paths value: a JSON list, or a bare path"""
+    if not value:
+        return []
+    if not isinstance(value, str):
+        return list(value)
+    try:
+        paths = json.loads(value.replace("'", '"'))
+    except ValueError:
+        return [value]
+    return [paths] if isinstance(paths, str) else list(paths or [])
+
+
+def image_metadata(path):
+    """(width, height, bytes) of an uploaded file; None for what can't be read"""
+    file_path = os.path.join(UPLOAD_FOLDER, path)
+    try:
+        size = os.path.getsize(file_path)
+    except OSError:
+        return None, None, None
+    width = height = None
+    if Image is not None:
+        try:
+            with Image.open(file_path) as image:
+                width, height = image.size
+        except Exception:
+            pass
+    return width, height, size
+
+
+def save_house_images(cursor, house_id, paths):
+    """Replace a house's images with paths, in display order"""
+    paths = [path for path in paths if path and path != PLACEHOLDER_IMAGE]
+    cursor.execute("DELETE FROM house_images WHERE house_id = %s", (house_id,))
+    if paths:
+        cursor.executemany(
+            "INSERT INTO house_images (house_id, position, path, width, height, bytes) VALUES (%s, %s, %s, %s, %s, %s)",
+            [(house_id, position, path) + image_metadata(path) for position, path in enumerate(paths)])
+    # Mirror for anything still reading the old column
+    cursor.execute("UPDATE houses SET image_paths = %s WHERE id = %s",
+                   (json.dumps(paths or [PLACEHOLDER_IMAGE]), house_id))
+
+
+def load_house_images(cursor, house_ids):
+    """{house_id: [image dicts in display order]} for these houses, in one query"""
+    house_ids = list(dict.fromkeys(house_ids))
+    images = {house_id: [] for house_id in house_ids}
+    if not house_ids:
+        return images
+    cursor.execute(f"""
+        SELECT {', '.join(IMAGE_COLUMNS)} FROM house_images
+        WHERE house_id IN ({', '.join(['%s'] * len(house_ids))})
+        ORDER BY house_id, position
+    """, house_ids)
+    for row in cursor.fetchall():
+        image = row if isinstance(row, dict) else dict(zip(IMAGE_COLUMNS, row))
+        images[image['house_id']].append(image)
+    return images
+
+
+def attach_images(cursor, houses):
+    """Set 'images' and 'image_paths' on house dicts from one batched load"""
+    images = load_house_images(cursor, [house['id'] for house in houses])
+    for house in houses:
+        house['images'] = images[house['id']]
+        house['image_paths'] = [image['path'] for image in house['images']]
+    return houses
+
+
+def backfill_house_images():
+    """Migration step: copy every houses.image_paths list into house_images"""
+
+    def step(cursor):
+        cursor.execute("SELECT COUNT(*) FROM house_images")
+        if cursor.fetchone()[0]:
+            return False
+        cursor.execute("SELECT id, image_paths FROM houses WHERE image_paths IS NOT NULL ORDER BY id")
+        houses = cursor.fetchall()
+        for start in range(0, len(houses), BACKFILL_BATCH_SIZE):
+            rows = []
+            for house_id, value in houses[start:start + BACKFILL_BATCH_SIZE]:
+                paths = [path for path in legacy_image_paths(value) if path and path != PLACEHOLDER_IMAGE]
+                rows.extend((house_id, position, path) + image_metadata(path)
+                            for position, path in enumerate(paths))
+            if rows:
+                cursor.executemany(
+                    "INSERT INTO house_images (house_id, position, path, width, height, bytes) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)", rows)
+        return True
+
+    step.description = "backfill house_images from houses.image_paths"
+    return step
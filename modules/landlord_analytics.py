@@ -11,7 +11,7 @@ def get_landlord_revenue_metrics(landlord_id):
     """
     Get comprehensive revenue analytics for a specific landlord
     """
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
     
     try:
@@ -99,7 +99,7 @@ def get_landlord_revenue_metrics(landlord_id):
 
 def get_property_views(property_id):
     """Get total views for a property"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor()
     
     try:
@@ -117,7 +117,7 @@ def get_property_views(property_id):
 
 def get_property_searches(property_id):
     """Get total searches for a property"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor()
     
     try:
@@ -205,7 +205,7 @@ def calculate_revenue_growth(revenue_trends):
 
 def get_landlord_property_analytics(landlord_id, property_id):
     """Get detailed analytics for a specific property"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
     
     try:
@@ -0,0 +1,178 @@
+"""
+Listing Cache Module
+Caches /houses result pages (cards plus pager tokens) by normalized filters,
+sort, cursor and page size, so popular filter combinations skip the listing
+query and its region/neighborhood joins. A write to a house only drops the
+pages it can affect: pages that show the house, and pages whose filters the
+house now matches and whose stretch of the sort order it falls into. Keyset
+pages make that precise, since a page is "rows between two sort keys".
+
+Each worker has its own cache. Writes made in another worker arrive through
+the listing_changes feed (modules/listing_events.py), which every lookup
+polls first, so a page is never staler than LISTING_SYNC_INTERVAL seconds.
+"""
+
+import logging
+
+from modules.cache import get_cache
+from modules.database import get_db_connection, _get_setting
+from modules.listing_events import poll_listing_changes, subscribe
+from modules.pagination import SORT_KEYS, decode_cursor
+from modules.search import detect_mode
+
+logger = logging.getLogger(__name__)
+
+
+def filter_key(filters, term='', mode=None):
+    """Normalized filters + search: the same search typed differently gives the same key"""
+    term = ' '.join((term or '').lower().split())
+    return (filters.get('region_id'), filters.get('property_type') or None,
+            filters.get('min_price'), filters.get('max_price'),
+            term, detect_mode(term, mode) if term else None)
+
+
+def _ttl():
+    return float(_get_setting('HOUSES_CACHE_TTL', 'HOUSES_CACHE_TTL', 30))
+
+
+def _cache():
+    return get_cache('houses',
+                     max_entries=int(_get_setting('HOUSES_CACHE_SIZE', 'HOUSES_CACHE_SIZE', 1024)),
+                     ttl=_ttl())
+
+
+def listing_cache_enabled():
+    return _ttl() > 0
+
+
+# Sorts whose order can be recomputed from a row (not 'relevance')
+RANGED_SORTS = ('recommended', 'newest', 'price_low', 'price_high', 'name')
+
+
+def _sort_key(sort, value, house_id):
+    """A row's place in a sort's display order, as an ascending tuple (None: unknown)"""
+    if value is None or sort not in RANGED_SORTS:
+        return None
+    if sort == 'recommended':
+        return (-int(value), -house_id)
+    if sort == 'newest':
+        return (-value.timestamp(), -house_id)
+    if sort == 'price_low':
+        return (float(value), house_id)
+    if sort == 'price_high':
+        return (-float(value), -house_id)
+    return (str(value).casefold(), house_id)
+
+
+class CachedPage:
+    """A result page plus what it covers, for invalidation"""
+
+    __slots__ = ('page', 'filters', 'term', 'ids', 'low', 'high')
+
+    def __init__(self, page, filters, term, cursor_token):
+        self.page = page
+        self.filters = filters
+        self.term = term
+        self.ids = frozenset(item['id'] for item in page.items)
+
+        # The stretch of the sort order this page covers, ends included
+        self.low = self.high = None         # unknown: any matching row hits it
+        if page.sort not in RANGED_SORTS:
+            return
+        field = SORT_KEYS[page.sort][0]
+        keys = [_sort_key(page.sort, item[field], item['id']) for item in page.items]
+        position = decode_cursor(cursor_token, page.sort)
+        cursor_key = _sort_key(page.sort, position[1], position[2]) if position else None
+        if None in keys or (position and cursor_key is None):
+            return
+        backwards = position is not None and position[0] == 'prev'
+        lows = keys + ([cursor_key] if position else [])
+        highs = keys + ([cursor_key] if position else [])
+        self.low = min(lows) if (page.has_prev if backwards else position) and lows else None
+        self.high = max(highs) if (position if backwards else page.has_next) and highs else None
+
+    def affected_by(self, house_id, row):
+        """Could writing house_id (now row, or None if deleted) change this page?"""
+        if house_id in self.ids:
+            return True
+        if row is None:
+            return False
+        region_id, property_type, min_price, max_price = self.filters[:4]
+        price = float(row['price'] or 0)
+        if ((region_id is not None and row['region_id'] != region_id)
+                or (property_type is not None and row['property_type'] != property_type)
+                or (min_price is not None and price < min_price)
+                or (max_price is not None and price > max_price)):
+            return False
+        # Text matches aren't re-checked here; treat them as a match
+        if self.page.sort not in RANGED_SORTS:
+            return True
+        key = _sort_key(self.page.sort, row[SORT_KEYS[self.page.sort][0]], row['id'])
+        if key is None:
+            return True
+        return (self.low is None or key >= self.low) and (self.high is None or key <= self.high)
+
+
+def cache_key(filters, term, mode, sort, cursor_token, size):
+    return filter_key(filters, term, mode) + (sort, cursor_token, size)
+
+
+def get_cached_page(key):
+    """The cached Page for a cache_key(), else None"""
+    if not listing_cache_enabled():
+        return None
+    poll_listing_changes()
+    entry = _cache().get(key)
+    return entry.page if entry is not None else None
+
+
+def cache_generation():
+    """Read before running the query; pass to cache_page()"""
+    return _cache().generation
+
+
+def cache_page(key, page, generation):
+    """Store a page unless a listing changed while it was being built"""
+    if listing_cache_enabled():
+        _cache().put(key, CachedPage(page, key[:4], key[4], key[7]), generation=generation)
+
+
+@subscribe
+def _drop_affected_pages(changes):
+    cache = _cache()
+    house_ids = sorted({house_id for house_id, _ in changes})
+    if not cache.stats()['entries']:
+        cache.invalidate()                  # still bumps the generation for in-flight pages
+        return
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT h.id, h.region_id, h.property_type, h.price, h.created_at, h.title, rm.rank_score
+            FROM houses h LEFT JOIN listing_read_model rm ON rm.id = h.id
+            WHERE h.id IN ({', '.join(['%s'] * len(house_ids))})
+        """, house_ids)
+        rows = {row['id']: row for row in cursor.fetchall()}
+    except Exception as e:
+        logger.warning(f"Could not read changed listings, dropping every cached page: {e}")
+        cache.invalidate()
+        return
+    finally:
+        cursor.close()
+        conn.close()
+
+    # key: filter_key() + (sort, cursor token, size)
+    showed = set()              # pages that showed a changed house, as (search, size, cursor token)
+
+    def affected(key, entry):
+        if not entry.ids.isdisjoint(house_ids):
+            showed.add((key[:7], key[8], key[7]))
+        return any(entry.affected_by(house_id, rows.get(house_id)) for house_id in house_ids)
+
+    dropped = cache.invalidate(affected)
+    # A house that left a page (deleted, or no longer matching) can leave it
+    # empty, so the page leading into it may now have a stale has_next
+    if showed:
+        dropped += cache.invalidate(lambda key, entry: (key[:7], key[8], entry.page.next_cursor) in showed)
+    logger.debug("Listing cache: dropped %d pages for houses %s", dropped, house_ids)
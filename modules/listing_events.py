@@ -0,0 +1,147 @@
+"""
+Listing Events Module
+Change feed for everything a worker keeps in memory about listings (search
+index, caches). Every write to houses calls record_listing_change(), which
+refreshes the house's listing_read_model row (modules/read_model.py) and adds
+a row to listing_changes. Subscribers in the writing worker hear about
+it when the request ends; other workers pick it up from the table, polled at
+most every LISTING_SYNC_INTERVAL seconds by whoever is about to read.
+"""
+
+import threading
+import time
+
+from flask import g, has_request_context
+
+from modules.database import get_db_connection, _get_setting
+from modules.read_model import sync_read_model
+
+RETENTION_DAYS = 7
+
+_subscribers = []
+_lock = threading.Lock()
+_feed = {'last_seen': None, 'polled_at': 0.0, 'dispatched': set()}
+
+
+def subscribe(callback):
+    """Call callback([(house_id, op), ...]) for every batch of listing changes"""
+    _subscribers.append(callback)
+    return callback
+
+
+def _dispatch(changes):
+    if not changes:
+        return
+    for callback in list(_subscribers):
+        try:
+            callback(changes)
+        except Exception as e:
+            print(f"❌ Listing change subscriber {getattr(callback, '__name__', callback)} failed: {e}")
+
+
+def record_listing_change(cursor, house_id, op='upsert'):
+    """Log a write to a house ('upsert' or 'delete') on the writer's cursor"""
+    sync_read_model(cursor, house_id, op)
+    cursor.execute("INSERT INTO listing_changes (house_id, op) VALUES (%s, %s)", (house_id, op))
+    change_id = cursor.lastrowid
+    cursor.execute("DELETE FROM listing_changes WHERE changed_at < DATE_SUB(NOW(), INTERVAL %s DAY)",
+                   (RETENTION_DAYS,))
+
+    with _lock:
+        _feed['dispatched'].add(change_id)
+    if has_request_context():
+        g.setdefault('_listing_changes', []).append((house_id, op))
+    else:
+        _dispatch([(house_id, op)])
+
+
+def _sync_interval():
+    return float(_get_setting('LISTING_SYNC_INTERVAL', 'LISTING_SYNC_INTERVAL', 2))
+
+
+def _query_feed(query, params=()):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def start_feed(cursor=None):
+    """Remember where the feed is now; call before loading a full snapshot"""
+    if _feed['last_seen'] is None:
+        if cursor is None:
+            rows = _query_feed("SELECT MAX(id) FROM listing_changes")
+        else:
+            cursor.execute("SELECT MAX(id) FROM listing_changes")
+            rows = cursor.fetchall()
+        with _lock:
+            if _feed['last_seen'] is None:
+                _feed['last_seen'] = rows[0][0] or 0
+                _feed['polled_at'] = time.monotonic()
+
+
+def load_snapshot(query, put, batch_size=1000):
+    """Read a full snapshot for an in-memory index: put(row) for every row of query.
+
+    Reads the primary, on the connection that first takes the feed position,
+    so every write the snapshot misses comes after that position and arrives
+    with a later poll. A replica could still be missing writes from before it.
+    """
+    conn = get_db_connection()
+    feed_cursor = conn.cursor()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        start_feed(feed_cursor)
+        cursor.execute(query)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                put(row)
+    finally:
+        feed_cursor.close()
+        cursor.close()
+        conn.close()
+
+
+def poll_listing_changes(force=False):
+    """Dispatch changes other workers made since the last poll (throttled)"""
+    if _feed['last_seen'] is None:
+        start_feed()
+        return 0
+    if not force and time.monotonic() - _feed['polled_at'] < _sync_interval():
+        return 0
+
+    _feed['polled_at'] = time.monotonic()
+    try:
+        rows = _query_feed("SELECT id, house_id, op FROM listing_changes WHERE id > %s ORDER BY id LIMIT 5000",
+                           (_feed['last_seen'],))
+    except Exception as e:
+        print(f"⚠️  Listing change poll failed: {e}")
+        return 0
+
+    changes = []
+    with _lock:
+        for change_id, house_id, op in rows:
+            _feed['last_seen'] = max(_feed['last_seen'], change_id)
+            if change_id not in _feed['dispatched']:
+                changes.append((house_id, op))
+        _feed['dispatched'] = {i for i in _feed['dispatched'] if i > _feed['last_seen']}
+    _dispatch(changes)
+    return len(changes)
+
+
+def dispatch_request_changes(exception=None):
+    """teardown_request: tell this worker's subscribers what the request changed"""
+    changes = g.pop('_listing_changes', None)
+    if changes and exception is None:
+        _dispatch(changes)
+
+
+def init_listing_events(app):
+    app.teardown_request(dispatch_request_changes)
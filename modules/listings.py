@@ -0,0 +1,96 @@
+"""
+Listings Module
+ListingCard is what every list view shows (landing page, browse, dashboards,
+recommendations, chatbot). It selects a fixed, narrow set of columns from the
+pre-joined listing_read_model; only house_detail loads the full houses row.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+LISTING_CARD_FIELDS = (
+    'id', 'title', 'description', 'price', 'property_type', 'completion_status',
+    'cover_image', 'is_featured', 'is_available', 'created_at',
+    'region_name', 'neighborhood_name',
+)
+
+# Cards read listing_read_model (modules/read_model.py), which keeps houses'
+# column names, aliased h so filters and sorts read the same on either table.
+# Its description is already cut to the 101 characters cards use.
+# rank_score isn't shown; it is the 'recommended' sort's keyset value.
+LISTING_CARD_COLUMNS = """
+    h.id, h.title, h.description, h.price, h.property_type, h.completion_status,
+    h.cover_image, h.is_featured, h.is_available, h.created_at, h.region_name,
+    h.neighborhood_name, h.rank_score
+"""
+
+LISTING_CARD_FROM = """
+    FROM listing_read_model h
+"""
+
+
+class ListingCard:
+    """One listing as shown in a card; reads like the dict rows it replaces"""
+
+    # distance: km from the searched point, on radius searches (modules/geo.py);
+    # rank_score: position in the 'recommended' sort (modules/read_model.py)
+    __slots__ = LISTING_CARD_FIELDS + ('distance', 'rank_score')
+
+    def __init__(self, row):
+        self.distance = None
+        self.rank_score = None
+        if isinstance(row, dict):
+            for field in LISTING_CARD_FIELDS:
+                setattr(self, field, row.get(field))
+            self.rank_score = row.get('rank_score')
+            if row.get('distance') is not None:
+                self.distance = float(row['distance'])
+        else:
+            for field, value in zip(LISTING_CARD_FIELDS, row):
+                setattr(self, field, value)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in LISTING_CARD_FIELDS else default
+
+    def __contains__(self, key):
+        return key in LISTING_CARD_FIELDS
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in LISTING_CARD_FIELDS}
+
+    def to_json(self, fields=LISTING_CARD_FIELDS):
+        """The given fields (distance allowed) as JSON values: ISO dates, numbers as numbers"""
+        data = {}
+        for field in fields:
+            value = getattr(self, field)
+            if isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = float(value)
+            data[field] = value
+        return data
+
+    def __repr__(self):
+        return f"<ListingCard {self.id} {self.title!r}>"
+
+
+def fetch_listing_cards(cursor, query, params=()):
+    """Execute a query selecting LISTING_CARD_COLUMNS and wrap each row"""
+    cursor.execute(query, params)
+    return [ListingCard(row) for row in cursor.fetchall()]
+
+
+def fetch_listing_cards_by_id(cursor, ids):
+    """Cards for these house ids, in the given order (missing ids are skipped)"""
+    if not ids:
+        return []
+    placeholders = ', '.join(['%s'] * len(ids))
+    cards = {card.id: card for card in fetch_listing_cards(
+        cursor, f"SELECT {LISTING_CARD_COLUMNS} {LISTING_CARD_FROM} WHERE h.id IN ({placeholders})", ids)}
+    return [cards[house_id] for house_id in ids if house_id in cards]
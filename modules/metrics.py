@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 
 def get_user_metrics():
     """Get comprehensive user metrics"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     metrics = {}
@@ -56,7 +56,7 @@ def get_user_metrics():
 
 def get_property_metrics():
     """Get comprehensive property metrics"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     metrics = {}
@@ -118,7 +118,7 @@ def get_property_metrics():
 
 def get_report_metrics():
     """Get comprehensive report metrics"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     metrics = {}
@@ -0,0 +1,268 @@
+"""
+Schema Migrations Module
+Versioned, idempotent schema changes (indexes, columns, tables) applied by
+migrate.py or checked at startup
+"""
+
+from modules.database import get_backend, get_db_connection
+from modules import sqlite_backend
+from modules.house_images import backfill_house_images
+from modules.read_model import build_read_model, rank_listings
+from modules.reference_data import seed_reference_version
+from modules.schema import TABLES, _existing_tables
+from modules.search import create_fulltext_search
+
+MIGRATIONS_TABLE = 'schema_migrations'
+
+
+def _existing_indexes(cursor, table):
+    """Map index name -> tuple of column names for a table"""
+    if get_backend() == 'sqlite':
+        return sqlite_backend.list_indexes(cursor, table)
+    cursor.execute("""
+        SELECT INDEX_NAME, COLUMN_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+    """, (table,))
+    indexes = {}
+    for name, column in cursor.fetchall():
+        indexes[name] = indexes.get(name, ()) + (column,)
+    return indexes
+
+
+def _existing_columns(cursor, table):
+    if get_backend() == 'sqlite':
+        return sqlite_backend.list_columns(cursor, table)
+    cursor.execute("""
+        SELECT COLUMN_NAME FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def add_column(table, name, definition):
+    """Step: add a column unless it exists"""
+
+    def step(cursor):
+        if name in _existing_columns(cursor, table):
+            return False
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+        return True
+
+    step.description = f"column {table}.{name}"
+    return step
+
+
+def create_index(table, name, columns, kind='INDEX'):
+    """Step: create an index unless one with this name or these columns exists"""
+    columns = tuple(columns)
+
+    def step(cursor):
+        existing = _existing_indexes(cursor, table)
+        if name in existing or columns in existing.values():
+            return False
+        cursor.execute(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})")
+        return True
+
+    step.description = f"{kind.lower()} {name} on {table}({', '.join(columns)})"
+    step.table, step.index_name, step.columns = table, name, columns
+    return step
+
+
+def create_table(name):
+    """Step: create a table registered in modules/schema.py if it is missing"""
+
+    def step(cursor):
+        if name in _existing_tables(cursor):
+            return False
+        cursor.execute(TABLES[name])
+        return True
+
+    step.description = f"table {name}"
+    return step
+
+
+# Ordered list of migrations. Never edit or reorder an applied entry; add a
+# new version instead.
+MIGRATIONS = [
+    {
+        'version': 1,
+        'name': 'hot_query_indexes',
+        'steps': [
+            # /, /houses and tenant dashboard: newest first
+            create_index('houses', 'idx_houses_created_at', ['created_at']),
+            # /houses filters: region + property type + price range
+            create_index('houses', 'idx_houses_region_type_price', ['region_id', 'property_type', 'price']),
+            # Landlord dashboard: own listings, newest first
+            create_index('houses', 'idx_houses_created_by', ['created_by', 'created_at']),
+            # Tenant analytics: viewing history
+            create_index('property_views', 'idx_property_views_user_viewed', ['user_id', 'viewed_at']),
+            # Landlord analytics: views per property
+            create_index('property_views', 'idx_property_views_property', ['property_id']),
+            # Admin dashboard: 30-day search analytics
+            create_index('search_analytics', 'idx_search_analytics_searched_at', ['searched_at']),
+            # Engagement upserts and summaries
+            create_index('user_engagement', 'idx_user_engagement_user_date', ['user_id', 'date']),
+            # Admin reports: pending/high-priority counts
+            create_index('reports', 'idx_reports_status_priority', ['status', 'priority']),
+        ],
+    },
+    {
+        'version': 2,
+        'name': 'listing_sort_indexes',
+        'steps': [
+            # Keyset pages for /houses sorted by price or name; the (sort
+            # column, id) tiebreak comes free as the primary key is in every index
+            create_index('houses', 'idx_houses_price', ['price']),
+            create_index('houses', 'idx_houses_title', ['title']),
+        ],
+    },
+    {
+        'version': 3,
+        'name': 'houses_fulltext_search',
+        'steps': [
+            # /houses text search: MATCH ... AGAINST instead of LIKE '%x%' scans
+            create_fulltext_search(),
+        ],
+    },
+    {
+        'version': 4,
+        'name': 'house_images',
+        'steps': [
+            # Image rows instead of parsing houses.image_paths JSON on every view
+            create_table('house_images'),
+            backfill_house_images(),
+        ],
+    },
+    {
+        'version': 5,
+        'name': 'house_locations',
+        'steps': [
+            # /houses?lat=&lng=&radius=: geohash cell ranges, then the
+            # bounding box, then haversine distance (modules/geo.py)
+            add_column('houses', 'latitude', 'DECIMAL(9,6) NULL'),
+            add_column('houses', 'longitude', 'DECIMAL(9,6) NULL'),
+            add_column('houses', 'geohash', 'CHAR(9) NULL'),
+            create_index('houses', 'idx_houses_geohash', ['geohash']),
+            create_index('houses', 'idx_houses_lat_lng', ['latitude', 'longitude']),
+        ],
+    },
+    {
+        'version': 6,
+        'name': 'reference_versions',
+        'steps': [
+            # Workers keep regions/neighborhoods until this number moves
+            create_table('reference_versions'),
+            seed_reference_version(),
+        ],
+    },
+    {
+        'version': 7,
+        'name': 'listing_read_model',
+        'steps': [
+            # List views read pre-joined rows instead of houses + regions +
+            # neighborhoods + the cover image; same indexes as houses has for them
+            create_table('listing_read_model'),
+            create_index('listing_read_model', 'idx_read_model_created_at', ['created_at']),
+            create_index('listing_read_model', 'idx_read_model_region_type_price',
+                         ['region_id', 'property_type', 'price']),
+            create_index('listing_read_model', 'idx_read_model_price', ['price']),
+            create_index('listing_read_model', 'idx_read_model_title', ['title']),
+            create_index('listing_read_model', 'idx_read_model_created_by', ['created_by', 'created_at']),
+            create_index('listing_read_model', 'idx_read_model_geohash', ['geohash']),
+            create_index('listing_read_model', 'idx_read_model_lat_lng', ['latitude', 'longitude']),
+            build_read_model(),
+        ],
+    },
+    {
+        'version': 8,
+        'name': 'listing_ranking',
+        'steps': [
+            # Default 'recommended' sort: featured first, then most popular,
+            # read straight off the index in keyset pages
+            add_column('listing_read_model', 'rank_score', 'BIGINT NOT NULL DEFAULT 0'),
+            create_index('listing_read_model', 'idx_read_model_rank', ['rank_score', 'id']),
+            rank_listings(),
+        ],
+    },
+]
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    _ensure_migrations_table(cursor)
+    cursor.execute(f"SELECT version FROM {MIGRATIONS_TABLE}")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def pending_migrations():
+    """Migrations not yet recorded in schema_migrations"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        applied = applied_versions(cursor)
+        return [m for m in MIGRATIONS if m['version'] not in applied]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def migrate(target=None, verbose=True):
+    """Apply pending migrations in order, up to and including target"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    applied_now = []
+
+    try:
+        applied = applied_versions(cursor)
+        for migration in MIGRATIONS:
+            if migration['version'] in applied:
+                continue
+            if target is not None and migration['version'] > target:
+                break
+
+            if verbose:
+                print(f"➡️  Applying migration {migration['version']}: {migration['name']}")
+            for step in migration['steps']:
+                changed = step(cursor)
+                if verbose:
+                    print(f"   {'✅' if changed else '⏭️ '} {getattr(step, 'description', step.__name__)}")
+
+            cursor.execute(f"INSERT INTO {MIGRATIONS_TABLE} (version, name) VALUES (%s, %s)",
+                           (migration['version'], migration['name']))
+            conn.commit()
+            applied_now.append(migration['version'])
+        return applied_now
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def check_migrations(app):
+    """Startup check: report pending migrations, or apply them if DB_AUTO_MIGRATE is set"""
+    if not app.config.get('DB_MIGRATION_CHECK', True):
+        return
+
+    with app.app_context():
+        try:
+            pending = pending_migrations()
+            if not pending:
+                return
+            if app.config.get('DB_AUTO_MIGRATE'):
+                migrate()
+            else:
+                versions = ', '.join(str(m['version']) for m in pending)
+                print(f"⚠️  {len(pending)} pending schema migration(s): {versions}. Run: python migrate.py upgrade")
+        except Exception as e:
+            print(f"❌ Could not check schema migrations: {e}")
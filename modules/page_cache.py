@@ -0,0 +1,115 @@
+"""
+Page Cache Module
+Full-page cache for anonymous visitors. Logged-out users all get the same
+HTML for '/', '/houses' (per query string) and '/house/<id>', so each worker
+keeps the rendered body with a strong ETag: a repeat visit skips the
+database and templates, and a browser revalidating with If-None-Match gets
+a 304. Logged-in sessions and requests with pending flash messages bypass
+it. Listing writes (modules/listing_events.py) drop the list pages and the
+changed houses' detail pages.
+"""
+
+import hashlib
+from functools import wraps
+
+from flask import g, make_response, request, session
+
+from modules.cache import get_cache
+from modules.database import _get_setting
+from modules.listing_events import poll_listing_changes, subscribe
+
+
+def _ttl():
+    return float(_get_setting('PAGE_CACHE_TTL', 'PAGE_CACHE_TTL', 60))
+
+
+def _cache():
+    return get_cache('pages',
+                     max_entries=int(_get_setting('PAGE_CACHE_SIZE', 'PAGE_CACHE_SIZE', 512)),
+                     ttl=_ttl())
+
+
+def page_cache_enabled():
+    return _ttl() > 0
+
+
+class CachedResponse:
+    """A rendered page; house_id is set for detail pages, meta is whatever the view noted"""
+
+    __slots__ = ('body', 'etag', 'mimetype', 'house_id', 'meta')
+
+    def __init__(self, body, mimetype, house_id=None, meta=None):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()
+        self.mimetype = mimetype
+        self.house_id = house_id
+        self.meta = meta or {}
+
+
+def _anonymous():
+    return not session.get('logged_in') and not session.get('user_id') and '_flashes' not in session
+
+
+def skip_page_cache():
+    """Keep the current response out of the cache (e.g. a degraded page)"""
+    g._page_cache_skip = True
+
+
+def note_for_page_cache(**meta):
+    """Details the view wants handed back on a cache hit, e.g. result counts to log"""
+    g.setdefault('_page_cache_meta', {}).update(meta)
+
+
+def _respond(entry, status):
+    if request.if_none_match.contains(entry.etag):
+        response = make_response('', 304)
+        status = 'revalidated'
+    else:
+        response = make_response(entry.body)
+        response.mimetype = entry.mimetype
+    response.set_etag(entry.etag)
+    response.headers['Cache-Control'] = 'no-cache'   # always revalidate; writes invalidate
+    response.headers['X-Page-Cache'] = status
+    response.vary.add('Cookie')
+    return response
+
+
+def anonymous_page_cache(on_hit=None):
+    """Cache a GET view's page for anonymous visitors.
+
+    on_hit(meta, **view_args) runs on every cache hit and 304, for the
+    side effects the view would have had (view counts, search logging).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or not page_cache_enabled() or not _anonymous():
+                return view(*args, **kwargs)
+
+            poll_listing_changes()
+            cache = _cache()
+            key = (request.endpoint, request.path, tuple(sorted(request.args.items(multi=True))))
+            entry = cache.get(key)
+            if entry is not None:
+                if on_hit is not None:
+                    on_hit(entry.meta, *args, **kwargs)
+                return _respond(entry, 'hit')
+
+            generation = cache.generation
+            response = make_response(view(*args, **kwargs))
+            if (response.status_code != 200 or response.mimetype != 'text/html'
+                    or g.get('_page_cache_skip') or session.modified or not _anonymous()):
+                return response
+            entry = CachedResponse(response.get_data(), response.mimetype,
+                                   kwargs.get('house_id'), g.get('_page_cache_meta'))
+            cache.put(key, entry, generation=generation)
+            return _respond(entry, 'miss')
+        return wrapper
+    return decorator
+
+
+@subscribe
+def _drop_changed_pages(changes):
+    """List pages can change with any write; detail pages only with their own house's"""
+    house_ids = {house_id for house_id, _ in changes}
+    _cache().invalidate(lambda key, entry: entry.house_id is None or entry.house_id in house_ids)
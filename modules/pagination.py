@@ -0,0 +1,150 @@
+"""
+Pagination Module
+Keyset (cursor) pagination for the listing pages. A page is "the next N rows
+after this (sort value, id)", so the database walks the sort index straight
+to the right spot and a page costs the same on page 1 or page 500, unlike
+OFFSET which reads and throws away every earlier row.
+"""
+
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+PAGE_SIZE = 24
+MAX_PAGE_SIZE = 60
+
+# sort option -> (row field, column, direction); ties break on h.id in the same direction.
+# 'relevance' and 'distance' have no fixed column: the search expression is passed
+# in (modules/search.py, modules/geo.py)
+SORT_KEYS = {
+    'recommended': ('rank_score', 'h.rank_score', 'DESC'),
+    'newest': ('created_at', 'h.created_at', 'DESC'),
+    'price_low': ('price', 'h.price', 'ASC'),
+    'price_high': ('price', 'h.price', 'DESC'),
+    'name': ('title', 'h.title', 'ASC'),
+    'relevance': ('relevance', None, 'DESC'),
+    'distance': ('distance', None, 'ASC'),
+}
+DEFAULT_SORT = 'recommended'
+
+
+def page_size(value, default=PAGE_SIZE):
+    """Clamp a requested page size to 1..MAX_PAGE_SIZE"""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _decode_value(field, value):
+    if field == 'created_at':
+        return datetime.fromisoformat(value)
+    if field == 'price':
+        return Decimal(str(value))
+    if field in ('relevance', 'distance'):
+        return float(value)
+    if field == 'rank_score':
+        return int(value)
+    return str(value)
+
+
+def encode_cursor(sort, direction, row):
+    """Opaque token pointing just past row ('next') or just before it ('prev')"""
+    field = SORT_KEYS[sort][0]
+    payload = [sort, direction, _encode_value(row[field]), row['id']]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, sort):
+    """(direction, value, id) for a token made for this sort, else None"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        token_sort, direction, value, row_id = json.loads(raw)
+        if token_sort != sort or direction not in ('next', 'prev') or value is None:
+            return None
+        return direction, _decode_value(SORT_KEYS[sort][0], value), int(row_id)
+    except (ValueError, TypeError, KeyError, InvalidOperation):
+        return None
+
+
+class Page:
+    """One page of rows plus the tokens for its neighbours"""
+
+    def __init__(self, items, sort, has_next, has_prev, size):
+        self.items = items
+        self.sort = sort
+        self.size = size
+        self.next_cursor = encode_cursor(sort, 'next', items[-1]) if items and has_next else None
+        self.prev_cursor = encode_cursor(sort, 'prev', items[0]) if items and has_prev else None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def keyset_clause(sort, cursor_token, sort_column=None):
+    """(WHERE fragment, its params, ORDER BY fragment, its params, decoded cursor).
+
+    The WHERE fragment is '' for the first page. For 'prev' the order is
+    reversed so the LIMIT picks the rows nearest the cursor; paginate() flips
+    them back. sort_column=(sql, params) overrides the sort's column.
+    """
+    _, column, direction = SORT_KEYS[sort]
+    column, column_params = sort_column or (column, [])
+    position = decode_cursor(cursor_token, sort)
+
+    backwards = position is not None and position[0] == 'prev'
+    if backwards:
+        direction = 'ASC' if direction == 'DESC' else 'DESC'
+    order = f" ORDER BY {column} {direction}, h.id {direction}"
+
+    if position is None:
+        return '', [], order, list(column_params), None
+    _, value, row_id = position
+    op = '<' if direction == 'DESC' else '>'
+    where = f" AND ({column} {op} %s OR ({column} = %s AND h.id {op} %s))"
+    where_params = list(column_params) + [value] + list(column_params) + [value, row_id]
+    return where, where_params, order, list(column_params), position
+
+
+def paginate(fetch, query, params, sort, cursor_token, size, sort_column=None, wrap=None):
+    """Run a listing query one keyset page at a time.
+
+    query must end in its WHERE clause (no ORDER BY/LIMIT) and select the
+    sort field and id; fetch(query, params) returns the rows. The 'relevance'
+    and 'distance' sorts need sort_column=(sql, params). wrap, if given, is applied to each
+    row once the page tokens are made.
+    """
+    if sort not in SORT_KEYS or (SORT_KEYS[sort][1] is None and sort_column is None):
+        sort = DEFAULT_SORT
+    where, where_params, order, order_params, position = keyset_clause(sort, cursor_token, sort_column)
+    rows = fetch(query + where + order + " LIMIT %s",
+                 list(params) + where_params + order_params + [size + 1])
+
+    more = len(rows) > size
+    rows = rows[:size]
+    if position is not None and position[0] == 'prev':
+        rows.reverse()
+        page = Page(rows, sort, has_next=True, has_prev=more, size=size)
+    else:
+        page = Page(rows, sort, has_next=more, has_prev=position is not None, size=size)
+    if wrap is not None:
+        page.items = [wrap(row) for row in page.items]
+    return page
@@ -0,0 +1,115 @@
+"""
+Query Statistics Module
+Aggregates per-statement timings recorded by the instrumented cursors
+handed out by modules.database
+"""
+
+import re
+import threading
+from collections import Counter, deque
+
+# Latency samples kept per fingerprint for percentile estimates
+SAMPLE_SIZE = 500
+
+_COMMENT_RE = re.compile(r'(--[^\n]*|/\*.*?\*/)', re.S)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|%\(\w+\)s|\?')
+_IN_LIST_RE = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.I)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Normalize a statement so calls that differ only in literals group together"""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode('utf-8', 'replace')
+    sql = _COMMENT_RE.sub(' ', sql)
+    sql = _STRING_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def _percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(pct / 100.0 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+class QueryStat:
+    """Running totals for one statement fingerprint"""
+
+    __slots__ = ('fingerprint', 'calls', 'total_ms', 'max_ms', 'rows', 'errors', 'samples', 'routes')
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.errors = 0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+        self.routes = Counter()
+
+    def to_dict(self):
+        samples = sorted(self.samples)
+        return {
+            'fingerprint': self.fingerprint,
+            'calls': self.calls,
+            'total_ms': round(self.total_ms, 3),
+            'avg_ms': round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            'p50_ms': round(_percentile(samples, 50), 3),
+            'p95_ms': round(_percentile(samples, 95), 3),
+            'p99_ms': round(_percentile(samples, 99), 3),
+            'max_ms': round(self.max_ms, 3),
+            'rows': self.rows,
+            'rows_per_call': round(self.rows / self.calls, 2) if self.calls else 0.0,
+            'errors': self.errors,
+            'routes': dict(self.routes.most_common()),
+        }
+
+
+class QueryStatsRegistry:
+    """Thread-safe, in-process aggregation of query timings"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, sql, elapsed_ms, rows=0, route=None, error=False):
+        key = fingerprint(sql)
+        with self._lock:
+            stat = self._stats.get(key)
+            if stat is None:
+                stat = self._stats[key] = QueryStat(key)
+            stat.calls += 1
+            stat.total_ms += elapsed_ms
+            stat.max_ms = max(stat.max_ms, elapsed_ms)
+            stat.samples.append(elapsed_ms)
+            stat.rows += max(rows, 0)
+            stat.routes[route or '-'] += 1
+            if error:
+                stat.errors += 1
+        return key
+
+    def add_rows(self, key, rows):
+        """Count rows fetched after execute() returned (unbuffered cursors)"""
+        with self._lock:
+            stat = self._stats.get(key)
+            if stat is not None:
+                stat.rows += rows
+
+    def snapshot(self, sort='total_ms', limit=None):
+        with self._lock:
+            entries = [stat.to_dict() for stat in self._stats.values()]
+        entries.sort(key=lambda entry: entry.get(sort, 0), reverse=True)
+        return entries[:limit] if limit else entries
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+query_stats = QueryStatsRegistry()
@@ -0,0 +1,200 @@
+"""
+Listing Read Model Module
+listing_read_model holds one pre-joined row per house: the card columns,
+region and neighborhood names, the cover image, a popularity score and the
+rank the default 'recommended' sort walks, plus the columns list views
+filter and sort on. Every list view reads it (modules/listings.py) instead
+of joining houses to regions, neighborhoods and house_images on each
+request.
+
+record_listing_change() replaces a house's row on the writer's cursor, right
+after the write (both backends autocommit, so the row is replaced in one
+statement rather than deleted and re-inserted). Popularity comes from the
+last POPULARITY_WINDOW_DAYS of property_performance, which fills up without
+touching houses, so it is also refreshed in bulk:
+`python rebuild_listings.py popularity` (e.g. hourly from cron), or
+`python rebuild_listings.py` to repair every row that drifted from houses.
+Both log the houses they change to listing_changes, so every worker's
+search index and result caches follow.
+
+rank_score is popularity_score plus FEATURED_RANK for featured listings, one
+column so the (rank_score, id) index serves "featured first, then most
+popular" as an ordinary keyset page (modules/pagination.py).
+"""
+
+from modules.database import get_db_connection
+
+READ_MODEL_TABLE = 'listing_read_model'
+REBUILD_BATCH_SIZE = 500
+POPULARITY_WINDOW_DAYS = 30
+CONTACT_WEIGHT = 5  # an enquiry counts for as much as this many views
+FEATURED_RANK = 10 ** 9  # above any popularity score, so featured listings come first
+
+READ_MODEL_COLUMNS = (
+    'id', 'title', 'description', 'price', 'property_type', 'completion_status',
+    'cover_image', 'is_featured', 'is_available', 'created_at', 'created_by',
+    'region_id', 'neighborhood_id', 'region_name', 'neighborhood_name',
+    'latitude', 'longitude', 'geohash', 'popularity_score', 'rank_score',
+)
+
+# params: (FEATURED_RANK,)
+RANK_SQL = "popularity_score + CASE WHEN is_featured THEN %s ELSE 0 END"
+
+# Correlated on h.id; params: (CONTACT_WEIGHT, POPULARITY_WINDOW_DAYS)
+POPULARITY_SQL = """
+    COALESCE((SELECT SUM(pp.views_count + %s * pp.contacts_count)
+              FROM property_performance pp
+              WHERE pp.property_id = h.id AND pp.date >= DATE_SUB(CURDATE(), INTERVAL %s DAY)), 0)
+"""
+
+# READ_MODEL_COLUMNS computed from houses. Cards only show the first 100
+# characters of the description; the extra one lets templates keep their
+# "...", e.g. description|length > 100. params: _select_params()
+_SELECT_SQL = f"""
+    SELECT h.id, h.title, SUBSTR(h.description, 1, 101), h.price, h.property_type,
+           h.completion_status, ci.path, h.is_featured, h.is_available, h.created_at,
+           h.created_by, h.region_id, h.neighborhood_id, r.name, n.name,
+           h.latitude, h.longitude, h.geohash, {POPULARITY_SQL},
+           {POPULARITY_SQL} + CASE WHEN h.is_featured THEN %s ELSE 0 END
+    FROM houses h
+    LEFT JOIN regions r ON h.region_id = r.id
+    LEFT JOIN neighborhoods n ON h.neighborhood_id = n.id
+    LEFT JOIN house_images ci ON ci.house_id = h.id AND ci.position = 0
+"""
+
+# REPLACE swaps a row in one statement, so readers never miss it
+_REPLACE_SQL = f"REPLACE INTO {READ_MODEL_TABLE} ({', '.join(READ_MODEL_COLUMNS)})"
+
+
+def _popularity_params():
+    return [CONTACT_WEIGHT, POPULARITY_WINDOW_DAYS]
+
+
+def _select_params():
+    return _popularity_params() + _popularity_params() + [FEATURED_RANK]
+
+
+def _values(row):
+    return tuple(row.values()) if isinstance(row, dict) else row
+
+
+def sync_read_model(cursor, house_id, op='upsert'):
+    """Bring one house's row in line with houses, after a write on the same cursor"""
+    if op == 'delete':
+        cursor.execute(f"DELETE FROM {READ_MODEL_TABLE} WHERE id = %s", (house_id,))
+    else:
+        cursor.execute(f"{_REPLACE_SQL} {_SELECT_SQL} WHERE h.id = %s", _select_params() + [house_id])
+
+
+def rebuild_read_model(cursor):
+    """Bring every row in line with houses; returns the ids of the houses whose row changed.
+
+    Works through REBUILD_BATCH_SIZE houses at a time and replaces only the
+    rows that differ, so list views keep reading a full table while it runs.
+    Rows of deleted houses go with them (ON DELETE CASCADE).
+    """
+    cursor.execute("SELECT id FROM houses ORDER BY id")
+    house_ids = [_values(row)[0] for row in cursor.fetchall()]
+    changed = []
+    for start in range(0, len(house_ids), REBUILD_BATCH_SIZE):
+        batch = house_ids[start:start + REBUILD_BATCH_SIZE]
+        cursor.execute(f"{_SELECT_SQL} WHERE h.id BETWEEN %s AND %s", _select_params() + [batch[0], batch[-1]])
+        fresh = [_values(row) for row in cursor.fetchall()]
+        cursor.execute(f"SELECT {', '.join(READ_MODEL_COLUMNS)} FROM {READ_MODEL_TABLE} WHERE id BETWEEN %s AND %s",
+                       (batch[0], batch[-1]))
+        stored = {row[0]: row for row in map(_values, cursor.fetchall())}
+        drifted = [row for row in fresh if stored.get(row[0]) != row]
+        if drifted:
+            cursor.executemany(f"{_REPLACE_SQL} VALUES ({', '.join(['%s'] * len(READ_MODEL_COLUMNS))})", drifted)
+            changed.extend(row[0] for row in drifted)
+    return changed
+
+
+def rank_read_model(cursor):
+    """Recompute every rank_score from the stored popularity and featured flag"""
+    cursor.execute(f"UPDATE {READ_MODEL_TABLE} SET rank_score = {RANK_SQL}", (FEATURED_RANK,))
+    return cursor.rowcount
+
+
+def refresh_popularity(cursor):
+    """Recompute popularity scores from property_performance; returns how many moved.
+
+    Houses whose score moved are re-ranked and logged to listing_changes, so
+    every worker's search index and result caches pick up the new order when
+    they next poll the feed (modules/listing_events.py).
+    """
+    cursor.execute(f"SELECT h.id, h.popularity_score, {POPULARITY_SQL} FROM {READ_MODEL_TABLE} h",
+                   _popularity_params())
+    moved = [(int(score), int(score), FEATURED_RANK, house_id)
+             for house_id, stored, score in map(_values, cursor.fetchall()) if int(stored) != int(score)]
+    if moved:
+        cursor.executemany(f"""
+            UPDATE {READ_MODEL_TABLE}
+            SET popularity_score = %s, rank_score = %s + CASE WHEN is_featured THEN %s ELSE 0 END
+            WHERE id = %s
+        """, moved)
+        cursor.executemany("INSERT INTO listing_changes (house_id, op) VALUES (%s, %s)",
+                           [(house_id, 'upsert') for *_, house_id in moved])
+    return len(moved)
+
+
+def refresh_place_names(cursor):
+    """Copy region and neighborhood names again, after they were edited"""
+    cursor.execute(f"""
+        UPDATE {READ_MODEL_TABLE}
+        SET region_name = (SELECT r.name FROM regions r WHERE r.id = {READ_MODEL_TABLE}.region_id),
+            neighborhood_name = (SELECT n.name FROM neighborhoods n WHERE n.id = {READ_MODEL_TABLE}.neighborhood_id)
+    """)
+    return cursor.rowcount
+
+
+def rebuild_listing_read_model(popularity_only=False):
+    """Repair the read model (or only refresh its popularity scores); returns how many rows changed.
+
+    Changed houses are logged to listing_changes, so every worker drops the
+    cached pages and index entries they affect when it next polls the feed.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if popularity_only:
+            count = refresh_popularity(cursor)
+        else:
+            changed = rebuild_read_model(cursor)
+            if changed:
+                cursor.executemany("INSERT INTO listing_changes (house_id, op) VALUES (%s, %s)",
+                                   [(house_id, 'upsert') for house_id in changed])
+            count = len(changed)
+        conn.commit()
+        return count
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def build_read_model():
+    """Migration step: fill listing_read_model from houses"""
+
+    def step(cursor):
+        cursor.execute(f"SELECT COUNT(*) FROM {READ_MODEL_TABLE}")
+        if cursor.fetchone()[0]:
+            return False
+        rebuild_read_model(cursor)
+        return True
+
+    step.description = f"fill {READ_MODEL_TABLE} from houses"
+    return step
+
+
+def rank_listings():
+    """Migration step: fill rank_score for the rows migration 7 built"""
+
+    def step(cursor):
+        rank_read_model(cursor)
+        return True
+
+    step.description = f"rank_score for every {READ_MODEL_TABLE} row"
+    return step
@@ -0,0 +1,148 @@
+"""
+Reference Data Module
+Regions and neighborhoods only change through seeding and migrations, so each
+worker keeps them in memory for the browse filters, the house forms and
+/api/regions/<id>/neighborhoods instead of querying them on every request.
+Every change to them bumps a version number in reference_versions
+(bump_reference_data_version, or `python migrate.py reference` after editing
+the tables by hand). After REFERENCE_DATA_TTL seconds a worker checks that
+number, one single-row query, and only reloads when it has moved.
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+from modules.database import get_db_connection, _get_setting
+
+VERSION_NAME = 'reference_data'
+
+_lock = threading.Lock()
+_cache = {'regions': None, 'neighborhoods': None, 'by_region': {}, 'etags': {},
+          'version': None, 'loaded_at': 0.0, 'checked_at': 0.0}
+
+
+def _ttl():
+    return float(_get_setting('REFERENCE_DATA_TTL', 'REFERENCE_DATA_TTL', 300))
+
+
+def _read_version(cursor):
+    """The stored version, or None before migration 6 has created reference_versions"""
+    try:
+        cursor.execute("SELECT version FROM reference_versions WHERE name = %s", (VERSION_NAME,))
+        row = cursor.fetchone()
+    except Exception:
+        return None
+    if row is None:
+        return 0
+    return row['version'] if isinstance(row, dict) else row[0]
+
+
+def load_reference_data():
+    """(Re)load regions and neighborhoods from the database"""
+    conn = get_db_connection(readonly=True)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        version = _read_version(cursor)
+        cursor.execute("SELECT * FROM regions ORDER BY name")
+        regions = cursor.fetchall()
+        cursor.execute("SELECT * FROM neighborhoods ORDER BY name")
+        neighborhoods = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    # Each region's choices for the house forms, with an ETag for the API
+    by_region = {region['id']: [] for region in regions}
+    for neighborhood in neighborhoods:
+        by_region.setdefault(neighborhood['region_id'], []).append(
+            {'id': neighborhood['id'], 'name': neighborhood['name']})
+    etags = {region_id: hashlib.sha1(json.dumps(choices).encode()).hexdigest()
+             for region_id, choices in by_region.items()}
+
+    with _lock:
+        _cache['regions'] = regions
+        _cache['neighborhoods'] = neighborhoods
+        _cache['by_region'] = by_region
+        _cache['etags'] = etags
+        _cache['version'] = version
+        _cache['loaded_at'] = _cache['checked_at'] = time.monotonic()
+    return {'regions': len(regions), 'neighborhoods': len(neighborhoods), 'version': version}
+
+
+def _stored_version():
+    conn = get_db_connection(readonly=True)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        return _read_version(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _current():
+    if _cache['regions'] is None:
+        load_reference_data()
+    elif time.monotonic() - _cache['checked_at'] >= _ttl():
+        version = _stored_version()
+        if version is None or version != _cache['version']:
+            load_reference_data()
+        else:
+            _cache['checked_at'] = time.monotonic()
+    return _cache
+
+
+def get_regions():
+    """All regions, ordered by name"""
+    return _current()['regions']
+
+
+def get_neighborhoods(region_id=None):
+    """All neighborhoods (or one region's), ordered by name"""
+    neighborhoods = _current()['neighborhoods']
+    if region_id is None:
+        return neighborhoods
+    return [n for n in neighborhoods if n['region_id'] == region_id]
+
+
+def get_neighborhood_choices(region_id):
+    """(choices, etag) for one region's neighborhood dropdown; choices is None for an unknown region"""
+    cache = _current()
+    return cache['by_region'].get(region_id), cache['etags'].get(region_id)
+
+
+def get_reference_version():
+    return _current()['version']
+
+
+def bump_reference_data_version(cursor):
+    """Record a change to regions or neighborhoods, on the writer's cursor.
+
+    This worker reloads on next use; the others within REFERENCE_DATA_TTL.
+    """
+    cursor.execute("UPDATE reference_versions SET version = version + 1 WHERE name = %s", (VERSION_NAME,))
+    if cursor.rowcount == 0:
+        cursor.execute("INSERT INTO reference_versions (name, version) VALUES (%s, %s)", (VERSION_NAME, 1))
+    invalidate_reference_data()
+
+
+def seed_reference_version():
+    """Migration step: start the reference data version at 1"""
+
+    def step(cursor):
+        cursor.execute("SELECT COUNT(*) FROM reference_versions WHERE name = %s", (VERSION_NAME,))
+        if cursor.fetchone()[0]:
+            return False
+        cursor.execute("INSERT INTO reference_versions (name, version) VALUES (%s, %s)", (VERSION_NAME, 1))
+        return True
+
+    step.description = "reference data version 1"
+    return step
+
+
+def invalidate_reference_data():
+    """Drop the cached rows; the next caller reloads them"""
+    with _lock:
+        _cache['regions'] = None
+        _cache['neighborhoods'] = None
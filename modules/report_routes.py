@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, flash, session, jsonify
 from modules.database import get_db_connection
+from modules.streaming import count_rows, stream_page, stream_rows
 from datetime import datetime
 
 report_bp = Blueprint('report', __name__)
@@ -80,12 +81,10 @@ def admin_reports():
         flash('Admin access required.', 'error')
         return redirect('/login')
 
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-
     try:
-        # Get all reports with user info
-        cursor.execute("""
+        report_count = count_rows("SELECT COUNT(*) FROM reports r JOIN users u ON r.user_id = u.id")
+        # Get all reports with user info, streamed so memory stays flat
+        reports = stream_rows("""
             SELECT r.*, u.username, u.email, u.full_name 
             FROM reports r 
             JOIN users u ON r.user_id = u.id 
@@ -96,16 +95,12 @@ def admin_reports():
                      ELSE 4 END,
                 r.created_at DESC
         """)
-        reports = cursor.fetchall()
 
     except Exception as e:
         flash(f'Error loading reports: {str(e)}', 'error')
-        reports = []
-    finally:
-        cursor.close()
-        conn.close()
+        report_count, reports = 0, iter(())
 
-    return render_template('admin/manage_reports.html', reports=reports)
+    return stream_page('admin/manage_reports.html', reports=reports, report_count=report_count)
 
 
 @report_bp.route('/admin/reports/<int:report_id>')
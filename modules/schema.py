@@ -0,0 +1,422 @@
+"""
+Schema Registry Module
+Single source of truth for the application's tables. ensure_schema() creates
+any missing table once per worker (or via `python migrate.py schema`) so
+request handlers only ever run DML.
+"""
+
+import threading
+import time
+from modules.database import get_backend, get_db_connection
+from modules import sqlite_backend
+
+# Tables in dependency order (referenced tables first)
+TABLES = {
+    'users': """
+        CREATE TABLE IF NOT EXISTS users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(80) NOT NULL UNIQUE,
+            email VARCHAR(120) NOT NULL UNIQUE,
+            password_hash VARCHAR(255) NOT NULL,
+            full_name VARCHAR(120),
+            phone VARCHAR(30),
+            role VARCHAR(20) DEFAULT 'tenant',
+            is_active BOOLEAN DEFAULT TRUE,
+            login_count INT DEFAULT 0,
+            last_login TIMESTAMP NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    'regions': """
+        CREATE TABLE IF NOT EXISTS regions (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL
+        )
+    """,
+    'neighborhoods': """
+        CREATE TABLE IF NOT EXISTS neighborhoods (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            region_id INT,
+            name VARCHAR(100) NOT NULL,
+            INDEX idx_region_id (region_id),
+            FOREIGN KEY (region_id) REFERENCES regions(id) ON DELETE CASCADE
+        )
+    """,
+    'houses': """
+        CREATE TABLE IF NOT EXISTS houses (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            region_id INT,
+            neighborhood_id INT,
+            exact_location VARCHAR(255),
+            latitude DECIMAL(9,6) NULL,
+            longitude DECIMAL(9,6) NULL,
+            geohash CHAR(9) NULL,
+            property_type VARCHAR(50),
+            completion_status VARCHAR(50),
+            months_left INT NULL,
+            price DECIMAL(10,2) NOT NULL DEFAULT 0,
+            image_paths TEXT,
+            contact_name VARCHAR(120),
+            contact_phone VARCHAR(30),
+            contact_email VARCHAR(120),
+            created_by INT,
+            landlord_id INT NULL,
+            is_featured BOOLEAN DEFAULT FALSE,
+            is_available BOOLEAN DEFAULT TRUE,
+            is_occupied BOOLEAN DEFAULT FALSE,
+            views_count INT DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (region_id) REFERENCES regions(id) ON DELETE SET NULL,
+            FOREIGN KEY (neighborhood_id) REFERENCES neighborhoods(id) ON DELETE SET NULL,
+            FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL
+        )
+    """,
+    'reports': """
+        CREATE TABLE IF NOT EXISTS reports (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            report_type VARCHAR(50),
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            priority VARCHAR(20) DEFAULT 'medium',
+            status VARCHAR(20) DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """,
+    'favorites': """
+        CREATE TABLE IF NOT EXISTS favorites (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            house_id INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY unique_favorite (user_id, house_id),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (house_id) REFERENCES houses(id) ON DELETE CASCADE
+        )
+    """,
+    'user_activities': """
+        CREATE TABLE IF NOT EXISTS user_activities (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            activity_type VARCHAR(50),
+            description VARCHAR(255),
+            ip_address VARCHAR(45),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_user_id (user_id),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """,
+    'property_views': """
+        CREATE TABLE IF NOT EXISTS property_views (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            property_id INT NOT NULL,
+            user_id INT NULL,
+            ip_address VARCHAR(45),
+            user_agent TEXT,
+            referrer VARCHAR(500),
+            viewed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            session_id VARCHAR(100),
+            INDEX idx_property_id (property_id),
+            INDEX idx_user_id (user_id),
+            INDEX idx_viewed_at (viewed_at),
+            FOREIGN KEY (property_id) REFERENCES houses(id) ON DELETE CASCADE,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+        )
+    """,
+    'search_analytics': """
+        CREATE TABLE IF NOT EXISTS search_analytics (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NULL,
+            search_term VARCHAR(255),
+            filters_applied JSON,
+            results_count INT,
+            ip_address VARCHAR(45),
+            searched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            session_id VARCHAR(100),
+            INDEX idx_user_id (user_id),
+            INDEX idx_searched_at (searched_at),
+            INDEX idx_search_term (search_term),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+        )
+    """,
+    'user_sessions': """
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            session_id VARCHAR(100) UNIQUE,
+            ip_address VARCHAR(45),
+            user_agent TEXT,
+            login_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_activity TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            logout_time TIMESTAMP NULL,
+            session_duration INT NULL,
+            pages_viewed INT DEFAULT 0,
+            INDEX idx_user_id (user_id),
+            INDEX idx_login_time (login_time),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """,
+    'property_performance': """
+        CREATE TABLE IF NOT EXISTS property_performance (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            property_id INT NOT NULL,
+            date DATE NOT NULL,
+            views_count INT DEFAULT 0,
+            searches_count INT DEFAULT 0,
+            contacts_count INT DEFAULT 0,
+            featured_views INT DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            UNIQUE KEY unique_property_date (property_id, date),
+            INDEX idx_date (date),
+            FOREIGN KEY (property_id) REFERENCES houses(id) ON DELETE CASCADE
+        )
+    """,
+    'revenue_analytics': """
+        CREATE TABLE IF NOT EXISTS revenue_analytics (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            property_id INT NOT NULL,
+            date DATE NOT NULL,
+            daily_rent DECIMAL(10,2) DEFAULT 0,
+            monthly_rent DECIMAL(10,2) DEFAULT 0,
+            is_occupied BOOLEAN DEFAULT FALSE,
+            occupancy_days INT DEFAULT 0,
+            revenue_generated DECIMAL(10,2) DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            UNIQUE KEY unique_property_date (property_id, date),
+            INDEX idx_date (date),
+            FOREIGN KEY (property_id) REFERENCES houses(id) ON DELETE CASCADE
+        )
+    """,
+    'geographic_analytics': """
+        CREATE TABLE IF NOT EXISTS geographic_analytics (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            region_id INT NOT NULL,
+            date DATE NOT NULL,
+            property_views INT DEFAULT 0,
+            property_searches INT DEFAULT 0,
+            new_listings INT DEFAULT 0,
+            average_price DECIMAL(10,2) DEFAULT 0,
+            demand_score DECIMAL(5,2) DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            UNIQUE KEY unique_region_date (region_id, date),
+            INDEX idx_date (date),
+            FOREIGN KEY (region_id) REFERENCES regions(id) ON DELETE CASCADE
+        )
+    """,
+    'user_engagement': """
+        CREATE TABLE IF NOT EXISTS user_engagement (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            date DATE NOT NULL,
+            login_count INT DEFAULT 0,
+            session_duration INT DEFAULT 0,
+            pages_viewed INT DEFAULT 0,
+            properties_viewed INT DEFAULT 0,
+            searches_performed INT DEFAULT 0,
+            reports_submitted INT DEFAULT 0,
+            engagement_score DECIMAL(5,2) DEFAULT 0,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY unique_user_date (user_id, date),
+            INDEX idx_date (date),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """,
+    'user_favorites': """
+        CREATE TABLE IF NOT EXISTS user_favorites (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            property_id INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            FOREIGN KEY (property_id) REFERENCES houses(id),
+            UNIQUE KEY unique_favorite (user_id, property_id)
+        )
+    """,
+    'user_saved_searches': """
+        CREATE TABLE IF NOT EXISTS user_saved_searches (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            search_name VARCHAR(255) NOT NULL,
+            search_term VARCHAR(255),
+            filters_applied TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """,
+    # One row per house image, position 0 = cover (modules/house_images.py)
+    'house_images': """
+        CREATE TABLE IF NOT EXISTS house_images (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            house_id INT NOT NULL,
+            position INT NOT NULL DEFAULT 0,
+            path VARCHAR(255) NOT NULL,
+            width INT NULL,
+            height INT NULL,
+            bytes INT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY unique_house_position (house_id, position),
+            FOREIGN KEY (house_id) REFERENCES houses(id) ON DELETE CASCADE
+        )
+    """,
+    # Version numbers for data workers cache until it changes (modules/reference_data.py)
+    'reference_versions': """
+        CREATE TABLE IF NOT EXISTS reference_versions (
+            name VARCHAR(50) PRIMARY KEY,
+            version INT NOT NULL DEFAULT 1,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """,
+    # One pre-joined row per house for every list view (modules/read_model.py);
+    # INTEGER PRIMARY KEY makes id SQLite's rowid, so (column, id) orders need no sort
+    'listing_read_model': """
+        CREATE TABLE IF NOT EXISTS listing_read_model (
+            id INTEGER PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            description VARCHAR(101),
+            price DECIMAL(10,2) NOT NULL DEFAULT 0,
+            property_type VARCHAR(50),
+            completion_status VARCHAR(50),
+            cover_image VARCHAR(255) NULL,
+            is_featured BOOLEAN DEFAULT FALSE,
+            is_available BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP NULL,
+            created_by INT NULL,
+            region_id INT NULL,
+            neighborhood_id INT NULL,
+            region_name VARCHAR(100) NULL,
+            neighborhood_name VARCHAR(100) NULL,
+            latitude DECIMAL(9,6) NULL,
+            longitude DECIMAL(9,6) NULL,
+            geohash CHAR(9) NULL,
+            popularity_score INT NOT NULL DEFAULT 0,
+            rank_score BIGINT NOT NULL DEFAULT 0,
+            refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (id) REFERENCES houses(id) ON DELETE CASCADE
+        )
+    """,
+    # Change feed for per-worker listing caches and indexes (modules/listing_events.py)
+    'listing_changes': """
+        CREATE TABLE IF NOT EXISTS listing_changes (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            house_id INT NOT NULL,
+            op VARCHAR(10) NOT NULL,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_changed_at (changed_at)
+        )
+    """,
+}
+
+
+class SchemaState:
+    """What ensure_schema() found and did in this worker"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked_at = None
+        self.tables = {}
+        self.created = []
+        self.errors = {}
+
+    def to_dict(self):
+        return {
+            'checked_at': self.checked_at,
+            'tables': dict(self.tables),
+            'created': list(self.created),
+            'errors': dict(self.errors),
+        }
+
+
+_state = SchemaState()
+
+
+def _existing_tables(cursor):
+    if get_backend() == 'sqlite':
+        return sqlite_backend.list_tables(cursor)
+    cursor.execute("""
+        SELECT TABLE_NAME FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE()
+    """)
+    return {row[0] for row in cursor.fetchall()}
+
+
+def existing_tables():
+    """Names of the tables currently in the database"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        return _existing_tables(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def ensure_schema(force=False, verbose=False):
+    """Create any missing registered table; runs once per worker unless forced"""
+    with _state.lock:
+        if _state.checked_at is not None and not force:
+            return _state.to_dict()
+
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            existing = _existing_tables(cursor)
+            _state.created = []
+            _state.errors = {}
+            for name, ddl in TABLES.items():
+                if name in existing:
+                    _state.tables[name] = True
+                    continue
+                try:
+                    cursor.execute(ddl)
+                    _state.tables[name] = True
+                    _state.created.append(name)
+                    if verbose:
+                        print(f"   ✅ created table {name}")
+                except Exception as e:
+                    _state.tables[name] = False
+                    _state.errors[name] = str(e)
+                    print(f"❌ Could not create table {name}: {e}")
+            conn.commit()
+            _state.checked_at = time.time()
+        finally:
+            cursor.close()
+            conn.close()
+        return _state.to_dict()
+
+
+def table_exists(name):
+    """Whether a registered table is available, as recorded by ensure_schema()"""
+    if _state.checked_at is None:
+        try:
+            ensure_schema()
+        except Exception as e:
+            print(f"Error checking schema: {e}")
+            return False
+    return _state.tables.get(name, False)
+
+
+def get_schema_state():
+    return _state.to_dict()
+
+
+def init_schema(app):
+    """Worker start: make sure every registered table exists before serving"""
+    if not app.config.get('DB_SCHEMA_BOOTSTRAP', True):
+        return
+
+    with app.app_context():
+        try:
+            state = ensure_schema()
+            if state['created']:
+                print(f"✅ Created missing tables: {', '.join(state['created'])}")
+        except Exception as e:
+            print(f"❌ Could not bootstrap schema: {e}")
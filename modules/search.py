@@ -0,0 +1,192 @@
+"""
+Search Module
+Full-text search over house titles and descriptions. On MySQL it uses the
+FULLTEXT index (MATCH ... AGAINST, natural language or boolean mode); on the
+SQLite backend the same searches run against an FTS5 table kept in sync by
+triggers. Both are created by migration 3 in modules/migrations.py.
+"""
+
+import re
+
+from modules.database import get_backend
+
+FTS_TABLE = 'houses_fts'
+FULLTEXT_INDEX = 'ft_houses_title_description'
+MIN_TOKEN_LENGTH = 3  # InnoDB's innodb_ft_min_token_size
+
+# InnoDB's default FULLTEXT stopwords, so both backends ignore the same words
+STOPWORDS = frozenset("""
+    a about an are as at be by com de en for from how i in is it la of on or
+    that the this to was what when where who will with und www
+""".split())
+
+SEARCH_MODES = ('natural', 'boolean')
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_BOOLEAN_TERM = re.compile(r'([+-]?)(?:"([^"]*)"|([^\s"]+))')
+_BOOLEAN_OPERATORS = re.compile(r'(^|\s)[+-]\S|\w\*|"')
+
+
+def tokenize(text):
+    """Lowercased words that a FULLTEXT index would match on"""
+    return [word for word in _WORD.findall((text or '').lower())
+            if len(word) >= MIN_TOKEN_LENGTH and word not in STOPWORDS]
+
+
+def detect_mode(term, requested=None):
+    """Use the requested mode, else boolean when the term uses +, -, * or quotes"""
+    if requested in SEARCH_MODES:
+        return requested
+    return 'boolean' if _BOOLEAN_OPERATORS.search(term or '') else 'natural'
+
+
+def parse_boolean(term):
+    """Split a boolean-mode query into (required, optional, excluded) terms.
+
+    Each term is (words, prefix): a quoted phrase has several words, word*
+    sets prefix.
+    """
+    required, optional, excluded = [], [], []
+    for sign, phrase, word in _BOOLEAN_TERM.findall(term or ''):
+        prefix = False
+        if phrase:
+            words = tokenize(phrase)
+        else:
+            prefix = word.endswith('*')
+            words = [w for w in _WORD.findall(word.lower()) if prefix or len(w) >= MIN_TOKEN_LENGTH]
+            words = [w for w in words if w not in STOPWORDS]
+        if not words:
+            continue
+        if sign == '+':
+            required.append((words, prefix))
+        elif sign == '-':
+            excluded.append((words, prefix))
+        else:
+            optional.append((words, prefix))
+    return required, optional, excluded
+
+
+def _fts_term(words, prefix):
+    quoted = ' '.join(f'"{word}"' for word in words)
+    return f"{quoted}*" if prefix and len(words) == 1 else quoted
+
+
+def fts_query(term, mode):
+    """FTS5 MATCH expression for a search, or None when nothing is searchable"""
+    if mode == 'boolean':
+        required, optional, excluded = parse_boolean(term)
+        positive = ' AND '.join(_fts_term(*t) for t in required) if required else \
+            ' OR '.join(_fts_term(*t) for t in optional)
+        if not positive:
+            return None
+        query = f"({positive})"
+        for t in excluded:
+            query += f" NOT {_fts_term(*t)}"
+        return query
+
+    tokens = tokenize(term)
+    return ' OR '.join(f'"{token}"' for token in dict.fromkeys(tokens)) or None
+
+
+def boolean_query(term):
+    """Boolean-mode text for MySQL, rebuilt from parsed terms so stray operators can't error"""
+    required, optional, excluded = parse_boolean(term)
+    if not required and not optional:
+        return None
+    parts = []
+    for sign, terms in (('+', required), ('', optional), ('-', excluded)):
+        for words, prefix in terms:
+            text = f'"{" ".join(words)}"' if len(words) > 1 else words[0] + ('*' if prefix else '')
+            parts.append(sign + text)
+    return ' '.join(parts)
+
+
+class TextSearch:
+    """SQL fragments for one search, to splice into a listing query.
+
+    select_sql adds a relevance column, join_sql goes after the FROM/JOINs,
+    where_sql after WHERE 1=1, and relevance_sql is the sort expression for
+    the 'relevance' sort. Each comes with its own params.
+    """
+
+    def __init__(self, mode, select=('', []), join=('', []), where=('', []), relevance=('', [])):
+        self.mode = mode
+        self.select_sql, self.select_params = select
+        self.join_sql, self.join_params = join
+        self.where_sql, self.where_params = where
+        self.relevance_sql, self.relevance_params = relevance
+
+
+def build_text_search(term, mode=None):
+    """A TextSearch for a user's search box input, or None when it has no searchable words"""
+    mode = detect_mode(term, mode)
+
+    if get_backend() == 'sqlite':
+        match = fts_query(term, mode)
+        if match is None:
+            return None
+        join = (f"""
+            JOIN (SELECT rowid AS house_id, ROUND(-bm25({FTS_TABLE}), 6) AS relevance
+                  FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s) ft ON ft.house_id = h.id""", [match])
+        return TextSearch(mode, select=(", ft.relevance AS relevance", []), join=join,
+                          relevance=("ft.relevance", []))
+
+    against = boolean_query(term) if mode == 'boolean' else (term if tokenize(term) else None)
+    if against is None:
+        return None
+    # List views read listing_read_model, so the FULLTEXT index is reached
+    # through houses by primary key; h may be either table
+    match = f"MATCH(ft.title, ft.description) AGAINST (%s IN {'BOOLEAN' if mode == 'boolean' else 'NATURAL LANGUAGE'} MODE)"
+    relevance = f"ROUND({match}, 6)"
+    return TextSearch(mode, select=(f", {relevance} AS relevance", [against]),
+                      join=(" JOIN houses ft ON ft.id = h.id", []),
+                      where=(f" AND {match}", [against]),
+                      relevance=(relevance, [against]))
+
+
+def create_fulltext_search():
+    """Migration step: FULLTEXT index on MySQL, FTS5 table + sync triggers on SQLite"""
+
+    def step(cursor):
+        if get_backend() == 'sqlite':
+            cursor.execute(f"SELECT name FROM sqlite_master WHERE name = '{FTS_TABLE}'")
+            if cursor.fetchone():
+                return False
+            cursor.execute(f"""
+                CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+                    title, description, content='houses', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER houses_fts_insert AFTER INSERT ON houses BEGIN
+                    INSERT INTO {FTS_TABLE} (rowid, title, description) VALUES (new.id, new.title, new.description);
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER houses_fts_delete AFTER DELETE ON houses BEGIN
+                    INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, description)
+                    VALUES ('delete', old.id, old.title, old.description);
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER houses_fts_update AFTER UPDATE OF title, description ON houses BEGIN
+                    INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, description)
+                    VALUES ('delete', old.id, old.title, old.description);
+                    INSERT INTO {FTS_TABLE} (rowid, title, description) VALUES (new.id, new.title, new.description);
+                END
+            """)
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+            return True
+
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'houses' AND INDEX_NAME = %s
+        """, (FULLTEXT_INDEX,))
+        if cursor.fetchone()[0]:
+            return False
+        cursor.execute(f"CREATE FULLTEXT INDEX {FULLTEXT_INDEX} ON houses (title, description)")
+        return True
+
+    step.description = f"fulltext {FULLTEXT_INDEX} on houses(title, description)"
+    return step
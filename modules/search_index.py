@@ -0,0 +1,512 @@
+"""
+Search Index Module
+Per-worker, in-memory index of the listings that answers /houses filter,
+sort and text queries without running them in the database. Listings are
+held in compact parallel arrays (one slot per house) with a token -> posting
+list inverted index over title and description; each sort option keeps a
+presorted order, so a page is a short walk from the cursor. Region and type
+filters have posting lists of their own and price ranges are a slice of the
+price order; a query starts from the smallest of them and only walks the sort
+order when its matches are too many to sort directly. The database is then
+only asked for the cards of the page's ids, by primary key.
+
+The index follows writes through modules/listing_events.py and re-reads just
+the houses that changed; their slots are moved within the sort orders and
+postings rather than everything being re-sorted.
+"""
+
+import math
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from decimal import Decimal
+
+from modules.database import get_db_connection, _get_setting
+from modules.listing_events import load_snapshot, poll_listing_changes, subscribe
+from modules.pagination import DEFAULT_SORT, SORT_KEYS, Page, decode_cursor
+from modules.search import detect_mode, parse_boolean, tokenize
+
+# Full descriptions come from houses, ranks for the 'recommended' sort from
+# listing_read_model (modules/read_model.py)
+INDEX_COLUMNS = """
+    h.id, h.title, h.description, h.price, h.region_id, h.property_type, h.created_at,
+    COALESCE(rm.rank_score, 0) AS rank_score
+"""
+INDEX_FROM = "FROM houses h LEFT JOIN listing_read_model rm ON rm.id = h.id"
+LOAD_BATCH_SIZE = 1000
+# Walk the presorted order (checking each slot) when at least 1 in DENSE_MATCH
+# live listings match; fewer matches are sorted on their own
+DENSE_MATCH = 8
+
+
+def _timestamp(value):
+    return value.timestamp() if isinstance(value, datetime) else 0.0
+
+
+class ListingIndex:
+    """Columns, postings and sort orders for every listing in the table"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pending = set()               # house ids changed since the last refresh
+        self.loaded_at = None
+        self.load_ms = 0.0
+        self.refreshes = 0
+        self.queries = 0
+        self.scanned = 0                    # slots examined by search(), for the stats page
+        self._reset()
+
+    def _reset(self):
+        self.ids = array('i')
+        self.prices = array('d')
+        self.region_ids = array('i')        # 0 = no region
+        self.type_codes = array('H')        # index into self.types
+        self.created = array('d')           # epoch seconds
+        self.ranks = array('q')             # listing_read_model.rank_score
+        self.alive = bytearray()
+        self.titles = []
+        self.types = []
+        self._type_codes = {}
+        self._slot = {}                     # house id -> slot
+        self._row_tokens = []               # tokens per slot, to unindex on update
+        self.postings = {}                  # token -> array of slots, ascending
+        self.region_postings = {}           # region id -> array of live slots, ascending
+        self.type_postings = {}             # type code -> array of live slots, ascending
+        self.live = 0
+        self._vocabulary = None             # sorted tokens, for prefix* searches
+        self._orders = {}                   # sort -> (slots, keys), in display order
+        self._sort_keys = self._key_functions()
+
+    # -- loading and refresh -------------------------------------------------
+
+    def load(self):
+        """(Re)build from the houses table"""
+        started = time.perf_counter()
+        with self._lock:
+            self._reset()
+            load_snapshot(f"SELECT {INDEX_COLUMNS} {INDEX_FROM} ORDER BY h.id", self._put, LOAD_BATCH_SIZE)
+        self.loaded_at = datetime.now()
+        self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+        return len(self._slot)
+
+    def _type_code(self, property_type):
+        code = self._type_codes.get(property_type)
+        if code is None:
+            code = self._type_codes[property_type] = len(self.types)
+            self.types.append(property_type)
+        return code
+
+    def _put(self, row):
+        """Insert or overwrite one house"""
+        tokens = tuple(sys.intern(t) for t in dict.fromkeys(
+            tokenize(f"{row['title'] or ''} {row['description'] or ''}")))
+        slot = self._slot.get(row['id'])
+        if slot is None:
+            slot = len(self.ids)
+            self._slot[row['id']] = slot
+            self.ids.append(row['id'])
+            self.prices.append(0.0)
+            self.region_ids.append(0)
+            self.type_codes.append(0)
+            self.created.append(0.0)
+            self.ranks.append(0)
+            self.alive.append(0)
+            self.titles.append('')
+            self._row_tokens.append(())
+        else:
+            self._unindex(slot)
+            if self.alive[slot]:
+                self._unfile(slot)
+
+        self.prices[slot] = float(row['price'] or 0)
+        self.region_ids[slot] = row['region_id'] or 0
+        self.type_codes[slot] = self._type_code(row['property_type'])
+        self.created[slot] = _timestamp(row['created_at'])
+        self.ranks[slot] = int(row['rank_score'] or 0)
+        self.titles[slot] = row['title'] or ''
+        self.alive[slot] = 1
+        self._row_tokens[slot] = tokens
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                self.postings[token] = array('i', [slot])
+                self._vocabulary = None
+            else:
+                insort(posting, slot)
+        self._file(slot)
+
+    def _file(self, slot):
+        """Add a live slot to the field postings and every sort order built so far"""
+        insort(self.region_postings.setdefault(self.region_ids[slot], array('i')), slot)
+        insort(self.type_postings.setdefault(self.type_codes[slot], array('i')), slot)
+        for sort, (slots, keys) in self._orders.items():
+            key = self._sort_keys[sort](slot)
+            i = bisect_left(keys, key)
+            keys.insert(i, key)
+            slots.insert(i, slot)
+        self.live += 1
+
+    def _unfile(self, slot):
+        """Take a slot out of the field postings and sort orders, before its columns change"""
+        for postings, value in ((self.region_postings, self.region_ids[slot]),
+                                (self.type_postings, self.type_codes[slot])):
+            posting = postings[value]
+            del posting[bisect_left(posting, slot)]
+            if not posting:
+                del postings[value]
+        for sort, (slots, keys) in self._orders.items():
+            i = bisect_left(keys, self._sort_keys[sort](slot))
+            del keys[i]
+            del slots[i]
+        self.live -= 1
+
+    def _unindex(self, slot):
+        for token in self._row_tokens[slot]:
+            posting = self.postings[token]
+            del posting[bisect_left(posting, slot)]
+            if not posting:
+                del self.postings[token]
+                self._vocabulary = None
+        self._row_tokens[slot] = ()
+
+    def _remove(self, house_id):
+        slot = self._slot.get(house_id)
+        if slot is not None and self.alive[slot]:
+            self._unindex(slot)
+            self._unfile(slot)
+            self.alive[slot] = 0
+
+    def mark_changed(self, changes):
+        """listing_events subscriber: note which houses to re-read"""
+        with self._lock:
+            self._pending.update(house_id for house_id, _ in changes)
+
+    def refresh(self):
+        """Re-read the houses that changed (here or, via the feed, in another worker)"""
+        poll_listing_changes()
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if not pending:
+            return 0
+
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            ids = sorted(pending)
+            cursor.execute(f"SELECT {INDEX_COLUMNS} {INDEX_FROM} WHERE h.id IN ({', '.join(['%s'] * len(ids))})",
+                           ids)
+            rows = cursor.fetchall()
+        except Exception:
+            with self._lock:
+                self._pending.update(pending)
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+        with self._lock:
+            found = set()
+            for row in rows:
+                self._put(row)
+                found.add(row['id'])
+            for house_id in pending - found:
+                self._remove(house_id)
+            self.refreshes += 1
+        return len(pending)
+
+    # -- querying ------------------------------------------------------------
+
+    def _key_functions(self):
+        """sort -> slot's display-order key; keys are unique (the id breaks ties)"""
+        ids, prices, created, titles, ranks = self.ids, self.prices, self.created, self.titles, self.ranks
+        return {
+            'recommended': lambda s: (-ranks[s], -ids[s]),
+            'newest': lambda s: (-created[s], -ids[s]),
+            'price_low': lambda s: (prices[s], ids[s]),
+            'price_high': lambda s: (-prices[s], -ids[s]),
+            # Case-insensitive, like MySQL's collation and listing_cache's page bounds
+            'name': lambda s: (titles[s].casefold(), ids[s]),
+        }
+
+    def _order(self, sort):
+        """(slots, keys) for a sort, in display order; keys ascend along it.
+
+        Built on first use, then kept in step by _file() and _unfile().
+        """
+        order = self._orders.get(sort)
+        if order is None:
+            live = [slot for slot in range(len(self.ids)) if self.alive[slot]]
+            key = self._sort_keys[sort]
+            live.sort(key=key)
+            order = self._orders[sort] = (live, [key(slot) for slot in live])
+        return order
+
+    def _candidates(self, scores, region_id, type_code, min_price, max_price):
+        """Slots passing the text and field filters, or None when nothing filters.
+
+        Starts from the smallest of the text matches, the region and type
+        postings and the price order's slice for the range, and checks the
+        remaining filters against the columns.
+        """
+        sources = []
+        if scores is not None:
+            sources.append(scores)
+        if region_id is not None:
+            sources.append(self.region_postings.get(region_id, ()))
+        if type_code is not None:
+            sources.append(self.type_postings.get(type_code, ()))
+        if min_price is not None or max_price is not None:
+            slots, keys = self._order('price_low')
+            low = bisect_left(keys, (min_price,)) if min_price is not None else 0
+            high = bisect_right(keys, (max_price, math.inf)) if max_price is not None else len(keys)
+            sources.append(slots[low:high])
+        if not sources:
+            return None
+
+        smallest = min(sources, key=len)
+        self.scanned += len(smallest)
+        prices, region_ids, type_codes = self.prices, self.region_ids, self.type_codes
+        return {slot for slot in smallest
+                if (scores is None or slot in scores)
+                and (region_id is None or region_ids[slot] == region_id)
+                and (type_code is None or type_codes[slot] == type_code)
+                and (min_price is None or prices[slot] >= min_price)
+                and (max_price is None or prices[slot] <= max_price)}
+
+    def _cursor_key(self, sort, value, house_id):
+        """The display-order key of a cursor position"""
+        if sort == 'newest':
+            return (-value.timestamp(), -house_id)
+        if sort == 'price_low':
+            return (float(value), house_id)
+        if sort == 'price_high':
+            return (-float(value), -house_id)
+        if sort in ('relevance', 'recommended'):
+            return (-value, -house_id)
+        return (str(value).casefold(), house_id)
+
+    def _expand(self, words, prefix):
+        """Slots containing a (possibly prefix*) word or every word of a phrase"""
+        if prefix and len(words) == 1:
+            if self._vocabulary is None:
+                self._vocabulary = sorted(self.postings)
+            start = bisect_left(self._vocabulary, words[0])
+            slots = set()
+            for token in self._vocabulary[start:]:
+                if not token.startswith(words[0]):
+                    break
+                slots.update(self.postings[token])
+            return slots
+        # Phrases match when every word is present; positions are not indexed
+        result = None
+        for word in words:
+            posting = set(self.postings.get(word, ()))
+            result = posting if result is None else result & posting
+        return result or set()
+
+    def _idf(self, token):
+        live = len(self._slot) or 1
+        return math.log(1 + live / (1 + len(self.postings.get(token, ()))))
+
+    def _text_matches(self, term, mode):
+        """{slot: score} for a search, or None when the term has no indexable words"""
+        if mode == 'boolean':
+            required, optional, excluded = parse_boolean(term)
+            if not required and not optional:
+                return None
+            matches = None
+            for words, prefix in required:
+                slots = self._expand(words, prefix)
+                matches = slots if matches is None else matches & slots
+            if matches is None:
+                matches = set()
+                for words, prefix in optional:
+                    matches |= self._expand(words, prefix)
+            for words, prefix in excluded:
+                matches -= self._expand(words, prefix)
+            scored = required + optional
+        else:
+            tokens = list(dict.fromkeys(tokenize(term)))
+            if not tokens:
+                return None
+            matches = set()
+            for token in tokens:
+                matches.update(self.postings.get(token, ()))
+            scored = [([token], False) for token in tokens]
+
+        scores = dict.fromkeys(matches, 0.0)
+        for words, prefix in scored:
+            weight = sum(self._idf(word) for word in words)
+            for slot in self._expand(words, prefix) & matches:
+                scores[slot] += weight
+        return scores
+
+    def search(self, filters, term='', mode=None, sort=DEFAULT_SORT, cursor_token='', size=24):
+        """A Page of {'id', sort field} rows, or None when the index can't answer.
+
+        filters: region_id, property_type, min_price, max_price (all optional).
+        """
+        with self._lock:
+            self.queries += 1
+            scores = None
+            if term.strip():
+                mode = detect_mode(term, mode)
+                scores = self._text_matches(term, mode)
+                if scores is None:
+                    return None
+            if sort not in SORT_KEYS or sort == 'distance' or (sort == 'relevance' and scores is None):
+                sort = DEFAULT_SORT
+
+            region_id = filters.get('region_id')
+            type_code = self._type_codes.get(filters.get('property_type'), -1) \
+                if filters.get('property_type') else None
+            min_price, max_price = filters.get('min_price'), filters.get('max_price')
+            wanted = self._candidates(scores, region_id, type_code, min_price, max_price)
+
+            if sort == 'relevance':
+                key = lambda s: (-round(scores[s], 6), -self.ids[s])
+            elif wanted is not None and len(wanted) * DENSE_MATCH < self.live:
+                key = self._sort_keys[sort]
+            else:
+                key = None
+            if key is not None:
+                # Few enough matches to sort them and skip the walk's checks
+                slots = sorted(wanted, key=key)
+                keys = [key(slot) for slot in slots]
+                wanted = None
+            else:
+                slots, keys = self._order(sort)
+
+            position = decode_cursor(cursor_token, sort)
+            picked = []
+            if position is None or position[0] == 'next':
+                start = bisect_right(keys, self._cursor_key(sort, *position[1:])) if position else 0
+                for i in range(start, len(slots)):
+                    self.scanned += 1
+                    if wanted is None or slots[i] in wanted:
+                        picked.append(slots[i])
+                        if len(picked) > size:
+                            break
+                more = len(picked) > size
+                picked = picked[:size]
+                has_next, has_prev = more, position is not None
+            else:
+                start = bisect_left(keys, self._cursor_key(sort, *position[1:]))
+                for i in range(start - 1, -1, -1):
+                    self.scanned += 1
+                    if wanted is None or slots[i] in wanted:
+                        picked.append(slots[i])
+                        if len(picked) > size:
+                            break
+                more = len(picked) > size
+                picked = picked[:size][::-1]
+                has_next, has_prev = True, more
+
+            rows = [self._row(slot, scores) for slot in picked]
+            return Page(rows, sort, has_next=has_next, has_prev=has_prev, size=size)
+
+    def facet_cube(self, term, mode, min_price, max_price, bucket_of):
+        """{(region_id, property_type, bucket, in price range): count} for a search.
+
+        Same shape as the GROUP BY in modules/facets.py; None when the term
+        has no indexable words.
+        """
+        with self._lock:
+            slots = range(len(self.ids))
+            if term.strip():
+                scores = self._text_matches(term, detect_mode(term, mode))
+                if scores is None:
+                    return None
+                slots = scores
+            cube = {}
+            alive, prices, region_ids, type_codes, types = \
+                self.alive, self.prices, self.region_ids, self.type_codes, self.types
+            for slot in slots:
+                if not alive[slot]:
+                    continue
+                price = prices[slot]
+                key = (region_ids[slot] or None, types[type_codes[slot]], bucket_of(price),
+                       (min_price is None or price >= min_price) and (max_price is None or price <= max_price))
+                cube[key] = cube.get(key, 0) + 1
+            return cube
+
+    def _row(self, slot, scores):
+        return {
+            'id': self.ids[slot],
+            'created_at': datetime.fromtimestamp(self.created[slot]),
+            'price': Decimal(repr(self.prices[slot])),
+            'title': self.titles[slot],
+            'rank_score': self.ranks[slot],
+            'relevance': round(scores[slot], 6) if scores else None,
+        }
+
+    # -- reporting -----------------------------------------------------------
+
+    def memory_report(self):
+        """Approximate bytes held by each structure"""
+        with self._lock:
+            columns = sum(sys.getsizeof(column) for column in
+                          (self.ids, self.prices, self.region_ids, self.type_codes, self.created, self.ranks,
+                           self.alive))
+            postings = sys.getsizeof(self.postings) + sum(
+                sys.getsizeof(token) + sys.getsizeof(posting) for token, posting in self.postings.items())
+            titles = sys.getsizeof(self.titles) + sum(sys.getsizeof(title) for title in self.titles)
+            row_tokens = sys.getsizeof(self._row_tokens) + sum(sys.getsizeof(t) for t in self._row_tokens)
+            lookup = sys.getsizeof(self._slot)
+            orders = sum(sys.getsizeof(slots) + sys.getsizeof(keys) +
+                         sum(sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key) for key in keys)
+                         for slots, keys in self._orders.values())
+            report = {
+                'listings': len(self._slot),
+                'live_listings': self.live,
+                'tokens': len(self.postings),
+                'postings': sum(len(posting) for posting in self.postings.values()),
+                'bytes': {
+                    'columns': columns,
+                    'postings': postings,
+                    'titles': titles,
+                    'row_tokens': row_tokens,
+                    'id_lookup': lookup,
+                    'sort_orders': orders,
+                },
+                'loaded_at': self.loaded_at.isoformat(timespec='seconds') if self.loaded_at else None,
+                'load_ms': self.load_ms,
+                'refreshes': self.refreshes,
+                'queries': self.queries,
+                'scanned': self.scanned,
+                'pending': len(self._pending),
+            }
+            report['total_bytes'] = sum(report['bytes'].values())
+            return report
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def search_index_enabled():
+    return str(_get_setting('SEARCH_INDEX_ENABLED', 'SEARCH_INDEX_ENABLED', 'true')).lower() == 'true'
+
+
+def get_listing_index():
+    """This worker's index, loaded on first use and refreshed; None when disabled"""
+    global _index
+    if not search_index_enabled():
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = ListingIndex()
+                subscribe(index.mark_changed)
+                index.load()
+                _index = index
+                print(f"🔎 Search index loaded: {len(index._slot)} listings in {index.load_ms} ms")
+    _index.refresh()
+    return _index
+
+
+def get_search_index_stats():
+    return _index.memory_report() if _index is not None else None
@@ -0,0 +1,384 @@
+"""
+SQLite Backend Module
+Drop-in replacement for mysql.connector connections so the app, the schema
+registry and the test/benchmark suite run without a MySQL server. Queries are
+written for MySQL; translate() rewrites the constructs this codebase uses.
+"""
+
+import datetime
+import decimal
+import functools
+import math
+import pathlib
+import re
+import sqlite3
+from mysql.connector import errors
+
+# MySQL returns datetime/date/Decimal objects; keep templates and callers unaware
+sqlite3.register_adapter(datetime.datetime, lambda value: value.strftime('%Y-%m-%d %H:%M:%S'))
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_adapter(decimal.Decimal, float)
+
+
+def _convert_timestamp(value):
+    text = value.decode()
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return text
+
+
+def _convert_date(value):
+    try:
+        return datetime.date.fromisoformat(value.decode()[:10])
+    except ValueError:
+        return value.decode()
+
+
+sqlite3.register_converter('TIMESTAMP', _convert_timestamp)
+sqlite3.register_converter('DATETIME', _convert_timestamp)
+sqlite3.register_converter('DATE', _convert_date)
+sqlite3.register_converter('DECIMAL', lambda value: decimal.Decimal(value.decode()))
+
+NOW = "datetime('now', 'localtime')"
+TODAY = "date('now', 'localtime')"
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_INTERVAL_UNITS = {
+    'SECOND': 'seconds', 'MINUTE': 'minutes', 'HOUR': 'hours',
+    'DAY': 'days', 'MONTH': 'months', 'YEAR': 'years',
+}
+_DATE_ARITHMETIC = re.compile(
+    r"\b(DATE_SUB|DATE_ADD)\(\s*(NOW\(\)|CURRENT_TIMESTAMP|CURRENT_DATE|CURDATE\(\)|[\w.]+)\s*,"
+    r"\s*INTERVAL\s+(\d+|\?)\s+(SECOND|MINUTE|HOUR|DAY|WEEK|MONTH|YEAR)\s*\)",
+    re.IGNORECASE,
+)
+_UPSERT = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_UPSERT_VALUES = re.compile(r"\bVALUES\(\s*(\w+)\s*\)", re.IGNORECASE)
+_REWRITES = [
+    (re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE), 'INSERT OR IGNORE'),
+    (re.compile(r"\bNOW\(\)|\bCURRENT_TIMESTAMP\b(?!\s*\()", re.IGNORECASE), NOW),
+    (re.compile(r"\bCURDATE\(\)|\bCURRENT_DATE\b", re.IGNORECASE), TODAY),
+]
+
+
+def _date_arithmetic(match):
+    function, base, amount, unit = match.groups()
+    sign = '-' if function.upper() == 'DATE_SUB' else '+'
+    unit = unit.upper()
+    if unit == 'WEEK':
+        unit, amount = 'DAY', amount if amount == '?' else str(int(amount) * 7)
+    upper = base.upper()
+    if upper in ('CURRENT_DATE', 'CURDATE()'):
+        call, base = 'date', "'now', 'localtime'"
+    elif upper in ('NOW()', 'CURRENT_TIMESTAMP'):
+        call, base = 'datetime', "'now', 'localtime'"
+    else:
+        call = 'datetime'
+    if amount == '?':
+        modifier = f"'{sign}' || ? || ' {_INTERVAL_UNITS[unit]}'"
+    else:
+        modifier = f"'{sign}{amount} {_INTERVAL_UNITS[unit]}'"
+    return f"{call}({base}, {modifier})"
+
+
+def _translate_code(code, upsert):
+    """Rewrite one stretch of SQL that contains no string literals"""
+    code = code.replace('%s', '?')
+    code = _DATE_ARITHMETIC.sub(_date_arithmetic, code)
+    for pattern, replacement in _REWRITES:
+        code = pattern.sub(replacement, code)
+    if upsert[0] or _UPSERT.search(code):
+        code = _UPSERT.sub('ON CONFLICT DO UPDATE SET', code)
+        head, sep, tail = code.partition('ON CONFLICT DO UPDATE SET')
+        if sep:
+            upsert[0] = True
+            code = head + sep + _UPSERT_VALUES.sub(r'excluded.\1', tail)
+        else:
+            code = _UPSERT_VALUES.sub(r'excluded.\1', code)
+    return code
+
+
+@functools.lru_cache(maxsize=1024)
+def translate(sql):
+    """Rewrite a MySQL statement (as written in this codebase) for SQLite"""
+    parts = []
+    upsert = [False]
+    position = 0
+    for match in _STRING.finditer(sql):
+        parts.append(_translate_code(sql[position:match.start()], upsert))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(_translate_code(sql[position:], upsert))
+    return ''.join(parts)
+
+
+_CREATE_TABLE = re.compile(r"^\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\(", re.IGNORECASE)
+_INDEX_ITEM = re.compile(r"^(UNIQUE\s+)?(INDEX|KEY|FULLTEXT(?:\s+INDEX|\s+KEY)?)\s+`?(\w+)`?\s*\((.*)\)$",
+                         re.IGNORECASE | re.DOTALL)
+_COLUMN_REWRITES = [
+    (re.compile(r"\bINT(EGER)?\s+(UNSIGNED\s+)?(NOT\s+NULL\s+)?AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.IGNORECASE),
+     'INTEGER PRIMARY KEY AUTOINCREMENT'),
+    (re.compile(r"\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP\b", re.IGNORECASE), ''),
+    (re.compile(r"\bDEFAULT\s+CURRENT_TIMESTAMP\b", re.IGNORECASE), f"DEFAULT ({NOW})"),
+    (re.compile(r"\bUNSIGNED\b", re.IGNORECASE), ''),
+    (re.compile(r"\bJSON\b|\bENUM\s*\([^)]*\)", re.IGNORECASE), 'TEXT'),
+]
+
+
+def _split_items(body):
+    """Split a CREATE TABLE body on top-level commas"""
+    items, depth, current = [], 0, ''
+    for char in body:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0:
+            items.append(current.strip())
+            current = ''
+        else:
+            current += char
+    if current.strip():
+        items.append(current.strip())
+    return items
+
+
+def translate_ddl(sql):
+    """Rewrite a MySQL CREATE TABLE into SQLite statements.
+
+    Inline INDEX/KEY definitions become separate CREATE INDEX statements
+    (prefixed with the table name, as SQLite index names are database-wide);
+    FULLTEXT indexes are dropped.
+    """
+    match = _CREATE_TABLE.match(sql)
+    table = match.group(2)
+    body = sql[match.end():sql.rindex(')')]
+
+    columns, indexes = [], []
+    for item in _split_items(body):
+        index = _INDEX_ITEM.match(item)
+        if index:
+            unique, kind, name, cols = index.groups()
+            if kind.upper().startswith('FULLTEXT'):
+                continue
+            if unique:
+                columns.append(f"UNIQUE ({cols})")
+            else:
+                indexes.append(f"CREATE INDEX IF NOT EXISTS {table}_{name} ON {table} ({cols})")
+            continue
+        for pattern, replacement in _COLUMN_REWRITES:
+            item = pattern.sub(replacement, item)
+        columns.append(item)
+
+    create = f"CREATE TABLE {match.group(1) or ''}{table} (\n    " + ",\n    ".join(columns) + "\n)"
+    return [create] + indexes
+
+
+# MySQL DATE_FORMAT specifiers that differ from strftime
+_DATE_FORMAT_CODES = {'%i': '%M', '%s': '%S', '%M': '%B', '%W': '%A', '%e': '%d'}
+
+
+def _date_format(value, fmt):
+    if value is None or fmt is None:
+        return None
+    parsed = _convert_timestamp(str(value).encode())
+    if isinstance(parsed, str):
+        return None
+    fmt = re.sub(r'%[A-Za-z]', lambda code: _DATE_FORMAT_CODES.get(code.group(0), code.group(0)), fmt)
+    return parsed.strftime(fmt)
+
+
+def _date_part(part):
+    def extract(value):
+        if value is None:
+            return None
+        parsed = _convert_timestamp(str(value).encode())
+        return None if isinstance(parsed, str) else getattr(parsed, part)
+    return extract
+
+
+def _math(function):
+    def apply(*args):
+        if None in args:
+            return None
+        try:
+            return function(*map(float, args))
+        except (ValueError, OverflowError):
+            return None
+    return apply
+
+
+# Used by the geo distance expression (modules/geo.py); only registered when
+# the SQLite build lacks its own math functions
+_MATH_FUNCTIONS = {
+    'RADIANS': (1, _math(math.radians)),
+    'SIN': (1, _math(math.sin)),
+    'COS': (1, _math(math.cos)),
+    'ASIN': (1, _math(math.asin)),
+    'SQRT': (1, _math(math.sqrt)),
+    'POWER': (2, _math(math.pow)),
+}
+
+
+def _wrap_error(error):
+    """Re-raise sqlite3 errors as their mysql.connector equivalents"""
+    message = str(error)
+    if isinstance(error, sqlite3.IntegrityError):
+        wrapped = errors.IntegrityError(msg=message)
+    elif isinstance(error, sqlite3.OperationalError):
+        if 'locked' in message or 'unable to open' in message:
+            wrapped = errors.OperationalError(msg=message)
+        else:
+            wrapped = errors.ProgrammingError(msg=message)
+    elif isinstance(error, sqlite3.ProgrammingError):
+        wrapped = errors.ProgrammingError(msg=message)
+    else:
+        wrapped = errors.DatabaseError(msg=message)
+    return wrapped
+
+
+class SQLiteCursor:
+    """mysql.connector-style cursor: %s placeholders, dictionary rows"""
+
+    def __init__(self, conn, dictionary=False):
+        self._cursor = conn.cursor()
+        self._dictionary = dictionary
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def column_names(self):
+        return tuple(column[0] for column in self._cursor.description or ())
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def execute(self, operation, params=()):
+        try:
+            if _CREATE_TABLE.match(operation):
+                for statement in translate_ddl(operation):
+                    self._cursor.execute(statement)
+            else:
+                self._cursor.execute(translate(operation), tuple(params or ()))
+        except sqlite3.Error as e:
+            raise _wrap_error(e) from e
+
+    def executemany(self, operation, seq_params):
+        try:
+            self._cursor.executemany(translate(operation), [tuple(params) for params in seq_params])
+        except sqlite3.Error as e:
+            raise _wrap_error(e) from e
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        for row in self._cursor:
+            yield self._row(row)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """mysql.connector-style connection over a SQLite database file"""
+
+    unread_result = False
+
+    def __init__(self, path, read_only=False, timeout=30):
+        if read_only and path != ':memory:':
+            target, uri = pathlib.Path(path).absolute().as_uri() + '?mode=ro', True
+        else:
+            target, uri = path, path.startswith('file:')
+        try:
+            self._conn = sqlite3.connect(target, uri=uri, timeout=timeout, isolation_level=None,
+                                         check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        except sqlite3.Error as e:
+            raise _wrap_error(e) from e
+        self.read_only = read_only
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if not read_only:
+            # Readers never block the writer (and the read-only replica handle)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.create_function('DATE_FORMAT', 2, _date_format, deterministic=True)
+        self._conn.create_function('YEAR', 1, _date_part('year'), deterministic=True)
+        self._conn.create_function('MONTH', 1, _date_part('month'), deterministic=True)
+        self._conn.create_function('DAY', 1, _date_part('day'), deterministic=True)
+        try:
+            self._conn.execute("SELECT RADIANS(0), SIN(0), COS(0), ASIN(0), SQRT(1), POWER(2, 2)")
+        except sqlite3.OperationalError:
+            for name, (arity, function) in _MATH_FUNCTIONS.items():
+                self._conn.create_function(name, arity, function, deterministic=True)
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def cursor(self, dictionary=False, buffered=None, **kwargs):
+        return SQLiteCursor(self._conn, dictionary=dictionary)
+
+    def commit(self):
+        if self._conn.in_transaction:
+            self._conn.commit()
+
+    def rollback(self):
+        if self._conn.in_transaction:
+            self._conn.rollback()
+
+    def consume_results(self):
+        pass
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        try:
+            self._conn.execute("SELECT 1")
+        except sqlite3.Error as e:
+            raise _wrap_error(e) from e
+
+    def close(self):
+        self._conn.close()
+
+
+def connect(path, read_only=False, timeout=30):
+    return SQLiteConnection(path, read_only=read_only, timeout=timeout)
+
+
+def list_tables(cursor):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def list_columns(cursor, table):
+    cursor.execute(f"SELECT name FROM pragma_table_info('{table}')")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def list_indexes(cursor, table):
+    """Map index name -> tuple of column names, like information_schema.STATISTICS"""
+    cursor.execute(f"SELECT name FROM pragma_index_list('{table}')")
+    names = [row[0] for row in cursor.fetchall()]
+    indexes = {}
+    for name in names:
+        cursor.execute(f"SELECT name FROM pragma_index_info('{name}') ORDER BY seqno")
+        indexes[name] = tuple(row[0] for row in cursor.fetchall())
+    return indexes
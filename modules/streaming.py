@@ -0,0 +1,64 @@
+"""
+Streaming Module
+Render large admin listings without loading every row: stream_rows() reads
+from an unbuffered (server-side) cursor in batches and stream_page() feeds
+the rows through stream_template so memory stays flat as tables grow.
+"""
+
+from flask import get_flashed_messages, stream_template
+from modules.database import get_db_connection
+
+STREAM_BATCH_SIZE = 500
+
+
+def stream_rows(query, params=(), batch_size=STREAM_BATCH_SIZE, readonly=False):
+    """Run a query now and return a generator over its rows (as dicts).
+
+    The statement executes before this returns, so query errors surface in
+    the view. Rows are then pulled off the wire batch_size at a time. Nothing
+    else may use the request's connection until the generator is exhausted
+    or closed.
+    """
+    conn = get_db_connection(readonly=readonly)
+    cursor = conn.cursor(dictionary=True, buffered=False)
+    try:
+        cursor.execute(query, params)
+    except Exception:
+        cursor.close()
+        conn.close()
+        raise
+
+    def rows():
+        try:
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield from batch
+        finally:
+            cursor.close()
+            conn.close()
+
+    return rows()
+
+
+def count_rows(query, params=(), readonly=False):
+    """Run a SELECT COUNT(*) style query and return the number"""
+    conn = get_db_connection(readonly=readonly)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def stream_page(template_name, **context):
+    """Stream a template response.
+
+    Flashed messages are read up front: the session cookie is sent before the
+    body, so popping them while the template streams would not stick.
+    """
+    get_flashed_messages(with_categories=True)
+    return stream_template(template_name, **context)
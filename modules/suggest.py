@@ -0,0 +1,323 @@
+"""
+Suggest Module
+Autocomplete for the search box. Each worker keeps a prefix trie over house
+titles, region and neighborhood names and the chatbot's property-type and
+region keywords (PROPERTY_TYPE_MAPPING / REGION_MAPPING in user_routes). Every
+word of a phrase starts a key, so "leg" finds "East Legon". Suggestions are
+ranked by how many listings they lead to; each trie node caches its top
+completions, merged from its children's, so a lookup is a walk down the
+typed prefix.
+
+Listing writes (modules/listing_events.py) re-read just the changed houses
+and adjust the counts along the affected paths.
+"""
+
+import re
+import threading
+import time
+from datetime import datetime
+
+from modules.database import get_db_connection, _get_setting
+from modules.listing_events import load_snapshot, poll_listing_changes, subscribe
+from modules.reference_data import get_neighborhoods, get_regions
+
+SUGGEST_COLUMNS = "id, title, property_type, region_id, neighborhood_id"
+MAX_KEY_CHARS = 24          # keys are cut here; longer queries filter the node's completions
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+LOAD_BATCH_SIZE = 1000
+
+# Ties on listing count go to places and types before individual titles
+KIND_RANK = {'property_type': 0, 'region': 1, 'neighborhood': 2, 'keyword': 3, 'title': 4}
+
+
+def normalize(text):
+    return ' '.join(re.sub(r'[^\w#]+', ' ', (text or '').lower()).split())
+
+
+def _suffixes(phrase):
+    """The normalized phrase from each of its words on"""
+    words = normalize(phrase).split(' ')
+    return [' '.join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+def _keys(phrase):
+    return {suffix[:MAX_KEY_CHARS] for suffix in _suffixes(phrase)}
+
+
+class Suggestion:
+    """One completion; count is the number of listings it leads to"""
+
+    __slots__ = ('kind', 'label', 'value', 'count', 'keys')
+
+    def __init__(self, kind, label, value=None):
+        self.kind = kind
+        self.label = label
+        self.value = value
+        self.count = 0
+        self.keys = set()
+
+    def rank(self):
+        return (-self.count, KIND_RANK[self.kind], len(self.label), self.label)
+
+    def to_dict(self):
+        return {'text': self.label, 'kind': self.kind, 'value': self.value, 'count': self.count}
+
+
+class _Node:
+    __slots__ = ('children', 'suggestions', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.suggestions = set()    # completions whose key ends here
+        self.top = None             # cached best completions below here; None = stale
+
+
+class SuggestTrie:
+    """Prefix trie of suggestions, with per-house contributions for incremental updates"""
+
+    def __init__(self, limit=MAX_LIMIT):
+        self._lock = threading.RLock()
+        self._pending = set()
+        self.limit = limit
+        self.loaded_at = None
+        self.load_ms = 0.0
+        self.refreshes = 0
+        self.lookups = 0
+        self.visited = 0            # trie nodes lookups walked through
+        self.ranked = 0             # node rankings recomputed after a change
+        self._reset()
+
+    def _reset(self):
+        self.root = _Node()
+        self.nodes = 1
+        self.suggestions = {}       # (kind, key) -> Suggestion
+        self._houses = {}           # house id -> the suggestions it counts toward
+
+    # -- building ------------------------------------------------------------
+
+    def load(self):
+        """(Re)build from reference data, the keyword maps and the houses table"""
+        from modules.user_routes import PROPERTY_TYPE_MAPPING, REGION_MAPPING
+
+        started = time.perf_counter()
+        with self._lock:
+            self._reset()
+            regions = {region['id']: region['name'] for region in get_regions()}
+            for region_id, name in regions.items():
+                self._add_keys(self._suggestion('region', region_id, name), [name])
+            for neighborhood in get_neighborhoods():
+                self._add_keys(self._suggestion('neighborhood', neighborhood['id'], neighborhood['name']),
+                               [neighborhood['name']])
+            for property_type, keywords in PROPERTY_TYPE_MAPPING.items():
+                label = property_type.replace('_', ' ').title()
+                self._add_keys(self._suggestion('property_type', property_type, label), [label] + keywords)
+            for place, keywords in REGION_MAPPING.items():
+                # Aliases of a region we have ("kumasi" -> Ashanti); else a keyword of its own
+                region_id = next((rid for rid, name in regions.items()
+                                  if normalize(name) in keywords or place in normalize(name)), None)
+                if region_id is not None:
+                    self._add_keys(self.suggestions[('region', region_id)], keywords)
+                else:
+                    self._add_keys(self._suggestion('keyword', place, place.title()), keywords)
+
+            load_snapshot(f"SELECT {SUGGEST_COLUMNS} FROM houses ORDER BY id", self._put, LOAD_BATCH_SIZE)
+        self.loaded_at = datetime.now()
+        self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+        return len(self.suggestions)
+
+    def _suggestion(self, kind, key, label):
+        suggestion = self.suggestions.get((kind, key))
+        if suggestion is None:
+            suggestion = self.suggestions[(kind, key)] = Suggestion(kind, label, key)
+        return suggestion
+
+    def _path(self, key, create=False):
+        """Nodes from the root down to key (None if missing and not create)"""
+        node, path = self.root, [self.root]
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[char] = _Node()
+                self.nodes += 1
+            node = child
+            path.append(node)
+        return path
+
+    def _add_keys(self, suggestion, phrases):
+        for phrase in phrases:
+            for key in _keys(phrase) - suggestion.keys:
+                suggestion.keys.add(key)
+                path = self._path(key, create=True)
+                path[-1].suggestions.add(suggestion)
+                for node in path:
+                    node.top = None
+
+    def _remove_keys(self, suggestion):
+        for key in suggestion.keys:
+            path = self._path(key)
+            path[-1].suggestions.discard(suggestion)
+            for node in path:
+                node.top = None
+            # Prune the branch it leaves empty
+            for depth in range(len(path) - 1, 0, -1):
+                node = path[depth]
+                if node.children or node.suggestions:
+                    break
+                del path[depth - 1].children[key[depth - 1]]
+                self.nodes -= 1
+        suggestion.keys.clear()
+
+    def _count(self, suggestion, delta):
+        """Change a suggestion's listing count; its cached rankings are stale"""
+        suggestion.count += delta
+        for key in suggestion.keys:
+            for node in self._path(key):
+                node.top = None
+
+    def _put(self, row):
+        """Insert or overwrite one house's contributions"""
+        self._remove(row['id'])
+        counted = []
+        if row['title']:
+            title = self._suggestion('title', normalize(row['title']), row['title'])
+            if not title.keys:
+                self._add_keys(title, [row['title']])
+            counted.append(title)
+        for kind, key in (('property_type', row['property_type']), ('region', row['region_id']),
+                          ('neighborhood', row['neighborhood_id'])):
+            suggestion = self.suggestions.get((kind, key))
+            if suggestion is not None:
+                counted.append(suggestion)
+        for suggestion in counted:
+            self._count(suggestion, 1)
+        self._houses[row['id']] = counted
+
+    def _remove(self, house_id):
+        for suggestion in self._houses.pop(house_id, ()):
+            self._count(suggestion, -1)
+            if suggestion.kind == 'title' and suggestion.count == 0:
+                self._remove_keys(suggestion)
+                del self.suggestions[('title', suggestion.value)]
+
+    def mark_changed(self, changes):
+        """listing_events subscriber: note which houses to re-read"""
+        with self._lock:
+            self._pending.update(house_id for house_id, _ in changes)
+
+    def refresh(self):
+        """Re-read the houses that changed (here or, via the feed, in another worker)"""
+        poll_listing_changes()
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if not pending:
+            return 0
+
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            ids = sorted(pending)
+            cursor.execute(f"SELECT {SUGGEST_COLUMNS} FROM houses WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                           ids)
+            rows = cursor.fetchall()
+        except Exception:
+            with self._lock:
+                self._pending.update(pending)
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+        with self._lock:
+            found = set()
+            for row in rows:
+                self._put(row)
+                found.add(row['id'])
+            for house_id in pending - found:
+                self._remove(house_id)
+            self.refreshes += 1
+        return len(pending)
+
+    # -- querying ------------------------------------------------------------
+
+    def _top(self, node):
+        """Best self.limit completions at or below node, cached on the node"""
+        if node.top is None:
+            self.ranked += 1
+            candidates = set(node.suggestions)
+            for child in node.children.values():
+                candidates.update(self._top(child))
+            node.top = sorted(candidates, key=Suggestion.rank)[:self.limit]
+        return node.top
+
+    def suggest(self, prefix, limit=DEFAULT_LIMIT):
+        """Ranked completions of prefix, as dicts"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            self.lookups += 1
+            path = self._path(prefix[:MAX_KEY_CHARS])
+            if path is None:
+                return []
+            self.visited += len(path)
+            if len(prefix) <= MAX_KEY_CHARS:
+                found = self._top(path[-1])
+            else:
+                # Past the key length: check the full phrases under the node
+                found, stack = set(), [path[-1]]
+                while stack:
+                    node = stack.pop()
+                    self.visited += 1
+                    found.update(s for s in node.suggestions
+                                 if any(suffix.startswith(prefix) for suffix in _suffixes(s.label)))
+                    stack.extend(node.children.values())
+                found = sorted(found, key=Suggestion.rank)
+            return [suggestion.to_dict() for suggestion in found[:limit]]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'suggestions': len(self.suggestions),
+                'titles': sum(1 for kind, _ in self.suggestions if kind == 'title'),
+                'nodes': self.nodes,
+                'loaded_at': self.loaded_at.isoformat(timespec='seconds') if self.loaded_at else None,
+                'load_ms': self.load_ms,
+                'refreshes': self.refreshes,
+                'lookups': self.lookups,
+                'visited': self.visited,
+                'ranked': self.ranked,
+                'pending': len(self._pending),
+            }
+
+
+_trie = None
+_trie_lock = threading.Lock()
+
+
+def suggest_enabled():
+    return str(_get_setting('SUGGEST_ENABLED', 'SUGGEST_ENABLED', 'true')).lower() == 'true'
+
+
+def get_suggest_trie():
+    """This worker's trie, built on first use and refreshed; None when disabled"""
+    global _trie
+    if not suggest_enabled():
+        return None
+    if _trie is None:
+        with _trie_lock:
+            if _trie is None:
+                trie = SuggestTrie()
+                subscribe(trie.mark_changed)
+                trie.load()
+                _trie = trie
+                print(f"🔤 Suggest trie loaded: {len(trie.suggestions)} suggestions, "
+                      f"{trie.nodes} nodes in {trie.load_ms} ms")
+    _trie.refresh()
+    return _trie
+
+
+def get_suggest_stats():
+    return _trie.stats() if _trie is not None else None
@@ -3,7 +3,9 @@ User Analytics Module
 Provides analytics and insights for tenant users
 """
 
-from modules.database import get_db_connection
+from modules.database import get_db_connection, pin_reads_to_primary
+from modules.schema import table_exists
+from modules.listings import LISTING_CARD_COLUMNS, LISTING_CARD_FROM, fetch_listing_cards
 from datetime import datetime, timedelta
 import json
 
@@ -11,7 +13,7 @@ def get_user_activity_analytics(user_id):
     """
     Get comprehensive activity analytics for a specific user
     """
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
     
     try:
@@ -40,7 +42,7 @@ def get_user_activity_analytics(user_id):
         
         # Get user's favorites (if favorites table exists)
         favorites = []
-        try:
+        if table_exists('user_favorites'):
             cursor.execute("""
                 SELECT f.property_id, h.title, h.price, h.property_type, 
                        r.name as region_name, f.created_at
@@ -51,13 +53,10 @@ def get_user_activity_analytics(user_id):
                 ORDER BY f.created_at DESC
             """, (user_id,))
             favorites = cursor.fetchall()
-        except:
-            # Favorites table doesn't exist yet
-            pass
         
         # Get user's saved searches (if saved_searches table exists)
         saved_searches = []
-        try:
+        if table_exists('user_saved_searches'):
             cursor.execute("""
                 SELECT id, search_name, search_term, filters_applied, created_at
                 FROM user_saved_searches
@@ -65,9 +64,6 @@ def get_user_activity_analytics(user_id):
                 ORDER BY created_at DESC
             """, (user_id,))
             saved_searches = cursor.fetchall()
-        except:
-            # Saved searches table doesn't exist yet
-            pass
         
         # Calculate user preferences
         preferences = calculate_user_preferences(user_id, viewed_properties, search_history)
@@ -159,16 +155,14 @@ def calculate_user_preferences(user_id, viewed_properties, search_history):
 
 def get_property_recommendations(user_id, preferences):
     """Get property recommendations based on user preferences"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
     
     try:
         # Build recommendation query based on preferences
-        query = """
-            SELECT h.*, r.name as region_name, n.name as neighborhood_name
-            FROM houses h
-            LEFT JOIN regions r ON h.region_id = r.id
-            LEFT JOIN neighborhoods n ON h.neighborhood_id = n.id
+        query = f"""
+            SELECT {LISTING_CARD_COLUMNS}
+            {LISTING_CARD_FROM}
             WHERE 1=1
         """
         params = []
@@ -177,7 +171,7 @@ def get_property_recommendations(user_id, preferences):
         if preferences['preferred_regions']:
             region_names = [region[0] for region in preferences['preferred_regions']]
             placeholders = ','.join(['%s'] * len(region_names))
-            query += f" AND r.name IN ({placeholders})"
+            query += f" AND h.region_name IN ({placeholders})"
             params.extend(region_names)
         
         # Add property type filter
@@ -194,21 +188,7 @@ def get_property_recommendations(user_id, preferences):
         
         query += " ORDER BY h.created_at DESC LIMIT 6"
         
-        cursor.execute(query, params)
-        recommendations = cursor.fetchall()
-        
-        # Parse image paths
-        for rec in recommendations:
-            if rec['image_paths']:
-                try:
-                    if isinstance(rec['image_paths'], str):
-                        rec['image_paths'] = json.loads(rec['image_paths'].replace("'", '"'))
-                except:
-                    rec['image_paths'] = []
-            else:
-                rec['image_paths'] = []
-        
-        return recommendations
+        return fetch_listing_cards(cursor, query, params)
         
     except Exception as e:
         print(f"Error getting recommendations: {e}")
@@ -219,7 +199,7 @@ def get_property_recommendations(user_id, preferences):
 
 def get_user_engagement_summary(user_id):
     """Get user engagement summary"""
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor()
     
     try:
@@ -264,19 +244,6 @@ def add_to_favorites(user_id, property_id):
     cursor = conn.cursor()
     
     try:
-        # Check if favorites table exists, create if not
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_favorites (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                user_id INT NOT NULL,
-                property_id INT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id),
-                FOREIGN KEY (property_id) REFERENCES houses(id),
-                UNIQUE KEY unique_favorite (user_id, property_id)
-            )
-        """)
-        
         # Add to favorites
         cursor.execute("""
             INSERT INTO user_favorites (user_id, property_id)
@@ -285,6 +252,7 @@ def add_to_favorites(user_id, property_id):
         """, (user_id, property_id))
         
         conn.commit()
+        pin_reads_to_primary()
         return True
         
     except Exception as e:
@@ -306,6 +274,7 @@ def remove_from_favorites(user_id, property_id):
         """, (user_id, property_id))
         
         conn.commit()
+        pin_reads_to_primary()
         return True
         
     except Exception as e:
@@ -321,19 +290,6 @@ def save_search(user_id, search_name, search_term, filters_applied):
     cursor = conn.cursor()
     
     try:
-        # Check if saved_searches table exists, create if not
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_saved_searches (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                user_id INT NOT NULL,
-                search_name VARCHAR(255) NOT NULL,
-                search_term VARCHAR(255),
-                filters_applied TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        """)
-        
         # Save search
         cursor.execute("""
             INSERT INTO user_saved_searches (user_id, search_name, search_term, filters_applied)
@@ -341,6 +297,7 @@ def save_search(user_id, search_name, search_term, filters_applied):
         """, (user_id, search_name, search_term, filters_applied))
         
         conn.commit()
+        pin_reads_to_primary()
         return True
         
     except Exception as e:
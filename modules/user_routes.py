@@ -1,8 +1,22 @@
-from flask import Blueprint, render_template, request, session, flash, redirect, url_for, jsonify
-import json
+from flask import Blueprint, render_template, request, session, flash, redirect, url_for, jsonify, make_response
 import random
 import logging
+from modules.compression import gzip_response
 from modules.database import get_db_connection
+from modules.listings import (LISTING_CARD_COLUMNS, LISTING_CARD_FIELDS, LISTING_CARD_FROM, ListingCard,
+                              fetch_listing_cards, fetch_listing_cards_by_id)
+from modules.degraded import last_good
+from modules.facets import get_facets
+from modules.fuzzy import FUZZY_MODE, get_fuzzy_index
+from modules.geo import DEFAULT_RADIUS_KM, RADIUS_CHOICES, near_search_from_args
+from modules.house_images import attach_images
+from modules.listing_cache import cache_generation, cache_key, cache_page, get_cached_page
+from modules.page_cache import anonymous_page_cache, note_for_page_cache, skip_page_cache
+from modules.pagination import DEFAULT_SORT, PAGE_SIZE, SORT_KEYS, Page, page_size, paginate
+from modules.reference_data import get_neighborhood_choices, get_regions
+from modules.search import build_text_search
+from modules.search_index import get_listing_index
+from modules.suggest import DEFAULT_LIMIT, MAX_LIMIT, get_suggest_trie
 
 user_bp = Blueprint('user', __name__)  # REMOVED: url_prefix='/user'
 
@@ -10,209 +24,466 @@ user_bp = Blueprint('user', __name__)  # REMOVED: url_prefix='/user'
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+LANDING_PAGE_SIZE = 12
+
+# /api/houses: the card fields, distance on radius searches, and links
+API_HOUSE_FIELDS = LISTING_CARD_FIELDS + ('distance', 'url', 'image_url')
+
+
+def _page_url(endpoint, cursor_token):
+    """Link to another keyset page of the current listing, keeping its filters"""
+    if not cursor_token:
+        return None
+    args = request.args.to_dict()
+    args['cursor'] = cursor_token
+    return url_for(endpoint, **args)
+
+
+def _filter_url(endpoint, **changes):
+    """Link to the first page of the current listing with some filters changed"""
+    args = request.args.to_dict()
+    args.pop('cursor', None)
+    args.update(changes)
+    return url_for(endpoint, **{key: value for key, value in args.items() if value not in (None, '')})
+
+
+def _track_search(results_count):
+    """Log a /houses search for analytics when any filter is applied"""
+    region_filter = request.args.get('region', '')
+    property_type_filter = request.args.get('property_type', '')
+    min_price = request.args.get('min_price', '')
+    max_price = request.args.get('max_price', '')
+    search_filter = request.args.get('search', '')
+    near = near_search_from_args(request.args)
+    try:
+        from modules.analytics_tracking import track_search, update_user_engagement
+        
+        if any([region_filter, property_type_filter, min_price, max_price, search_filter, near]):
+            filters_applied = {
+                'region': region_filter,
+                'property_type': property_type_filter,
+                'min_price': min_price,
+                'max_price': max_price
+            }
+            if near:
+                filters_applied['radius_km'] = near.radius_km
+            track_search(
+                user_id=session.get('user_id'),
+                search_term=search_filter,
+                filters_applied=filters_applied,
+                results_count=results_count,
+                ip_address=request.remote_addr,
+                session_id=session.get('session_id')
+            )
+            
+            # Update user engagement
+            if session.get('user_id'):
+                update_user_engagement(session['user_id'], 'search')
+    except Exception as e:
+        print(f"Error tracking search: {e}")
+
+
+def _track_house_view(house_id):
+    """Count a view of a house page for analytics"""
+    from modules.analytics_tracking import track_property_view, update_user_engagement
+
+    try:
+        track_property_view(
+            property_id=house_id,
+            user_id=session.get('user_id'),
+            ip_address=request.remote_addr,
+            user_agent=request.headers.get('User-Agent'),
+            session_id=session.get('session_id')
+        )
+        
+        # Update user engagement
+        if session.get('user_id'):
+            update_user_engagement(session['user_id'], 'property_view')
+    except Exception as e:
+        print(f"Error tracking property view: {e}")
+
+
 @user_bp.route('/')
+@anonymous_page_cache()
 def index():
     """Main landing page"""
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    conn = cursor = None
+    degraded = False
+    degraded_since = None
+
+    cursor_token = request.args.get('cursor', '')
+    page_key = ('index', cursor_token)
 
     try:
-        # Get ALL houses with region and neighborhood names - REMOVED availability filter
-        cursor.execute("""
-            SELECT h.*, r.name as region_name, n.name as neighborhood_name
-            FROM houses h
-            LEFT JOIN regions r ON h.region_id = r.id
-            LEFT JOIN neighborhoods n ON h.neighborhood_id = n.id
-            ORDER BY h.created_at DESC
-        """)  # REMOVED: WHERE h.is_available = TRUE
-        featured_houses = cursor.fetchall()
-
-        # DEBUG: Print house count and details
-        print(f"DEBUG: Fetched {len(featured_houses)} houses for landing page")
-        for i, house in enumerate(featured_houses):
-            print(f"House {i+1}: {house['title']} - Available: {house['is_available']}")
-
-        # Parse image_paths for each house
-        for house in featured_houses:
-            if house['image_paths']:
-                try:
-                    if isinstance(house['image_paths'], str):
-                        house['image_paths'] = json.loads(house['image_paths'].replace("'", '"'))
-                except:
-                    house['image_paths'] = [house['image_paths']] if house['image_paths'] else []
-            else:
-                house['image_paths'] = []
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        # Featured houses first, then the most popular (available or not), one keyset page at a time
+        page = paginate(lambda sql, args: fetch_listing_cards(cursor, sql, args), f"""
+            SELECT {LISTING_CARD_COLUMNS}
+            {LISTING_CARD_FROM}
+            WHERE 1=1
+        """, [], DEFAULT_SORT, cursor_token, LANDING_PAGE_SIZE)
+        featured_houses = page.items
+
+        logger.debug("Fetched %d houses for the landing page", len(featured_houses))
+        last_good.put(page_key, page)
 
     except Exception as e:
+        # Degraded mode: serve the last good landing page instead of an empty one
         print(f"Error loading houses: {str(e)}")
-        featured_houses = []
+        degraded = True
+        page, degraded_since = last_good.get(page_key, ('index', ''))
+        page = page or Page([], DEFAULT_SORT, False, False, LANDING_PAGE_SIZE)
+        skip_page_cache()
+        featured_houses = page.items
     finally:
-        cursor.close()
-        conn.close()
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
 
-    return render_template('user/index.html', featured_houses=featured_houses)
+    return render_template('user/index.html', featured_houses=featured_houses, page=page,
+                           next_url=_page_url('user.index', page.next_cursor),
+                           prev_url=_page_url('user.index', page.prev_cursor),
+                           degraded=degraded, degraded_since=degraded_since)
 
 
-@user_bp.route('/houses')
-def houses():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+def _fuzzy_rewrite(term):
+    """The fuzzy index's rewrite of a search, or None when it is disabled or can't load"""
+    try:
+        fuzzy_index = get_fuzzy_index()
+    except Exception as e:
+        # Loading or refreshing it reads the database, e.g. while its circuit is open
+        logger.warning(f"Fuzzy search unavailable, searching as typed: {e}")
+        return None
+    return fuzzy_index.rewrite(term) if fuzzy_index is not None else None
+
+
+def _houses_page_key(region='', property_type='', min_price='', max_price='', search='', mode='',
+                     sort=DEFAULT_SORT, cursor='', per_page=PAGE_SIZE, near=None):
+    """last_good key for a /houses result; with no arguments, the unfiltered first page"""
+    return ('houses', region, property_type, min_price, max_price, search, mode, sort, cursor, per_page,
+            (near.lat, near.lng, near.radius_km) if near else None)
 
+
+def _search_houses():
+    """Run the /houses search for this request's args; shared by the page and /api/houses"""
     # Get filter parameters with enhanced handling
     region_filter = request.args.get('region', '')
     property_type_filter = request.args.get('property_type', '')
     min_price = request.args.get('min_price', '')
     max_price = request.args.get('max_price', '')
     search_filter = request.args.get('search', '')
-    sort_filter = request.args.get('sort', 'newest')
+    search_mode = request.args.get('mode', '')
+    sort_filter = request.args.get('sort', DEFAULT_SORT)
+    if sort_filter not in SORT_KEYS:
+        sort_filter = DEFAULT_SORT
+    cursor_token = request.args.get('cursor', '')
+    per_page = page_size(request.args.get('per_page'))
 
     # Debug: Print received filters
     print(f"DEBUG - Filters received: region={region_filter}, property_type={property_type_filter}, min_price={min_price}, max_price={max_price}, search={search_filter}, sort={sort_filter}")
 
+    # Typo-tolerant mode: search each word's close spellings too, and place
+    # names as their region (modules/fuzzy.py)
+    fuzzy = None
+    query_search, query_mode = search_filter, search_mode
+    if search_mode == FUZZY_MODE and search_filter.strip():
+        fuzzy = _fuzzy_rewrite(search_filter)
+        if fuzzy is not None:
+            if fuzzy.expanded or fuzzy.region_id:
+                query_search, query_mode = fuzzy.expanded, 'natural'
+            if fuzzy.region_id and not region_filter:
+                region_filter = str(fuzzy.region_id)
+            logger.debug("Fuzzy search: %s -> %s (region %s)", search_filter, query_search, fuzzy.region_id)
+
+    # Text search - FULLTEXT (natural language or boolean mode), see modules/search.py
+    text_search = build_text_search(query_search, query_mode) if query_search.strip() else None
+
+    # Radius search - ?lat=&lng=&radius= (km), see modules/geo.py
+    near = near_search_from_args(request.args)
+
     # Build query with filters - ENHANCED with search and sort
-    query = """
-        SELECT h.*, r.name as region_name, n.name as neighborhood_name
-        FROM houses h
-        LEFT JOIN regions r ON h.region_id = r.id
-        LEFT JOIN neighborhoods n ON h.neighborhood_id = n.id
+    query = f"""
+        SELECT {LISTING_CARD_COLUMNS}{text_search.select_sql if text_search else ''}{near.select_sql if near else ''}
+        {LISTING_CARD_FROM}{text_search.join_sql if text_search else ''}
         WHERE 1=1
     """
     params = []
-
-    # Text search filter - NEW: Search by title or description
-    if search_filter and search_filter != '':
-        query += " AND (h.title LIKE %s OR h.description LIKE %s)"
-        params.extend([f'%{search_filter}%', f'%{search_filter}%'])
-        print(f"DEBUG - Applying search filter: {search_filter}")
+    filters = {}  # the same filters, parsed, for the in-memory search index
+
+    if text_search:
+        params.extend(text_search.select_params)
+    if near:
+        params.extend(near.select_params)
+    if text_search:
+        params.extend(text_search.join_params)
+        query += text_search.where_sql
+        params.extend(text_search.where_params)
+        print(f"DEBUG - Applying {text_search.mode} text search: {query_search}")
+    elif query_search.strip():
+        # Only words shorter than the FULLTEXT minimum (or stopwords): match titles instead
+        query += " AND h.title LIKE %s"
+        params.append(f'%{query_search.strip()}%')
+        print(f"DEBUG - Applying short title search: {query_search}")
 
     # Region filter - FIXED: Better handling
     if region_filter and region_filter.strip() and region_filter.isdigit():
         query += " AND h.region_id = %s"
         params.append(int(region_filter))  # Ensure it's integer
+        filters['region_id'] = int(region_filter)
         print(f"DEBUG - Applying region filter: {region_filter}")
 
     # Property type filter - FIXED: Better handling
     if property_type_filter and property_type_filter != '':
         query += " AND h.property_type = %s"
         params.append(property_type_filter)
+        filters['property_type'] = property_type_filter
         print(f"DEBUG - Applying property type filter: {property_type_filter}")
 
     # Price filters - FIXED: Better validation
     if min_price and min_price.strip() and min_price.replace('.', '').isdigit():
         query += " AND h.price >= %s"
         params.append(float(min_price))
+        filters['min_price'] = float(min_price)
         print(f"DEBUG - Applying min price filter: {min_price}")
 
     if max_price and max_price.strip() and max_price.replace('.', '').isdigit():
         query += " AND h.price <= %s"
         params.append(float(max_price))
+        filters['max_price'] = float(max_price)
         print(f"DEBUG - Applying max price filter: {max_price}")
 
-    # Sorting - NEW: Multiple sort options
-    if sort_filter == 'price_low':
-        query += " ORDER BY h.price ASC"
-        print("DEBUG - Sorting by: Price Low to High")
-    elif sort_filter == 'price_high':
-        query += " ORDER BY h.price DESC"
-        print("DEBUG - Sorting by: Price High to Low")
-    elif sort_filter == 'name':
-        query += " ORDER BY h.title ASC"
-        print("DEBUG - Sorting by: Name A-Z")
-    else:  # newest (default)
-        query += " ORDER BY h.created_at DESC"
-        print("DEBUG - Sorting by: Newest First")
-
-    print(f"DEBUG - Final query: {query}")
-    print(f"DEBUG - Query params: {params}")
+    if near:
+        query += near.where_sql
+        params.extend(near.where_params)
+        logger.debug("Applying radius filter: %s km of %s, %s", near.radius_km, near.lat, near.lng)
+
+    # Sorting and paging: keyset pagination on (sort column, id), see modules/pagination.py
+    sort_column = None
+    if sort_filter == 'relevance':
+        if text_search:
+            sort_column = (text_search.relevance_sql, text_search.relevance_params)
+        else:
+            sort_filter = DEFAULT_SORT
+    elif sort_filter == 'distance':
+        if near:
+            sort_column = near.sort_column
+        else:
+            sort_filter = DEFAULT_SORT
+    print(f"DEBUG - Sorting by: {sort_filter}, {per_page} per page")
+
+    page_key = _houses_page_key(region_filter, property_type_filter, min_price, max_price, search_filter,
+                                search_mode, sort_filter, cursor_token, per_page, near)
+    conn = cursor = None
+    degraded = False
+    degraded_since = None
+    filters_ignored = False
 
     try:
-        print(f"DEBUG - Executing query: {query}")
-        print(f"DEBUG - With parameters: {params}")
-        cursor.execute(query, params)
-        houses = cursor.fetchall()
+        # Popular filter combinations come straight from the result cache
+        # (modules/listing_cache.py), which drops pages as listings change.
+        # Radius searches are keyed by the visitor's position, so they skip it.
+        page_cache_key = cache_key(filters, query_search, query_mode, sort_filter, cursor_token, per_page)
+        page = get_cached_page(page_cache_key) if not near else None
+        if page is not None:
+            logger.debug("Served %d houses from the listing cache", len(page.items))
+        else:
+            generation = cache_generation()
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            # The in-memory search index picks the page's ids (modules/search_index.py);
+            # the database then only loads those cards. It passes on searches it
+            # can't answer (e.g. only short words) and the SQL below runs instead.
+            index = get_listing_index() if not near else None
+            page = index.search(filters, query_search, query_mode, sort_filter, cursor_token, per_page) \
+                if index is not None else None
+
+            if page is not None:
+                page.items = fetch_listing_cards_by_id(cursor, [row['id'] for row in page.items])
+                logger.debug("Search index picked %d houses", len(page.items))
+            else:
+                print(f"DEBUG - Executing query: {query}")
+                print(f"DEBUG - With parameters: {params}")
+
+                def fetch_rows(sql, args):
+                    cursor.execute(sql, args)
+                    return cursor.fetchall()
+
+                page = paginate(fetch_rows, query, params, sort_filter, cursor_token, per_page,
+                                sort_column=sort_column, wrap=ListingCard)
+            if not near:
+                cache_page(page_cache_key, page, generation)
+        houses = page.items
         print(f"DEBUG - Found {len(houses)} houses after filtering")
         
         # Debug: Print first few houses if any
         if houses:
             print(f"DEBUG - First house: {houses[0]['title'] if houses[0] else 'None'}")
+
+        # Get all regions for filter dropdown
+        regions = get_regions()
+        last_good.put(page_key, (page, regions))
         
     except Exception as e:
         print(f"ERROR - Query failed: {e}")
         print(f"ERROR - Query was: {query}")
         print(f"ERROR - Params were: {params}")
-        
-        # Fallback to all houses if query fails
-        try:
-            cursor.execute("""
-                SELECT h.*, r.name as region_name, n.name as neighborhood_name
-                FROM houses h
-                LEFT JOIN regions r ON h.region_id = r.id
-                LEFT JOIN neighborhoods n ON h.neighborhood_id = n.id
-                ORDER BY h.created_at DESC
-            """)
-            houses = cursor.fetchall()
-            print(f"DEBUG - Fallback query returned {len(houses)} houses")
-        except Exception as fallback_error:
-            print(f"ERROR - Fallback query also failed: {fallback_error}")
-            houses = []
-
-    # Parse image_paths for each house
-    for house in houses:
-        if house['image_paths']:
-            try:
-                if isinstance(house['image_paths'], str):
-                    house['image_paths'] = json.loads(house['image_paths'].replace("'", '"'))
-            except:
-                house['image_paths'] = []
-        else:
-            house['image_paths'] = []
 
-    # Track search if filters are applied
-    try:
-        from modules.analytics_tracking import track_search, update_user_engagement
-        
-        if any([region_filter, property_type_filter, min_price, max_price, search_filter]):
-            track_search(
-                user_id=session.get('user_id'),
-                search_term=search_filter,
-                filters_applied={
-                    'region': region_filter,
-                    'property_type': property_type_filter,
-                    'min_price': min_price,
-                    'max_price': max_price
-                },
-                results_count=len(houses),
-                ip_address=request.remote_addr,
-                session_id=session.get('session_id')
-            )
-            
-            # Update user engagement
-            if session.get('user_id'):
-                update_user_engagement(session['user_id'], 'search')
-    except Exception as e:
-        print(f"Error tracking search: {e}")
+        # Degraded mode: no retry against a struggling database; serve the
+        # last good result for these filters, else the unfiltered page (and
+        # say that the filters were not applied)
+        degraded = True
+        cached, degraded_since = last_good.get(page_key)
+        if cached is None and page_key != _houses_page_key():
+            cached, degraded_since = last_good.get(_houses_page_key())
+            filters_ignored = cached is not None
+        page, regions = cached or (Page([], sort_filter, False, False, per_page), [])
+        houses = page.items
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
 
-    # Get all regions for filter dropdown
-    cursor.execute("SELECT * FROM regions ORDER BY name")
-    regions = cursor.fetchall()
+    return {'page': page, 'regions': regions, 'degraded': degraded, 'degraded_since': degraded_since,
+            'filters_ignored': filters_ignored,
+            'filters': filters, 'region_filter': region_filter, 'property_type_filter': property_type_filter,
+            'min_price': min_price, 'max_price': max_price, 'search_filter': search_filter,
+            'search_mode': search_mode, 'query_search': query_search, 'query_mode': query_mode,
+            'sort_filter': sort_filter, 'cursor_token': cursor_token, 'text_search': text_search,
+            'fuzzy': fuzzy, 'near': near}
 
-    cursor.close()
-    conn.close()
 
+@user_bp.route('/houses')
+@anonymous_page_cache(on_hit=lambda meta: _track_search(meta.get('results_count', 0)))
+def houses():
+    result = _search_houses()
+    page, near, fuzzy, degraded = result['page'], result['near'], result['fuzzy'], result['degraded']
+    search_filter = result['search_filter']
+    houses = page.items
+
+    # Sidebar counts for the other choices of each filter (modules/facets.py)
+    # (not for radius searches: the counts don't know about distance)
+    facets = price_facets = None
+    if not degraded and not near:
+        try:
+            facets = get_facets(result['filters'], result['query_search'], result['query_mode'])
+            price_facets = [dict(bucket, url=_filter_url('user.houses', min_price=bucket['min'],
+                                                         max_price=bucket['max']))
+                            for bucket in facets['price_buckets']]
+        except Exception as e:
+            print(f"⚠️  Facet counts unavailable: {e}")
+
+    # Nothing found: offer the search with its misspellings corrected
+    did_you_mean = did_you_mean_url = None
+    if not houses and not degraded and not fuzzy and not result['cursor_token'] and search_filter.strip():
+        correction = _fuzzy_rewrite(search_filter)
+        if correction is not None and correction.changed:
+            did_you_mean = correction
+            did_you_mean_url = _filter_url('user.houses', search=correction.search,
+                                           region=result['region_filter'] or correction.region_id)
+
+    # Track search if filters are applied
+    if degraded:
+        skip_page_cache()
+    else:
+        note_for_page_cache(results_count=len(houses))
+        _track_search(len(houses))
+
+    text_search = result['text_search']
     return render_template('user/houses.html',
                            houses=houses,
-                           regions=regions,
-                           current_region=region_filter,
-                           current_property_type=property_type_filter,
-                           current_min_price=min_price,
-                           current_max_price=max_price,
+                           page=page,
+                           next_url=_page_url('user.houses', page.next_cursor),
+                           api_next_url=_page_url('user.api_houses', page.next_cursor),
+                           prev_url=_page_url('user.houses', page.prev_cursor),
+                           regions=result['regions'],
+                           facets=facets,
+                           price_facets=price_facets,
+                           degraded=degraded,
+                           degraded_since=result['degraded_since'],
+                           filters_ignored=result['filters_ignored'],
+                           current_region=result['region_filter'],
+                           current_property_type=result['property_type_filter'],
+                           current_min_price=result['min_price'],
+                           current_max_price=result['max_price'],
                            current_search=search_filter,
-                           current_sort=sort_filter)
+                           current_mode=FUZZY_MODE if fuzzy else (text_search.mode if text_search else result['search_mode']),
+                           current_sort=result['sort_filter'],
+                           did_you_mean=did_you_mean,
+                           did_you_mean_url=did_you_mean_url,
+                           near=near,
+                           radius_choices=RADIUS_CHOICES,
+                           default_radius=DEFAULT_RADIUS_KM)
+
+@user_bp.route('/api/regions/<int:region_id>/neighborhoods')
+def api_region_neighborhoods(region_id):
+    """Neighborhood choices for the house forms' dropdown, from the in-memory reference data"""
+    choices, etag = get_neighborhood_choices(region_id)
+    if choices is None:
+        return jsonify({'success': False, 'message': 'Unknown region'}), 404
+
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = jsonify({'region_id': region_id, 'neighborhoods': choices})
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    return response
+
+
+@user_bp.route('/api/houses')
+def api_houses():
+    """The /houses search as JSON, one keyset page at a time, for incremental loading.
+
+    Takes the same args as /houses, plus fields=a,b,c to pick from
+    API_HOUSE_FIELDS (default: all). next_url fetches the following page.
+    """
+    requested = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+    unknown = [field for field in requested if field not in API_HOUSE_FIELDS]
+    if unknown:
+        return jsonify({'success': False,
+                        'message': f"Unknown fields: {', '.join(unknown)}",
+                        'fields': list(API_HOUSE_FIELDS)}), 400
+    fields = list(dict.fromkeys(requested)) or list(API_HOUSE_FIELDS)
+    card_fields = [field for field in fields if field not in ('url', 'image_url')]
+
+    result = _search_houses()
+    page = result['page']
+    items = []
+    for house in page.items:
+        item = house.to_json(card_fields)
+        if 'url' in fields:
+            item['url'] = url_for('user.house_detail', house_id=house.id)
+        if 'image_url' in fields:
+            item['image_url'] = url_for('static', filename='uploads/' + house.cover_image) \
+                if house.cover_image else None
+        items.append(item)
+
+    # A new search is logged once, not again for every page scrolled in
+    if not result['degraded'] and not result['cursor_token']:
+        _track_search(len(items))
+
+    response = jsonify({
+        'houses': items,
+        'sort': page.sort,
+        'per_page': page.size,
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+        'next_url': _page_url('user.api_houses', page.next_cursor),
+        'degraded': result['degraded'],
+        'filters_applied': not result['filters_ignored'],
+    })
+    response.headers['Cache-Control'] = 'no-cache'
+    return gzip_response(response)
+
 
 @user_bp.route('/house/<int:house_id>')
+@anonymous_page_cache(on_hit=lambda meta, house_id: _track_house_view(house_id))
 def house_detail(house_id):
-    from modules.analytics_tracking import track_property_view, update_user_engagement
-    
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
 
@@ -231,31 +502,10 @@ def house_detail(house_id):
         conn.close()
         return "House not found", 404
 
-    # Parse image_paths
-    if house['image_paths']:
-        try:
-            if isinstance(house['image_paths'], str):
-                house['image_paths'] = json.loads(house['image_paths'].replace("'", '"'))
-        except:
-            house['image_paths'] = []
-    else:
-        house['image_paths'] = []
+    attach_images(cursor, [house])
 
     # Track property view
-    try:
-        track_property_view(
-            property_id=house_id,
-            user_id=session.get('user_id'),
-            ip_address=request.remote_addr,
-            user_agent=request.headers.get('User-Agent'),
-            session_id=session.get('session_id')
-        )
-        
-        # Update user engagement
-        if session.get('user_id'):
-            update_user_engagement(session['user_id'], 'property_view')
-    except Exception as e:
-        print(f"Error tracking property view: {e}")
+    _track_house_view(house_id)
 
     cursor.close()
     conn.close()
@@ -274,50 +524,24 @@ def tenant_dashboard():
     
     try:
         # Get available houses for the tenant
-        cursor.execute("""
-            SELECT h.*, r.name as region_name, n.name as neighborhood_name
-            FROM houses h
-            LEFT JOIN regions r ON h.region_id = r.id
-            LEFT JOIN neighborhoods n ON h.neighborhood_id = n.id
+        available_houses = fetch_listing_cards(cursor, f"""
+            SELECT {LISTING_CARD_COLUMNS}
+            {LISTING_CARD_FROM}
             WHERE h.is_available = TRUE
             ORDER BY h.created_at DESC
             LIMIT 12
         """)
-        available_houses = cursor.fetchall()
-        
-        # Parse image_paths for each house
-        for house in available_houses:
-            if house['image_paths']:
-                try:
-                    if isinstance(house['image_paths'], str):
-                        house['image_paths'] = json.loads(house['image_paths'].replace("'", '"'))
-                except:
-                    house['image_paths'] = [house['image_paths']] if house['image_paths'] else []
-            else:
-                house['image_paths'] = []
         
         # Get regions for search filter
-        cursor.execute("SELECT * FROM regions ORDER BY name")
-        regions = cursor.fetchall()
+        regions = get_regions()
         
         # Get user's favorite houses if any
-        cursor.execute("""
-            SELECT h.* FROM houses h
+        favorite_houses = fetch_listing_cards(cursor, f"""
+            SELECT {LISTING_CARD_COLUMNS}
+            {LISTING_CARD_FROM}
             JOIN favorites f ON h.id = f.house_id
             WHERE f.user_id = %s AND h.is_available = TRUE
         """, (session['user_id'],))
-        favorite_houses = cursor.fetchall()
-        
-        # Parse image_paths for favorites
-        for house in favorite_houses:
-            if house['image_paths']:
-                try:
-                    if isinstance(house['image_paths'], str):
-                        house['image_paths'] = json.loads(house['image_paths'].replace("'", '"'))
-                except:
-                    house['image_paths'] = [house['image_paths']] if house['image_paths'] else []
-            else:
-                house['image_paths'] = []
                 
     except Exception as e:
         flash(f'Error loading dashboard: {str(e)}', 'error')
@@ -420,6 +644,26 @@ def save_search():
     except Exception as e:
         return {'success': False, 'message': str(e)}
 
+@user_bp.route('/api/suggest')
+def suggest():
+    """Search box autocomplete: ranked completions of ?q= from the in-memory trie"""
+    prefix = request.args.get('q', '')[:100]
+    try:
+        limit = min(max(int(request.args.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        limit = DEFAULT_LIMIT
+
+    try:
+        trie = get_suggest_trie()
+        suggestions = trie.suggest(prefix, limit) if trie is not None else []
+    except Exception as e:
+        logger.error(f"Suggest failed: {e}")
+        suggestions = []
+
+    response = jsonify({'query': prefix, 'suggestions': suggestions})
+    response.headers['Cache-Control'] = 'public, max-age=30'
+    return response
+
 # Property type mapping
 PROPERTY_TYPE_MAPPING = {
     'single_room': ['single room', 'single', 'room', 'one room'],
@@ -486,13 +730,9 @@ def get_property_type_display_name(property_type):
     return property_type.replace('_', ' ').title()
 
 def execute_safe_query(cursor, query, params=None):
-    """Execute query with proper error handling"""
+    """Execute a listing card query with proper error handling"""
     try:
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        return cursor.fetchall()
+        return fetch_listing_cards(cursor, query, params or ())
     except Exception as e:
         logger.error(f"Query failed: {e}")
         return []
@@ -535,21 +775,19 @@ def chatbot():
 
             logger.info(f"Detected - Type: {property_type}, Region: {region}, Budget: {budget}")
 
-            query = """
-                SELECT h.*, r.name as region_name, n.name as neighborhood_name 
-                FROM houses h 
-                LEFT JOIN regions r ON h.region_id = r.id 
-                LEFT JOIN neighborhoods n ON h.neighborhood_id = n.id 
+            query = f"""
+                SELECT {LISTING_CARD_COLUMNS}
+                {LISTING_CARD_FROM}
                 WHERE 1=1
             """
             params = []
 
             if region:
                 if region == 'accra':
-                    query += " AND r.name LIKE %s"
+                    query += " AND h.region_name LIKE %s"
                     params.append('%Accra%')
                 elif region == 'kumasi':
-                    query += " AND r.name LIKE %s"
+                    query += " AND h.region_name LIKE %s"
                     params.append('%Ashanti%')
 
             if property_type:
@@ -610,11 +848,9 @@ def chatbot():
 
         # === AFFIRMATIVE RESPONSES ===
         elif any(word in user_message_lower for word in ['yes', 'yeah', 'sure', 'ok', 'show me', 'please']):
-            properties = execute_safe_query(cursor, """
-                SELECT h.*, r.name as region_name, n.name as neighborhood_name 
-                FROM houses h 
-                LEFT JOIN regions r ON h.region_id = r.id 
-                LEFT JOIN neighborhoods n ON h.neighborhood_id = n.id 
+            properties = execute_safe_query(cursor, f"""
+                SELECT {LISTING_CARD_COLUMNS}
+                {LISTING_CARD_FROM}
                 ORDER BY h.created_at DESC LIMIT 6
             """)
 
@@ -672,5 +908,5 @@ Just tell me what you're looking for! 🏠"""
     logger.info(f"Chatbot response: {response}")
     return jsonify({
         'response': response,
-        'properties': properties[:3]
+        'properties': [prop.to_dict() for prop in properties[:3]]
     })
@@ -0,0 +1,94 @@
+"""
+Warmup Module
+Gets a freshly started worker ready before it accepts traffic: opens pool
+connections, loads reference data, the search index, the autocomplete trie
+and the fuzzy search index and compiles every template, so the first
+request after a deploy or restart is not the slowest one. Called from the
+gunicorn post_worker_init hook (gunicorn.conf.py).
+"""
+
+import time
+
+from modules.database import prewarm_pools
+from modules.fuzzy import get_fuzzy_index
+from modules.reference_data import load_reference_data
+from modules.search_index import get_listing_index
+from modules.suggest import get_suggest_trie
+
+
+def compile_templates(app):
+    """Compile every template into the Jinja cache; returns (compiled, failed)"""
+    env = app.jinja_env
+    if env.cache is not None and env.cache.capacity < len(env.list_templates()):
+        print("⚠️  Jinja cache is smaller than the template set; some will recompile")
+    compiled, failed = 0, []
+    for name in env.list_templates(extensions=['html']):
+        try:
+            env.get_template(name)
+            compiled += 1
+        except Exception as e:
+            failed.append(name)
+            print(f"❌ Template {name} failed to compile: {e}")
+    return compiled, failed
+
+
+def warm_worker(app):
+    """Prewarm this worker; every step is best-effort and timed"""
+    report = {}
+    started = time.perf_counter()
+
+    step = time.perf_counter()
+    with app.app_context():
+        # Pools and breakers keep the settings they were created with, so
+        # they must see the app's config (DB_POOL_SIZE, ...), not just the environment
+        report['connections'] = prewarm_pools()
+    report['pool_ms'] = round((time.perf_counter() - step) * 1000, 1)
+
+    step = time.perf_counter()
+    with app.app_context():
+        try:
+            report['reference_data'] = load_reference_data()
+        except Exception as e:
+            print(f"⚠️  Could not load reference data: {e}")
+            report['reference_data'] = None
+    report['reference_ms'] = round((time.perf_counter() - step) * 1000, 1)
+
+    step = time.perf_counter()
+    with app.app_context():
+        try:
+            index = get_listing_index()
+            report['search_index'] = len(index.ids) if index is not None else None
+        except Exception as e:
+            print(f"⚠️  Could not load the search index: {e}")
+            report['search_index'] = None
+    report['search_index_ms'] = round((time.perf_counter() - step) * 1000, 1)
+
+    step = time.perf_counter()
+    with app.app_context():
+        try:
+            trie = get_suggest_trie()
+            report['suggest'] = len(trie.suggestions) if trie is not None else None
+        except Exception as e:
+            print(f"⚠️  Could not load the suggest trie: {e}")
+            report['suggest'] = None
+    report['suggest_ms'] = round((time.perf_counter() - step) * 1000, 1)
+
+    step = time.perf_counter()
+    with app.app_context():
+        try:
+            fuzzy = get_fuzzy_index()
+            report['fuzzy'] = len(fuzzy.counts) if fuzzy is not None else None
+        except Exception as e:
+            print(f"⚠️  Could not load the fuzzy index: {e}")
+            report['fuzzy'] = None
+    report['fuzzy_ms'] = round((time.perf_counter() - step) * 1000, 1)
+
+    step = time.perf_counter()
+    report['templates'], report['template_errors'] = compile_templates(app)
+    report['templates_ms'] = round((time.perf_counter() - step) * 1000, 1)
+
+    report['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    print(f"🔥 Worker warm in {report['total_ms']} ms: {report['connections']} connections, "
+          f"{report['reference_data']} reference rows, {report['search_index']} indexed listings, "
+          f"{report['templates']} templates")
+    return report
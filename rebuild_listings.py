@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Listing Read Model Rebuild
+Usage:
+    python rebuild_listings.py              # repair every listing_read_model row that drifted from houses
+    python rebuild_listings.py popularity   # only recompute popularity scores and ranks (e.g. hourly cron)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# The startup checks would otherwise query tables we are about to fill
+os.environ.setdefault('DB_MIGRATION_CHECK', 'false')
+os.environ.setdefault('DB_SCHEMA_BOOTSTRAP', 'false')
+
+from app import app
+from modules.read_model import rebuild_listing_read_model
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'all'
+    if command not in ('all', 'popularity'):
+        print(__doc__)
+        return False
+
+    with app.app_context():
+        try:
+            if command == 'popularity':
+                print("📈 Refreshing popularity scores...")
+                count = rebuild_listing_read_model(popularity_only=True)
+                print(f"✅ {count} listing(s) changed score; workers re-rank them within LISTING_SYNC_INTERVAL")
+            else:
+                print("🏗️  Rebuilding listing read model...")
+                count = rebuild_listing_read_model()
+                print(f"✅ {count} listing(s) repaired; workers pick them up within LISTING_SYNC_INTERVAL")
+            return True
+        except Exception as e:
+            print(f"❌ Rebuild failed: {e}")
+            return False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
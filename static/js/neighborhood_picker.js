@@ -0,0 +1,40 @@
+// House forms: fill the neighborhood dropdown with the chosen region's
+// neighborhoods from /api/regions/<id>/neighborhoods, instead of shipping
+// every neighborhood in the country with the page.
+document.addEventListener('DOMContentLoaded', function() {
+    const region = document.querySelector('select[name="region_id"]');
+    const neighborhood = document.querySelector('select[name="neighborhood_id"]');
+    if (!region || !neighborhood) {
+        return;
+    }
+    const placeholder = neighborhood.querySelector('option[value=""]') || new Option('Select Neighborhood', '');
+    const loaded = {};  // region id -> promise of its neighborhoods
+
+    region.addEventListener('change', function() {
+        const regionId = region.value;
+        neighborhood.replaceChildren(placeholder.cloneNode(true));
+        neighborhood.value = '';
+        if (!regionId) {
+            return;
+        }
+        if (!loaded[regionId]) {
+            loaded[regionId] = fetch(`/api/regions/${regionId}/neighborhoods`)
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`HTTP ${response.status}`);
+                    }
+                    return response.json();
+                })
+                .then(data => data.neighborhoods);
+        }
+        neighborhood.disabled = true;
+        loaded[regionId]
+            .then(choices => {
+                if (region.value === regionId) {
+                    choices.forEach(choice => neighborhood.add(new Option(choice.name, choice.id)));
+                }
+            })
+            .catch(() => { delete loaded[regionId]; })
+            .finally(() => { neighborhood.disabled = false; });
+    });
+});
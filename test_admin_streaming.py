@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Streaming Admin Listing Tests
+The manage houses/users/reports pages stream rows from an unbuffered cursor
+instead of fetching every row before rendering
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from conftest import HOUSE_COUNT, USERS
+from modules.streaming import stream_rows
+
+
+@pytest.mark.parametrize('url,marker,expected', [
+    ('/admin/manage-houses', '/admin/edit-house/', HOUSE_COUNT),
+    ('/admin/manage-users', '/admin/edit-user/', len(USERS)),
+    ('/admin/reports', 'href="/admin/reports/', 1),
+])
+def test_listing_is_streamed(client, login_as, url, marker, expected):
+    login_as('admin')
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    body = response.get_data(as_text=True)
+    assert body.count(marker) == expected
+    assert f'<div class="count-number">{expected}</div>' in body
+
+
+def test_flash_is_consumed_before_streaming(client, login_as):
+    login_as('admin')
+    with client.session_transaction() as sess:
+        sess['_flashes'] = [('success', 'House updated')]
+
+    assert 'House updated' in client.get('/admin/manage-houses').get_data(as_text=True)
+    assert 'House updated' not in client.get('/admin/manage-houses').get_data(as_text=True)
+
+
+def test_stream_rows_reads_in_batches(app):
+    with app.app_context():
+        rows = stream_rows("SELECT id FROM houses ORDER BY id", batch_size=7)
+        first = next(rows)
+        rest = list(rows)
+
+    assert first['id'] == 1
+    assert len(rest) == HOUSE_COUNT - 1
@@ -10,7 +10,6 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app import app
 from modules.database import get_db_connection
-import requests
 import json
 
 def test_routes():
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Listings API Tests
+Checks that /api/houses returns the same listings as /houses for the same
+filters, pages through them with keyset cursors, honours fields= and
+gzips its responses.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import gzip
+import json
+import re
+
+import pytest
+
+from conftest import HOUSE_COUNT
+from modules.user_routes import API_HOUSE_FIELDS
+from modules.warmup import warm_worker
+
+SEARCHES = [
+    {},
+    {'region': '1', 'sort': 'price_low'},
+    {'property_type': 'apartment', 'min_price': '500', 'sort': 'price_high'},
+    {'search': 'apartment osu', 'sort': 'relevance'},
+    {'search': 'apartmnt', 'mode': 'fuzzy'},
+    {'lat': '5.6360', 'lng': '-0.1610', 'radius': '10', 'sort': 'distance'},
+]
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm(app):
+    warm_worker(app)
+
+
+def _page_ids(client, params):
+    html = client.get('/houses', query_string=params).get_data(as_text=True)
+    return [int(house_id) for house_id in re.findall(r'href="/house/(\d+)"', html)]
+
+
+def _api(client, url, **params):
+    response = client.get(url, query_string=params or None)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.mark.parametrize('params', SEARCHES)
+def test_same_results_as_the_page(client, params):
+    assert [house['id'] for house in _api(client, '/api/houses', **params)['houses']] == _page_ids(client, params)
+
+
+@pytest.mark.parametrize('params', SEARCHES)
+def test_cursor_pages_cover_everything(client, params):
+    expected = _page_ids(client, {**params, 'per_page': HOUSE_COUNT})
+    seen, data = [], _api(client, '/api/houses', **params, per_page=4, fields='id')
+    while True:
+        seen.extend(house['id'] for house in data['houses'])
+        if not data['next_url']:
+            break
+        assert 'fields=id' in data['next_url']
+        data = _api(client, data['next_url'])
+    assert seen == expected
+
+
+def test_fields(client):
+    data = _api(client, '/api/houses', fields='id,title,price,url')
+    assert all(set(house) == {'id', 'title', 'price', 'url'} for house in data['houses'])
+    assert data['houses'][0]['url'] == f"/house/{data['houses'][0]['id']}"
+
+    full = _api(client, '/api/houses')['houses'][0]
+    assert set(full) == set(API_HOUSE_FIELDS)
+    assert full['distance'] is None and isinstance(full['price'], (int, float))
+    assert re.match(r'\d{4}-\d\d-\d\dT', full['created_at'])
+
+    response = client.get('/api/houses?fields=id,password_hash')
+    assert response.status_code == 400
+    assert 'password_hash' in response.get_json()['message']
+
+
+def test_gzip(client):
+    plain = client.get('/api/houses?per_page=20')
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    zipped = client.get('/api/houses?per_page=20', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    body = gzip.decompress(zipped.get_data())
+    assert json.loads(body) == plain.get_json()
+    assert len(zipped.get_data()) * 3 < len(body)
+
+    tiny = client.get('/api/houses?per_page=1&fields=id', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in tiny.headers
+
+    # Far smaller than the page it stands in for
+    html = client.get('/houses?per_page=20').get_data()
+    assert len(zipped.get_data()) * 20 < len(html)
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker Tests
+Checks the breaker state machine with a fake clock, and that the public list
+pages fall back to their last good result while the database circuit is open.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from modules.cache import get_cache
+from modules.database import CircuitBreaker, DatabaseUnavailableError, get_breaker, get_db_connection
+from modules.degraded import last_good
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def breaker():
+    clock = FakeClock()
+    return CircuitBreaker('test', failure_threshold=3, reset_after=10, clock=clock), clock
+
+
+def test_opens_after_consecutive_failures(breaker):
+    breaker, _ = breaker
+    for _ in range(2):
+        breaker.record_failure(Exception('gone away'))
+    assert breaker.allow()
+
+    breaker.record_failure(Exception('gone away'))
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['rejected'] == 1
+    assert breaker.stats()['last_error'] == 'gone away'
+
+
+def test_success_resets_failure_streak(breaker):
+    breaker, _ = breaker
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_one_trial(breaker):
+    breaker, clock = breaker
+    breaker.open()
+    clock.now = 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens(breaker):
+    breaker, clock = breaker
+    breaker.open()
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record_failure(Exception('still down'))
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()['times_opened'] == 2
+    clock.now = 19
+    assert not breaker.allow()
+
+
+@pytest.fixture
+def open_circuit(app):
+    get_cache('houses').invalidate()  # a cached page would be served without the database
+    primary = get_breaker('primary')
+    primary.open()
+    yield primary
+    primary.record_success()
+
+
+def test_open_circuit_fails_fast(app, open_circuit):
+    with app.test_request_context('/'):
+        with pytest.raises(DatabaseUnavailableError):
+            get_db_connection()
+
+
+@pytest.mark.parametrize('url', ['/', '/houses', '/houses?region=1&sort=price_low'])
+def test_list_pages_serve_last_good_result(client, url):
+    fresh = client.get(url)
+    assert fresh.status_code == 200
+    assert b'Live listings are temporarily unavailable' not in fresh.data
+
+    get_cache('houses').invalidate()  # a cached page would be served without the database
+    primary = get_breaker('primary')
+    primary.open()
+    try:
+        degraded = client.get(url)
+    finally:
+        primary.record_success()
+
+    assert degraded.status_code == 200
+    assert b'Live listings are temporarily unavailable' in degraded.data
+    assert b'filters are not applied' not in degraded.data
+    listings = fresh.data.count(b'class="card-title"')
+    assert listings > 0
+    assert degraded.data.count(b'class="card-title"') == listings
+
+
+def test_filtered_page_falls_back_to_the_unfiltered_one(client):
+    last_good.clear()
+    unfiltered = client.get('/houses')
+    listings = unfiltered.data.count(b'class="card-title"')
+    assert listings > 0
+
+    get_cache('houses').invalidate()
+    primary = get_breaker('primary')
+    primary.open()
+    try:
+        degraded = client.get('/houses?property_type=apartment')
+        api = client.get('/api/houses?property_type=apartment').get_json()
+    finally:
+        primary.record_success()
+
+    assert degraded.status_code == 200
+    assert b'Live listings are temporarily unavailable' in degraded.data
+    assert b'Your search and filters are not applied' in degraded.data
+    assert degraded.data.count(b'class="card-title"') == listings
+    assert api['degraded'] and not api['filters_applied']
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
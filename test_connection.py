@@ -1,15 +1,26 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
 import mysql.connector
-from config import Config
-
-try:
-    conn = mysql.connector.connect(
-        host=Config.MYSQL_HOST,
-        user=Config.MYSQL_USER,
-        password=Config.MYSQL_PASSWORD,
-        database=Config.MYSQL_DB
-    )
-    print("✅ Database connection SUCCESSFUL!")
-    print("✅ You're ready to build your rental system!")
-    conn.close()
-except mysql.connector.Error as e:
-    print(f"❌ Database connection failed: {e}")
\ No newline at end of file
+from modules.database import get_backend, get_db_connection
+
+
+def main():
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+        cursor.close()
+        print(f"✅ Database connection SUCCESSFUL! ({get_backend()})")
+        print("✅ You're ready to build your rental system!")
+        conn.close()
+        return True
+    except mysql.connector.Error as e:
+        print(f"❌ Database connection failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
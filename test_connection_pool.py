@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Connection Pool Tests
+Drives ConnectionPool with a fake connection factory: the size bound and
+checkout timeout, validation and discard of dead connections, reset on
+release, per-process pools and the stats shown on /admin/perf/queries.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import threading
+
+import pytest
+
+from modules import database
+from modules.database import ConnectionPool, PoolExhaustedError
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.closed = False
+        self.pings = []
+        self.unread_result = False
+        self.in_transaction = False
+        self.rolled_back = 0
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self.pings.append(reconnect)
+        if not self.alive:
+            raise database.mysql.connector.errors.OperationalError('gone away')
+
+    def consume_results(self):
+        self.unread_result = False
+
+    def rollback(self):
+        self.rolled_back += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeFactory:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        conn = FakeConnection(len(self.opened) + 1)
+        self.opened.append(conn)
+        return conn
+
+
+@pytest.fixture
+def factory():
+    return FakeFactory()
+
+
+def test_reuses_the_warmest_connection(factory):
+    pool = ConnectionPool(factory, size=3, timeout=0.1)
+    first, second = pool.acquire(), pool.acquire()
+    first.close()
+    second.close()
+    assert pool.acquire()._conn.number == 2     # last returned, first handed out
+    assert len(factory.opened) == 2
+
+
+def test_size_bound_and_checkout_timeout(factory):
+    pool = ConnectionPool(factory, size=2, timeout=0.05)
+    held = [pool.acquire(), pool.acquire()]
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire()
+    assert len(factory.opened) == 2
+
+    # A connection returned while waiting is handed to the waiter
+    threading.Timer(0.01, held[0].close).start()
+    pool.timeout = 1
+    assert pool.acquire()._conn is factory.opened[0]
+
+    stats = pool.stats()
+    assert (stats['in_use'], stats['created'], stats['checkouts']) == (2, 2, 3)
+    assert (stats['waits'], stats['timeouts']) == (2, 1)
+    assert stats['wait_time_ms'] > 0
+
+
+def test_dead_connections_are_discarded_not_reconnected(factory):
+    pool = ConnectionPool(factory, size=2, timeout=0.1)
+    conn = pool.acquire()
+    conn.close()
+    factory.opened[0].alive = False
+
+    fresh = pool.acquire()
+    assert fresh._conn is factory.opened[1]      # a new connection from the factory
+    assert factory.opened[0].closed
+    assert factory.opened[0].pings == [False]    # never asked to reconnect itself
+    assert pool.stats()['discarded'] == 1
+
+
+def test_no_validation_when_disabled(factory):
+    pool = ConnectionPool(factory, size=1, timeout=0.1, validate=False)
+    pool.acquire().close()
+    assert pool.acquire()._conn is factory.opened[0]
+    assert factory.opened[0].pings == []
+
+
+def test_release_resets_and_close_is_idempotent(factory):
+    pool = ConnectionPool(factory, size=1, timeout=0.1)
+    conn = pool.acquire()
+    raw = conn._conn
+    raw.unread_result = raw.in_transaction = True
+    conn.close()
+    conn.close()
+    assert (raw.unread_result, raw.in_transaction, raw.rolled_back) == (False, False, 1)
+    assert pool.stats()['in_use'] == 0 and pool.stats()['idle'] == 1
+    with pytest.raises(database.mysql.connector.errors.OperationalError):
+        conn.cursor()
+
+
+def test_failed_connect_frees_its_slot(factory):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise database.mysql.connector.errors.OperationalError("can't connect")
+        return factory()
+
+    pool = ConnectionPool(flaky, size=1, timeout=0.05)
+    with pytest.raises(database.mysql.connector.errors.OperationalError):
+        pool.acquire()
+    assert pool.acquire()._conn is factory.opened[0]
+
+
+def test_prewarm_and_close_all(factory):
+    pool = ConnectionPool(factory, size=3, timeout=0.1)
+    assert pool.prewarm(5) == 3
+    assert pool.prewarm(5) == 0
+    pool.close_all()
+    assert all(conn.closed for conn in factory.opened)
+    assert pool.stats()['idle'] == 0
+
+
+def test_pools_are_per_process(app, monkeypatch):
+    with app.app_context():
+        mine = database.get_pool('primary')
+        monkeypatch.setattr(database.os, 'getpid', lambda: -1)
+        forked = database.get_pool('primary')
+        assert forked is not mine
+        monkeypatch.undo()
+
+        # A forked child drops the parent's pools without closing their sockets
+        idle = FakeFactory()()
+        forked._idle.put(idle)
+        database.discard_inherited_pools()
+        assert (-1, 'primary') not in database._pools
+        assert not idle.closed
+        assert database.get_pool('primary') is mine
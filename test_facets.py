@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Facet Count Tests
+Checks the /houses sidebar counts against the seeded listings, computed both
+from the in-memory search index and from the SQL GROUP BY, and that they are
+cached per filter set and dropped when a listing changes.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import time
+
+import pytest
+
+from conftest import HOUSE_COUNT, NEIGHBORHOODS, PROPERTY_TYPES
+from modules.cache import TTLCache, get_cache
+from modules.database import get_db_connection
+from modules.facets import bucket_of, get_facets
+from modules.listing_cache import filter_key
+from modules.listing_events import record_listing_change
+from modules.warmup import warm_worker
+
+REGION_OF = {name: region_id for region_id, names in NEIGHBORHOODS.items() for name in names}
+NEIGHBORHOOD_NAMES = [name for names in NEIGHBORHOODS.values() for name in names]
+
+
+def _houses():
+    """(region_id, property_type, price) of every seeded house"""
+    return [(REGION_OF[NEIGHBORHOOD_NAMES[i % len(NEIGHBORHOOD_NAMES)]],
+             PROPERTY_TYPES[i % len(PROPERTY_TYPES)],
+             300 + (i * 37) % 4000) for i in range(HOUSE_COUNT)]
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm(app):
+    warm_worker(app)
+
+
+@pytest.fixture(autouse=True, params=['index', 'sql'])
+def engine(request, monkeypatch):
+    monkeypatch.setenv('SEARCH_INDEX_ENABLED', 'true' if request.param == 'index' else 'false')
+    get_cache('facets').invalidate()
+    get_cache('houses').invalidate()
+    return request.param
+
+
+def test_counts_leave_out_their_own_filter(app):
+    filters = {'region_id': 1, 'property_type': 'apartment', 'min_price': 500.0, 'max_price': 2500.0}
+    with app.app_context():
+        facets = get_facets(filters)
+    houses = _houses()
+
+    def in_price(price):
+        return 500 <= price <= 2500
+
+    assert facets['total'] == sum(1 for r, t, p in houses if r == 1 and t == 'apartment' and in_price(p))
+    for region_id in NEIGHBORHOODS:
+        expected = sum(1 for r, t, p in houses if r == region_id and t == 'apartment' and in_price(p))
+        assert facets['regions'].get(region_id, 0) == expected
+    for kind in PROPERTY_TYPES:
+        expected = sum(1 for r, t, p in houses if r == 1 and t == kind and in_price(p))
+        assert facets['property_types'].get(kind, 0) == expected
+    for i, bucket in enumerate(facets['price_buckets']):
+        expected = sum(1 for r, t, p in houses if r == 1 and t == 'apartment' and bucket_of(p) == i)
+        assert bucket['count'] == expected
+    assert sum(b['count'] for b in facets['price_buckets']) == \
+        sum(1 for r, t, p in houses if r == 1 and t == 'apartment')
+
+
+def test_counts_follow_text_search(app):
+    with app.app_context():
+        facets = get_facets({}, 'apartment')
+    assert facets['total'] == sum(1 for r, t, p in _houses() if t == 'apartment')
+    assert set(facets['property_types']) == {'apartment'}
+
+
+def test_houses_page_shows_counts(client):
+    response = client.get('/houses?property_type=apartment')
+    assert response.status_code == 200
+    apartments = sum(1 for r, t, p in _houses() if t == 'apartment')
+    assert f'Apartment ({apartments})'.encode() in response.data
+    assert b'class="facet-link' in response.data
+
+
+def test_cached_until_a_listing_changes(app, client):
+    cache = get_cache('facets')
+    client.get('/houses?region=2')
+    hits = cache.stats()['hits']
+    response = client.get('/houses?region=2&sort=price_low')
+    assert cache.stats()['hits'] == hits + 1
+    assert int(response.headers['X-DB-Queries']) <= 2
+
+    assert filter_key({}, '  Apartment   OSU ') == filter_key({}, 'apartment osu')
+
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        record_listing_change(cursor, 1)
+        conn.commit()
+    assert cache.stats()['entries'] == 0
+
+
+def test_ttl_cache_expiry_and_eviction():
+    cache = TTLCache('test', max_entries=2, ttl=0.05)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)                       # evicts 'b', the least recently used
+    assert cache.get('b') is None
+    assert cache.get_or_compute('c', lambda: 'recomputed') == 3
+    time.sleep(0.06)
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['expirations']) == (2, 2, 1, 1)
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
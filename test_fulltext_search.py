@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Full-Text Search Tests
+Runs /houses text searches against the seeded SQLite database, once through
+the in-memory search index and once through SQL (FTS5 standing in for MySQL's
+FULLTEXT index), and checks the query builders in modules/search.py.
+"""
+
+import sys
+import os
+import re
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from conftest import HOUSE_COUNT, NEIGHBORHOODS, PROPERTY_TYPES
+from modules.cache import get_cache
+from modules.database import get_db_connection
+from modules.listing_events import record_listing_change
+from modules.search import boolean_query, detect_mode, fts_query, tokenize
+from modules.warmup import warm_worker
+
+NEIGHBORHOOD_NAMES = [name for names in NEIGHBORHOODS.values() for name in names]
+
+
+def _house(i):
+    """(property type, neighborhood) of seeded house id i + 1"""
+    return PROPERTY_TYPES[i % len(PROPERTY_TYPES)], NEIGHBORHOOD_NAMES[i % len(NEIGHBORHOOD_NAMES)]
+
+
+def _ids_where(predicate):
+    return {i + 1 for i in range(HOUSE_COUNT) if predicate(*_house(i))}
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm(app):
+    warm_worker(app)
+
+
+@pytest.fixture(autouse=True, params=['index', 'sql'])
+def engine(request, monkeypatch):
+    monkeypatch.setenv('SEARCH_INDEX_ENABLED', 'true' if request.param == 'index' else 'false')
+    get_cache('facets').invalidate()
+    get_cache('houses').invalidate()
+    return request.param
+
+
+def _search(client, query, budget=3):
+    """Ids on the page; budget is the search, its search_analytics row and the
+    facet counts (free when the search index can answer them)"""
+    response = client.get(f'/houses?per_page=60&{query}')
+    assert response.status_code == 200
+    assert int(response.headers['X-DB-Queries']) <= budget
+    ids = [int(i) for i in re.findall(rb'/house/(\d+)"', response.data)]
+    assert b'Live listings are temporarily unavailable' not in response.data
+    return ids
+
+
+def test_natural_language_search(client):
+    ids = _search(client, 'search=apartment')
+    assert set(ids) == _ids_where(lambda kind, name: kind == 'apartment')
+
+
+def test_search_combines_with_filters(client):
+    ids = _search(client, 'search=apartment&region=1')
+    region_one = set(NEIGHBORHOODS[1])
+    assert set(ids) == _ids_where(lambda kind, name: kind == 'apartment' and name in region_one)
+
+
+def test_boolean_mode(client):
+    ids = _search(client, 'search=%2Bapartment+-osu')
+    assert set(ids) == _ids_where(lambda kind, name: kind == 'apartment' and name != 'Osu')
+
+    ids = _search(client, 'search=apart*&mode=boolean')
+    assert set(ids) == _ids_where(lambda kind, name: kind == 'apartment')
+
+
+def test_relevance_sort_ranks_full_matches_first(client):
+    ids = _search(client, 'search=apartment+osu&sort=relevance')
+    both = _ids_where(lambda kind, name: kind == 'apartment' and name == 'Osu')
+    either = _ids_where(lambda kind, name: kind == 'apartment' or name == 'Osu')
+
+    assert both
+    assert set(ids) == either
+    assert set(ids[:len(both)]) == both
+
+
+def test_relevance_pages_cover_every_match_once(client):
+    expected = _search(client, 'search=apartment+osu&sort=relevance')
+    seen, url = [], '/houses?search=apartment+osu&sort=relevance&per_page=4'
+    while url:
+        response = client.get(url)
+        seen.extend(int(i) for i in re.findall(rb'/house/(\d+)"', response.data))
+        match = re.search(rb'href="([^"]+)" rel="next"', response.data)
+        url = match.group(1).decode().replace('&amp;', '&') if match and match.group(1) != b'#' else None
+    assert seen == expected
+
+
+def test_short_terms_fall_back_to_title_match(client):
+    ids = _search(client, 'search=%231')
+    assert 1 in ids
+
+
+def test_index_follows_title_updates(app, client):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT title FROM houses WHERE id = 2")
+        original = cursor.fetchone()[0]
+        cursor.execute("UPDATE houses SET title = %s WHERE id = 2", ('Penthouse with lagoon view',))
+        record_listing_change(cursor, 2)
+        conn.commit()
+    try:
+        # + polling the change feed and re-reading house 2 for the index
+        assert _search(client, 'search=lagoon', budget=4) == [2]
+    finally:
+        with app.app_context():
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("UPDATE houses SET title = %s WHERE id = 2", (original,))
+            record_listing_change(cursor, 2)
+            conn.commit()
+    assert _search(client, 'search=lagoon', budget=4) == []
+
+
+def test_query_builders():
+    assert tokenize('The flat IN Osu, with a view') == ['flat', 'osu', 'view']
+    assert detect_mode('self contained') == 'natural'
+    assert detect_mode('+self -chamber') == 'boolean'
+    assert detect_mode('"east legon"') == 'boolean'
+    assert detect_mode('+self', 'natural') == 'natural'
+
+    assert fts_query('apartment osu', 'natural') == '"apartment" OR "osu"'
+    assert fts_query('+apartment "east legon" -osu', 'boolean') == '("apartment") NOT "osu"'
+    assert fts_query('apart*', 'boolean') == '("apart"*)'
+    assert fts_query('-osu', 'boolean') is None
+    assert fts_query('a of', 'natural') is None
+
+    assert boolean_query('+apartment "east legon" -osu') == '+apartment "east legon" -osu'
+    assert boolean_query('+"unclosed @@ >< ~room') == 'unclosed room'
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
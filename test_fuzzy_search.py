@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Search Tests
+Checks the trigram index behind /houses' "did you mean" link and fuzzy mode
+against the seeded listings: misspelt words and place names are corrected
+from memory, and the index follows listing writes.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import re
+
+import pytest
+
+from conftest import HOUSE_COUNT, NEIGHBORHOODS, PROPERTY_TYPES
+from modules import fuzzy
+from modules.cache import get_cache
+from modules.database import DatabaseUnavailableError, get_breaker, get_db_connection
+from modules.fuzzy import get_fuzzy_index, similarity
+from modules.listing_events import record_listing_change
+from modules.warmup import warm_worker
+
+NEIGHBORHOOD_REGIONS = [region_id for region_id, names in NEIGHBORHOODS.items() for _ in names]
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm(app):
+    warm_worker(app)
+
+
+def _ids(html):
+    return sorted(int(house_id) for house_id in re.findall(r'href="/house/(\d+)"', html))
+
+
+def _search(client, **params):
+    response = client.get('/houses', query_string={'per_page': 60, **params})
+    assert response.status_code == 200
+    return response
+
+
+def _did_you_mean(html):
+    match = re.search(r'Did you mean\s*<a href="([^"]*)"[^>]*>([^<]*)</a>', html)
+    return (match.group(1).replace('&amp;', '&'), match.group(2)) if match else None
+
+
+def test_similarity():
+    assert similarity('kumasi', 'kumasi') == 1
+    assert similarity('kumase', 'kumasi') > 0.5
+    assert similarity('contain', 'contained') > 0.6
+    assert similarity('osu', 'madina') == 0
+
+
+def test_rewrite(app):
+    with app.app_context():
+        index = get_fuzzy_index()
+        assert index.rewrite('apartmnt in osuu').search == 'apartment in osu'
+        assert index.rewrite('self contain').expanded == 'self contained'
+
+        kumase = index.rewrite('Kumase apartments')
+        assert (kumase.region_name, kumase.search) == ('Ashanti', 'apartment')
+        assert kumase.changed
+
+        assert not index.rewrite('apartment in Osu').changed
+        assert not index.rewrite('qqqqqq').changed
+
+
+def test_did_you_mean(client):
+    html = _search(client, search='apartmnt in madinna').get_data(as_text=True)
+    assert _ids(html) == []
+    url, text = _did_you_mean(html)
+    assert text == 'apartment in madina'
+    assert _ids(client.get(url).get_data(as_text=True))
+
+    url, text = _did_you_mean(_search(client, search='kumase').get_data(as_text=True))
+    assert text == 'in Ashanti' and 'region=2' in url and 'search=' not in url
+
+    nothing = _search(client, search='qqqqqq').get_data(as_text=True)
+    assert _ids(nothing) == [] and _did_you_mean(nothing) is None
+
+
+def test_fuzzy_mode(client):
+    apartments = [i + 1 for i in range(HOUSE_COUNT) if PROPERTY_TYPES[i % len(PROPERTY_TYPES)] == 'apartment']
+    assert _ids(_search(client, search='apartmnt', mode='fuzzy').get_data(as_text=True)) == apartments
+
+    self_contained = _ids(_search(client, search='self contained').get_data(as_text=True))
+    assert _ids(_search(client, search='self contain', mode='fuzzy').get_data(as_text=True)) == self_contained
+
+    ashanti = [i + 1 for i in range(HOUSE_COUNT) if NEIGHBORHOOD_REGIONS[i % len(NEIGHBORHOOD_REGIONS)] == 2]
+    html = _search(client, search='Kumase', mode='fuzzy').get_data(as_text=True)
+    assert _ids(html) == ashanti
+    assert 'value="fuzzy"\n                                   checked' in html
+
+
+def test_follows_listing_writes(app, client):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT title FROM houses WHERE id = 9")
+        title = cursor.fetchone()[0]
+        cursor.execute("UPDATE houses SET title = %s WHERE id = 9", ('Zebra Lodge',))
+        record_listing_change(cursor, 9)
+        conn.commit()
+
+    assert _ids(_search(client, search='zebre', mode='fuzzy').get_data(as_text=True)) == [9]
+
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("UPDATE houses SET title = %s WHERE id = 9", (title,))
+        record_listing_change(cursor, 9)
+        conn.commit()
+        assert get_fuzzy_index().rewrite('zebre').search == 'zebre'
+
+
+def test_lookup_scores_only_words_sharing_a_trigram(app):
+    with app.app_context():
+        index = get_fuzzy_index()
+    vocabulary = len(set(index.counts) | set(index.places))
+    for term in ['apartmnt', 'Kumase', 'self contain', 'osuu', 'east legn', 'chambr hall in bantma']:
+        lookups, compared = index.lookups, index.compared
+        index.rewrite(term)
+        words = index.lookups - lookups
+        assert 0 < index.compared - compared < words * vocabulary / 2, term
+
+    compared = index.compared
+    assert not index.rewrite('qqqq').changed
+    assert index.compared == compared
+
+
+def test_search_without_the_fuzzy_index(client, monkeypatch):
+    """A fuzzy index that can't load leaves an ordinary search, not an error"""
+    def unavailable(self):
+        raise DatabaseUnavailableError(msg="Database circuit 'primary' is open")
+
+    monkeypatch.setattr(fuzzy, '_index', None)
+    monkeypatch.setattr(fuzzy.FuzzyIndex, 'load', unavailable)
+    get_cache('houses').invalidate()
+
+    html = _search(client, search='apartmnt in madinna').get_data(as_text=True)
+    assert _ids(html) == [] and _did_you_mean(html) is None
+    assert _ids(_search(client, search='apartment', mode='fuzzy').get_data(as_text=True)) == \
+        _ids(_search(client, search='apartment').get_data(as_text=True))
+
+
+def test_fuzzy_mode_while_the_database_is_down(client, monkeypatch):
+    monkeypatch.setattr(fuzzy, '_index', None)  # loading it needs the database
+    get_cache('houses').invalidate()
+    primary = get_breaker('primary')
+    primary.open()
+    try:
+        response = _search(client, search='legon', mode='fuzzy')
+    finally:
+        primary.record_success()
+    assert b'Live listings are temporarily unavailable' in response.data
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Radius Search Tests
+Checks geohash encoding and cell covers, and /houses?lat=&lng=&radius=
+against distances computed in Python for the seeded listings, including
+nearest-first keyset paging.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import random
+import re
+
+import pytest
+
+from conftest import HOUSE_COUNT, NEIGHBORHOODS, PROPERTY_TYPES, house_location
+from modules.geo import NearSearch, bounding_box, cover_cells, encode_geohash, haversine_km, location_columns
+from modules.warmup import warm_worker
+
+NEIGHBORHOOD_NAMES = [name for names in NEIGHBORHOODS.values() for name in names]
+EAST_LEGON = (5.6360, -0.1610)
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm(app):
+    warm_worker(app)
+
+
+def _within(lat, lng, radius_km, property_type=None):
+    """[(distance, house id)] of seeded houses inside the circle, nearest first"""
+    found = []
+    for i in range(HOUSE_COUNT):
+        location = house_location(i, NEIGHBORHOOD_NAMES[i % len(NEIGHBORHOOD_NAMES)])
+        if location is None or (property_type and PROPERTY_TYPES[i % len(PROPERTY_TYPES)] != property_type):
+            continue
+        distance = haversine_km(lat, lng, *location)
+        if distance <= radius_km:
+            found.append((distance, i + 1))
+    return sorted(found)
+
+
+def _ids(html):
+    return [int(house_id) for house_id in re.findall(r'href="/house/(\d+)"', html)]
+
+
+def test_geohash():
+    assert encode_geohash(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    assert location_columns('5.6037', '-0.187') == (5.6037, -0.187, 'ebzzgspgf')
+    assert location_columns('', '') == (None, None, None)
+    assert location_columns('95', '0') == (None, None, None)
+
+
+@pytest.mark.parametrize('radius_km', [0.5, 5, 40, 100])
+def test_cells_cover_the_circle(radius_km):
+    rng = random.Random(radius_km)
+    lat, lng = EAST_LEGON
+    box = bounding_box(lat, lng, radius_km)
+    cells = cover_cells(box)
+    assert 1 <= len(cells) <= 16
+    for _ in range(500):
+        point = (rng.uniform(box[0], box[1]), rng.uniform(box[2], box[3]))
+        assert any(encode_geohash(*point).startswith(cell) for cell in cells)
+
+
+def test_radius_search_nearest_first(client):
+    expected = _within(*EAST_LEGON, 3)
+    assert 0 < len(expected) < HOUSE_COUNT
+    response = client.get('/houses?lat=5.6360&lng=-0.1610&radius=3&sort=distance&per_page=60')
+    html = response.get_data(as_text=True)
+    assert _ids(html) == [house_id for _, house_id in expected]
+    assert f'{expected[0][0]:.1f} km away' in html
+    assert int(response.headers['X-DB-Queries']) <= 2      # the page + search_analytics
+
+
+def test_radius_search_pages_and_filters(client):
+    expected = [house_id for _, house_id in _within(*EAST_LEGON, 25, 'apartment')]
+    seen, url = [], '/houses?lat=5.6360&lng=-0.1610&radius=25&sort=distance&property_type=apartment&per_page=2'
+    while url:
+        html = client.get(url).get_data(as_text=True)
+        seen.extend(_ids(html))
+        match = re.search(r'href="(/houses\?[^"]*cursor=[^"]*)"[^>]*>\s*Next', html)
+        url = match.group(1).replace('&amp;', '&') if match else None
+    assert seen == expected
+
+
+def test_other_sorts_and_fallbacks(client):
+    newest = _ids(client.get('/houses?lat=5.6360&lng=-0.1610&radius=3&sort=newest').get_data(as_text=True))
+    assert sorted(newest) == sorted(house_id for _, house_id in _within(*EAST_LEGON, 3))
+    assert newest == sorted(newest)         # seeded newest = lowest id
+
+    # No position: distance sort falls back, and bad coordinates are ignored
+    plain = client.get('/houses?sort=distance').get_data(as_text=True)
+    assert 'data-card="distance"' not in plain and _ids(plain)
+    assert _ids(client.get('/houses?lat=abc&lng=1').get_data(as_text=True)) == _ids(plain)
+
+
+def test_sql_matches_python_distance(app):
+    from modules.database import get_db_connection
+    near = NearSearch(*EAST_LEGON, 10)
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"SELECT h.id{near.select_sql} FROM houses h WHERE 1=1{near.where_sql} ORDER BY h.id",
+                       near.select_params + near.where_params)
+        rows = cursor.fetchall()
+        cursor.close()
+    expected = {house_id: distance for distance, house_id in _within(*EAST_LEGON, 10)}
+    assert {row['id'] for row in rows} == set(expected)
+    for row in rows:
+        assert row['distance'] == pytest.approx(expected[row['id']], abs=1e-6)
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
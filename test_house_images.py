@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+House Image Tests
+Images live in house_images rows: the migration backfills them from the old
+image_paths JSON, detail/edit pages load them in one batched query, and list
+views join only the cover.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+
+import pytest
+
+from modules.cache import get_cache
+from modules.database import get_db_connection
+from modules.house_images import (backfill_house_images, legacy_image_paths, load_house_images,
+                                  save_house_images)
+from modules.listing_events import record_listing_change
+
+
+class CountingCursor:
+    """Wraps a cursor to count the statements it runs"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.statements = 0
+
+    def execute(self, *args):
+        self.statements += 1
+        return self.cursor.execute(*args)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    get_cache('houses').invalidate()
+    get_cache('pages').invalidate()
+
+
+def test_legacy_image_paths():
+    assert legacy_image_paths('["a.jpg", "b.jpg"]') == ['a.jpg', 'b.jpg']
+    assert legacy_image_paths("['a.jpg']") == ['a.jpg']
+    assert legacy_image_paths('house_5/a.jpg') == ['house_5/a.jpg']
+    assert legacy_image_paths('"a.jpg"') == ['a.jpg']
+    assert legacy_image_paths(None) == []
+
+
+def test_backfill_from_image_paths(app):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT id, image_paths FROM houses WHERE id IN (30, 31, 32) ORDER BY id")
+            saved = cursor.fetchall()
+            cursor.execute("SELECT house_id, position, path, width, height, bytes FROM house_images")
+            existing = cursor.fetchall()
+            cursor.execute("DELETE FROM house_images")
+            for house_id, value in [(30, '["house_30/a.jpg", "house_30/b.jpg"]'),
+                                    (31, "['house_31/a.jpg']"),
+                                    (32, 'house_32/only.jpg')]:
+                cursor.execute("UPDATE houses SET image_paths = %s WHERE id = %s", (value, house_id))
+
+            assert backfill_house_images()(cursor) is True
+            assert backfill_house_images()(cursor) is False      # only ever fills an empty table
+            cursor.execute("SELECT house_id, position, path FROM house_images ORDER BY house_id, position")
+            assert cursor.fetchall() == [(30, 0, 'house_30/a.jpg'), (30, 1, 'house_30/b.jpg'),
+                                         (31, 0, 'house_31/a.jpg'), (32, 0, 'house_32/only.jpg')]
+        finally:
+            cursor.execute("DELETE FROM house_images")
+            if existing:
+                cursor.executemany("""
+                    INSERT INTO house_images (house_id, position, path, width, height, bytes)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """, existing)
+            for house_id, value in saved:
+                cursor.execute("UPDATE houses SET image_paths = %s WHERE id = %s", (value, house_id))
+            conn.commit()
+            cursor.close()
+
+
+def test_save_replaces_rows_and_mirrors_json(app, client):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        save_house_images(cursor, 5, ['house_5/front.jpg', 'house_5/kitchen.jpg', 'house_5/yard.jpg'])
+        save_house_images(cursor, 5, ['house_5/kitchen.jpg', 'house_5/front.jpg'])
+        save_house_images(cursor, 6, ['house_6/front.jpg'])
+        record_listing_change(cursor, 5)
+        record_listing_change(cursor, 6)
+        conn.commit()
+
+        cursor.execute("SELECT image_paths FROM houses WHERE id = 5")
+        assert json.loads(cursor.fetchone()['image_paths']) == ['house_5/kitchen.jpg', 'house_5/front.jpg']
+
+        counting = CountingCursor(cursor)
+        images = load_house_images(counting, [5, 6, 7, 5])
+        assert counting.statements == 1
+        assert [image['path'] for image in images[5]] == ['house_5/kitchen.jpg', 'house_5/front.jpg']
+        assert [image['position'] for image in images[5]] == [0, 1]
+        assert [image['path'] for image in images[6]] == ['house_6/front.jpg']
+        assert images[7] == []
+        cursor.close()
+
+    detail = client.get('/house/5').get_data(as_text=True)
+    assert 'uploads/house_5/kitchen.jpg' in detail and 'uploads/house_5/front.jpg' in detail
+
+    # Cards only carry the cover
+    listing = client.get('/houses?sort=price_low&per_page=50').get_data(as_text=True)
+    assert 'uploads/house_5/kitchen.jpg' in listing
+    assert 'uploads/house_5/front.jpg' not in listing
+
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        for house_id in (5, 6):
+            save_house_images(cursor, house_id, [])
+            record_listing_change(cursor, house_id)
+        conn.commit()
+        cursor.execute("SELECT COUNT(*) FROM house_images WHERE house_id IN (5, 6)")
+        assert cursor.fetchone()[0] == 0
+        cursor.execute("SELECT image_paths FROM houses WHERE id = 5")
+        assert json.loads(cursor.fetchone()[0]) == ['house_placeholder.jpg']
+        cursor.close()
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Index Verification Tests
+Applies the schema migrations and checks with EXPLAIN (EXPLAIN QUERY PLAN on
+SQLite) that the hot listing, analytics and dashboard queries can use the
+indexes created for them
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import re
+import pytest
+
+os.environ.setdefault('DB_MIGRATION_CHECK', 'false')
+
+from app import app
+from modules.database import get_backend, get_db_connection
+from modules.migrations import MIGRATIONS, _existing_indexes, migrate
+
+# (description, query, params, index the plan must be able to use)
+HOT_QUERIES = [
+    ('Landing page newest first',
+     "SELECT h.id FROM listing_read_model h ORDER BY h.created_at DESC LIMIT 12",
+     (), 'idx_read_model_created_at'),
+    ('Browse houses by region/type/price',
+     "SELECT h.id FROM listing_read_model h WHERE h.region_id = %s AND h.property_type = %s AND h.price >= %s",
+     (1, 'single_room', 100), 'idx_read_model_region_type_price'),
+    ('Browse houses, next page by price',
+     "SELECT h.id FROM listing_read_model h WHERE (h.price > %s OR (h.price = %s AND h.id > %s)) "
+     "ORDER BY h.price ASC, h.id ASC LIMIT 25",
+     (500, 500, 10), 'idx_read_model_price'),
+    ('Browse houses, recommended, next page',
+     "SELECT h.id FROM listing_read_model h WHERE (h.rank_score < %s OR (h.rank_score = %s AND h.id < %s)) "
+     "ORDER BY h.rank_score DESC, h.id DESC LIMIT 25",
+     (100, 100, 10), 'idx_read_model_rank'),
+    ('Browse houses, next page by name',
+     "SELECT h.id FROM listing_read_model h WHERE (h.title > %s OR (h.title = %s AND h.id > %s)) "
+     "ORDER BY h.title ASC, h.id ASC LIMIT 25",
+     ('M', 'M', 10), 'idx_read_model_title'),
+    ('Radius search, one geohash cell',
+     "SELECT h.id FROM listing_read_model h WHERE h.geohash >= %s AND h.geohash < %s",
+     ('ebzzd', 'ebzzh'), 'idx_read_model_geohash'),
+    ('Radius search, bounding box',
+     "SELECT h.id FROM listing_read_model h WHERE h.latitude BETWEEN %s AND %s AND h.longitude BETWEEN %s AND %s",
+     (5.55, 5.65, -0.24, -0.14), 'idx_read_model_lat_lng'),
+    ('Landlord dashboard',
+     "SELECT h.id FROM listing_read_model h WHERE h.created_by = %s ORDER BY h.created_at DESC",
+     (1,), 'idx_read_model_created_by'),
+    ('Tenant viewing history',
+     "SELECT pv.property_id FROM property_views pv WHERE pv.user_id = %s ORDER BY pv.viewed_at DESC LIMIT 20",
+     (1,), 'idx_property_views_user_viewed'),
+    ('Views per property',
+     "SELECT COUNT(*) FROM property_views WHERE property_id = %s",
+     (1,), 'idx_property_views_property'),
+    ('30-day search analytics',
+     "SELECT COUNT(*) FROM search_analytics WHERE searched_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)",
+     (), 'idx_search_analytics_searched_at'),
+    ('Engagement for user and day',
+     "SELECT * FROM user_engagement WHERE user_id = %s AND date = %s",
+     (1, '2024-01-01'), 'idx_user_engagement_user_date'),
+    ('Critical pending reports',
+     "SELECT COUNT(*) FROM reports WHERE status = 'pending' AND priority IN ('high', 'urgent')",
+     (), 'idx_reports_status_priority'),
+]
+
+
+def _usable_indexes(cursor, query, params):
+    """Names of indexes the optimizer considered or picked for a query"""
+    if get_backend() == 'sqlite':
+        cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+        return {name for row in cursor.fetchall()
+                for name in re.findall(r'USING (?:COVERING )?INDEX (\w+)', row['detail'])}
+
+    cursor.execute("EXPLAIN " + query, params)
+    names = set()
+    for row in cursor.fetchall():
+        for column in ('possible_keys', 'key'):
+            if row.get(column):
+                names.update(name.strip() for name in row[column].split(','))
+    return names
+
+
+def _acceptable_indexes(index):
+    """The migration's index plus any pre-existing index on the same columns"""
+    step = next(step for migration in MIGRATIONS for step in migration['steps']
+                if getattr(step, 'index_name', None) == index)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        existing = _existing_indexes(cursor, step.table)
+    finally:
+        cursor.close()
+        conn.close()
+    return {index} | {name for name, columns in existing.items() if columns == step.columns}
+
+
+def _check(cursor, query, params, index):
+    usable = _usable_indexes(cursor, query, params)
+    return usable & _acceptable_indexes(index), usable
+
+
+@pytest.fixture(scope='module')
+def cursor(app):
+    with app.app_context():
+        try:
+            conn = get_db_connection()
+        except Exception as e:
+            pytest.skip(f"Database not reachable: {e}")
+        migrate(verbose=False)
+        cursor = conn.cursor(dictionary=True)
+        yield cursor
+        cursor.close()
+        conn.close()
+
+
+@pytest.mark.parametrize('description,query,params,index', HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+def test_hot_query_uses_index(cursor, description, query, params, index):
+    matched, usable = _check(cursor, query, params, index)
+    assert matched, f"{description}: {index} not usable (plan considered {sorted(usable) or 'full scan'})"
+
+
+def test_recommended_order_reads_the_index(cursor):
+    """The default sort is a walk down idx_read_model_rank, never a sort of the matches"""
+    query = "SELECT h.id FROM listing_read_model h ORDER BY h.rank_score DESC, h.id DESC LIMIT 25"
+    if get_backend() == 'sqlite':
+        cursor.execute("EXPLAIN QUERY PLAN " + query)
+        plan = ' '.join(row['detail'] for row in cursor.fetchall())
+        assert 'TEMP B-TREE' not in plan, plan
+    else:
+        cursor.execute("EXPLAIN " + query)
+        plan = ' '.join(row.get('Extra') or '' for row in cursor.fetchall())
+        assert 'filesort' not in plan, plan
+
+
+def main():
+    print("🔍 Verifying hot query indexes")
+    print("=" * 50)
+    failed = 0
+    with app.app_context():
+        migrate()
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        for description, query, params, index in HOT_QUERIES:
+            matched, usable = _check(cursor, query, params, index)
+            ok = bool(matched)
+            failed += 0 if ok else 1
+            print(f"{'✅' if ok else '❌'} {description}: {', '.join(sorted(usable)) or 'full scan'}")
+        cursor.close()
+        conn.close()
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Listing Cache Tests
+Checks that /houses pages are served from the result cache and that a write
+to a house drops just the cached pages it can change, in this worker and (via
+the listing_changes feed) in the others.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from modules.cache import get_cache
+from modules.database import get_db_connection
+from modules.listing_events import poll_listing_changes, record_listing_change
+from modules.warmup import warm_worker
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm(app):
+    warm_worker(app)
+
+
+@pytest.fixture
+def cache():
+    houses_cache = get_cache('houses')
+    houses_cache.invalidate()
+    return houses_cache
+
+
+def _cached(cache, client, url):
+    """Whether url is answered from the cache right now"""
+    hits = cache.stats()['hits']
+    response = client.get(url)
+    assert response.status_code == 200
+    return cache.stats()['hits'] == hits + 1
+
+
+def _set_price(app, house_id, price, log=True):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT price FROM houses WHERE id = %s", (house_id,))
+        old_price = cursor.fetchone()[0]
+        cursor.execute("UPDATE houses SET price = %s WHERE id = %s", (price, house_id))
+        if log:
+            record_listing_change(cursor, house_id)
+        conn.commit()
+    return old_price
+
+
+def test_repeat_requests_are_cached(cache, client):
+    hits = cache.stats()['hits']            # counters outlive invalidate()
+    assert not _cached(cache, client, '/houses?sort=price_low')
+    assert _cached(cache, client, '/houses?sort=price_low')
+    assert client.get('/houses?sort=price_low').headers['X-DB-Queries'] == '0'
+    assert not _cached(cache, client, '/houses?sort=price_high')
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['hits'] == hits + 2
+
+
+def test_write_drops_only_affected_pages(app, cache, client):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM houses WHERE region_id = 1 ORDER BY price DESC, id DESC LIMIT 1 OFFSET 5")
+        house_id = cursor.fetchone()[0]
+
+    # Made the cheapest listing in region 1: it joins the first price_low page
+    # there, but can't touch the priciest page or region 2
+    cheapest = '/houses?region=1&sort=price_low&per_page=3'
+    priciest = '/houses?region=1&sort=price_high&per_page=3'
+    other_region = '/houses?region=2&sort=price_low&per_page=3'
+    for url in (cheapest, priciest, other_region):
+        client.get(url)
+
+    old_price = _set_price(app, house_id, 10)
+    try:
+        assert not _cached(cache, client, cheapest)
+        assert _cached(cache, client, priciest)
+        assert _cached(cache, client, other_region)
+        assert f'/house/{house_id}"'.encode() in client.get(cheapest).data
+    finally:
+        _set_price(app, house_id, old_price)
+    assert f'/house/{house_id}"'.encode() not in client.get(cheapest).data
+
+
+def test_other_workers_writes_arrive_through_the_feed(app, cache, client):
+    url = '/houses?sort=price_high&per_page=3'
+    client.get(url)
+    old_price = _set_price(app, 3, 99999, log=False)
+    try:
+        assert _cached(cache, client, url)          # this worker hasn't heard yet
+        with app.app_context():
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO listing_changes (house_id, op) VALUES (%s, %s)", (3, 'upsert'))
+            conn.commit()
+            poll_listing_changes(force=True)
+        assert not _cached(cache, client, url)
+    finally:
+        _set_price(app, 3, old_price)
+
+
+def _add_house(app, price):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO houses (title, description, region_id, neighborhood_id, exact_location,
+                                property_type, completion_status, price, created_by)
+            VALUES (%s, %s, 1, 1, %s, %s, %s, %s, 2)
+        """, ('Cache test house', 'A house for the listing cache tests', 'Near the junction',
+              'apartment', 'completed', price))
+        house_id = cursor.lastrowid
+        record_listing_change(cursor, house_id)
+        conn.commit()
+    return house_id
+
+
+def _delete_house(app, house_id):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM houses WHERE id = %s", (house_id,))
+        record_listing_change(cursor, house_id, 'delete')
+        conn.commit()
+
+
+def test_delete_drops_the_page_leading_to_it(app, cache, client):
+    house_ids = [_add_house(app, 90001), _add_house(app, 90002)]
+    try:
+        first = '/api/houses?min_price=90000&sort=price_low&per_page=1'
+        second = client.get(first).get_json()['next_url']
+        assert second and client.get(second).get_json()['houses']
+
+        # The only house on the second page goes: the first one is now the last
+        _delete_house(app, house_ids.pop())
+        assert not _cached(cache, client, first)
+        assert client.get(first).get_json()['next_cursor'] is None
+    finally:
+        for house_id in house_ids:
+            _delete_house(app, house_id)
+
+
+def test_pages_built_during_a_write_are_not_stored(cache):
+    generation = cache.generation
+    cache.invalidate()
+    assert not cache.put('stale', 'page', generation=generation)
+    assert cache.put('fresh', 'page', generation=cache.generation)
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Listing Card Tests
+List views use the narrow ListingCard projection; only house_detail loads
+the full row
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from modules.database import get_db_connection
+from modules.listings import (LISTING_CARD_COLUMNS, LISTING_CARD_FIELDS, LISTING_CARD_FROM,
+                              ListingCard, fetch_listing_cards)
+
+
+@pytest.fixture
+def cards(app):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        yield fetch_listing_cards(cursor, f"""
+            SELECT {LISTING_CARD_COLUMNS}
+            {LISTING_CARD_FROM}
+            ORDER BY h.id
+        """)
+        cursor.close()
+
+
+def test_card_projection(cards):
+    card = cards[0]
+    assert len(card.description) == 101
+    assert card['region_name'] == card.region_name == 'Greater Accra'
+    assert card.cover_image is None             # seeded with the placeholder only
+    assert card.get('contact_phone') is None
+    assert 'contact_phone' not in card
+    with pytest.raises(KeyError):
+        card['contact_phone']
+    assert set(card.to_dict()) == set(LISTING_CARD_FIELDS)
+
+
+def test_card_from_tuple_row():
+    card = ListingCard((7, 'Room', 'Nice', 500, 'single_room', 'completed', 'a.jpg',
+                        0, 1, None, 'Ashanti', 'Adum'))
+    assert card.id == 7
+    assert card.cover_image == 'a.jpg'
+
+
+def test_list_pages_truncate_descriptions_and_detail_does_not(client):
+    listing = client.get('/houses').get_data(as_text=True)
+    detail = client.get('/house/1').get_data(as_text=True)
+    full = "A well kept single room close to East Legon market and transport. " * 3
+
+    assert full[:100] in listing
+    assert full.strip() not in listing
+    assert full.strip() in detail
+
+
+def test_chatbot_returns_card_fields(client):
+    response = client.post('/chatbot', json={'message': 'show me a single room'})
+    properties = response.get_json()['properties']
+
+    assert properties
+    assert set(properties[0]) == set(LISTING_CARD_FIELDS)
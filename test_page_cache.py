@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Page Cache Tests
+Checks the anonymous full-page cache on '/', '/houses' and '/house/<id>':
+ETag/304 revalidation, bypass for logged-in users and pending flashes,
+analytics on cache hits and invalidation on listing writes.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from modules.cache import get_cache
+from modules.database import get_db_connection
+from modules.listing_events import record_listing_change
+from modules.warmup import warm_worker
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm(app):
+    warm_worker(app)
+
+
+@pytest.fixture(autouse=True)
+def page_cache(monkeypatch):
+    monkeypatch.setenv('PAGE_CACHE_TTL', '60')
+    get_cache('pages').invalidate()
+
+
+def _count(app, query, params=()):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.parametrize('url', ['/', '/houses?region=1&sort=price_low', '/house/4'])
+def test_repeat_visits_are_cached_with_etag(client, url):
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.headers['X-Page-Cache'] == 'miss'
+    etag = first.headers['ETag']
+
+    second = client.get(url)
+    assert second.headers['X-Page-Cache'] == 'hit'
+    assert second.headers['ETag'] == etag
+    assert second.data == first.data
+
+    revalidated = client.get(url, headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+
+    assert client.get(url, headers={'If-None-Match': '"stale"'}).status_code == 200
+
+
+def test_hits_still_record_views_and_searches(app, client):
+    views = "SELECT COUNT(*) FROM property_views WHERE property_id = %s"
+    searches = "SELECT COUNT(*) FROM search_analytics"
+    client.get('/house/5')
+    client.get('/houses?property_type=store')
+    before = _count(app, views, (5,)), _count(app, searches)
+
+    assert client.get('/house/5').headers['X-Page-Cache'] == 'hit'
+    assert client.get('/houses?property_type=store').headers['X-Page-Cache'] == 'hit'
+    assert int(client.get('/house/5').headers['X-DB-Queries']) == 2   # the view row + daily performance
+    assert (_count(app, views, (5,)), _count(app, searches)) == (before[0] + 2, before[1] + 1)
+
+
+def test_logged_in_users_and_flashes_bypass_the_cache(client, login_as):
+    client.get('/')
+    with client.session_transaction() as sess:
+        sess['_flashes'] = [('info', 'Welcome back')]
+    response = client.get('/')
+    assert 'X-Page-Cache' not in response.headers
+
+    login_as('tenant')
+    assert 'X-Page-Cache' not in client.get('/').headers
+    assert 'X-Page-Cache' not in client.get('/house/4').headers
+
+
+def test_listing_writes_invalidate(app, client):
+    for url in ('/', '/houses', '/house/6', '/house/7'):
+        client.get(url)
+
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        record_listing_change(cursor, 6)
+        conn.commit()
+
+    assert client.get('/').headers['X-Page-Cache'] == 'miss'
+    assert client.get('/houses').headers['X-Page-Cache'] == 'miss'
+    assert client.get('/house/6').headers['X-Page-Cache'] == 'miss'
+    assert client.get('/house/7').headers['X-Page-Cache'] == 'hit'
+
+
+def test_missing_house_is_not_cached(client):
+    assert client.get('/house/99999').status_code == 404
+    assert 'X-Page-Cache' not in client.get('/house/99999').headers
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Query Count Regression Tests
+Renders every page against the seeded SQLite database (see conftest.py) and
+fails when a route starts running more statements or borrowing more
+connections than its budget. Budgets assume a warmed worker
+(modules/warmup.py), i.e. reference data is already in memory. Lower a
+budget when a change makes a page cheaper.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from modules.warmup import warm_worker
+
+# (logged in as, url, expected status, max statements per request)
+ROUTE_BUDGETS = [
+    (None, '/', 200, 1),
+    (None, '/houses', 200, 1),
+    (None, '/houses?search=room&region=1&min_price=500&sort=price_low', 200, 2),
+    (None, '/house/5', 200, 4),
+    (None, '/login', 200, 0),
+    ('tenant', '/tenant-dashboard', 200, 2),
+    ('tenant', '/user-analytics', 200, 6),
+    ('tenant', '/profile', 200, 1),
+    ('tenant', '/my-reports', 200, 1),
+    ('landlord', '/admin/landlord-dashboard', 200, 1),
+    ('landlord', '/admin/landlord-revenue', 200, 1),
+    ('landlord', '/admin/landlord/add-property', 200, 0),
+    ('landlord', '/admin/landlord/edit-property/1', 200, 2),
+    ('admin', '/admin/dashboard', 200, 47),
+    ('admin', '/admin/manage-houses', 200, 2),
+    ('admin', '/admin/manage-users', 200, 2),
+    ('admin', '/admin/reports', 200, 2),
+    ('admin', '/admin/reports/1', 200, 1),
+    ('admin', '/admin/add-house', 200, 0),
+    ('admin', '/admin/edit-house/1', 200, 2),
+    ('admin', '/admin/edit-user/3', 200, 1),
+]
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm(app):
+    """Budgets are for a warm worker (see gunicorn.conf.py)"""
+    warm_worker(app)
+
+
+@pytest.mark.parametrize('user,url,status,budget', ROUTE_BUDGETS,
+                         ids=[f"{user or 'anonymous'} {url}" for user, url, _, _ in ROUTE_BUDGETS])
+def test_route_query_budget(client, login_as, user, url, status, budget):
+    if user:
+        login_as(user)
+    response = client.get(url)
+
+    assert response.status_code == status
+    queries = int(response.headers['X-DB-Queries'])
+    assert queries <= budget, f"{url} ran {queries} statements (budget {budget})"
+    assert int(response.headers['X-DB-Connections']) <= 1
+
+
+def test_chatbot_query_budget(client):
+    response = client.post('/chatbot', json={'message': 'single room in accra'})
+
+    assert response.status_code == 200
+    assert int(response.headers['X-DB-Queries']) <= 1
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Query Statistics Tests
+Checks statement fingerprinting, the per-fingerprint aggregation the
+instrumented cursors feed, and the admin page that shows it (HTML, JSON and
+reset).
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from modules.query_stats import QueryStatsRegistry, fingerprint, query_stats
+
+
+@pytest.mark.parametrize('first, second', [
+    ("SELECT * FROM houses WHERE id = 5", "SELECT * FROM houses WHERE id = 42"),
+    ("SELECT * FROM houses WHERE title = 'Osu'", "SELECT * FROM houses WHERE title = 'It''s Adum'"),
+    ("SELECT * FROM houses WHERE id = %s", "SELECT * FROM houses WHERE id = ?"),
+    ("SELECT * FROM houses WHERE id IN (1, 2, 3)", "SELECT * FROM houses WHERE id IN (%s)"),
+    ("SELECT id\n  FROM houses  -- cards\n WHERE price > 300.5", "SELECT id FROM houses /* x */ WHERE price > %(min)s"),
+    (b"SELECT * FROM houses WHERE id = 1", "SELECT * FROM houses WHERE id = 2"),
+])
+def test_literals_do_not_split_fingerprints(first, second):
+    assert fingerprint(first) == fingerprint(second)
+
+
+def test_fingerprint_normalizes_literals_and_whitespace():
+    sql = "SELECT  id FROM houses\n WHERE region_id = 3 AND title LIKE '%room%' AND id IN (4, 5)"
+    assert fingerprint(sql) == "SELECT id FROM houses WHERE region_id = ? AND title LIKE ? AND id IN (...)"
+
+
+def test_different_statements_keep_different_fingerprints():
+    assert fingerprint("SELECT * FROM houses WHERE id = 1") != fingerprint("SELECT * FROM users WHERE id = 1")
+    # Identifiers with digits are not literals
+    assert 'house_images2' in fingerprint("SELECT * FROM house_images2")
+
+
+def test_registry_aggregates_per_fingerprint():
+    registry = QueryStatsRegistry()
+    key = registry.record("SELECT * FROM houses WHERE id = 1", 2.0, rows=1, route='user.house_detail')
+    assert registry.record("SELECT * FROM houses WHERE id = 2", 4.0, rows=1, route='user.house_detail') == key
+    registry.record("SELECT * FROM houses WHERE id = 3", 6.0, rows=0, route='api.house', error=True)
+    registry.add_rows(key, 5)
+    registry.record("SELECT COUNT(*) FROM users", 1.0, rows=1)
+
+    stat, other = registry.snapshot()
+    assert stat['fingerprint'] == key
+    assert (stat['calls'], stat['total_ms'], stat['avg_ms'], stat['max_ms']) == (3, 12.0, 4.0, 6.0)
+    assert (stat['p50_ms'], stat['p95_ms']) == (4.0, 6.0)
+    assert (stat['rows'], stat['errors']) == (7, 1)
+    assert stat['routes'] == {'user.house_detail': 2, 'api.house': 1}
+    assert other['routes'] == {'-': 1}
+
+
+def test_snapshot_sort_and_limit():
+    registry = QueryStatsRegistry()
+    for _ in range(3):
+        registry.record("SELECT 1", 1.0)
+    registry.record("SELECT * FROM houses", 50.0)
+    assert [s['calls'] for s in registry.snapshot(sort='calls')] == [3, 1]
+    assert [s['max_ms'] for s in registry.snapshot(sort='max_ms', limit=1)] == [50.0]
+
+
+def test_reset_clears_the_stats():
+    registry = QueryStatsRegistry()
+    registry.record("SELECT 1", 1.0)
+    registry.reset()
+    assert registry.snapshot() == []
+
+
+def test_cursors_record_into_the_registry(app):
+    from modules.database import get_db_connection
+
+    query_stats.reset()
+    with app.test_request_context('/'):
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        for house_id in (1, 2):
+            cursor.execute("SELECT title FROM houses WHERE id = %s", (house_id,))
+            cursor.fetchall()
+        cursor.close()
+    stat, = [s for s in query_stats.snapshot() if s['fingerprint'] == "SELECT title FROM houses WHERE id = ?"]
+    assert (stat['calls'], stat['rows']) == (2, 2)
+
+
+def test_admin_page_json_and_reset(client, login_as):
+    query_stats.reset()
+    query_stats.record("SELECT title FROM houses WHERE id = 7", 1.5, rows=1, route='user.house_detail')
+    login_as('admin')
+
+    response = client.get('/admin/perf/queries?sort=calls')
+    assert response.status_code == 200
+    assert b'Query Performance' in response.data
+    assert b'SELECT title FROM houses WHERE id = ?' in response.data
+
+    snapshot = client.get('/admin/perf/queries?format=json&sort=bogus').get_json()
+    assert snapshot['sort'] == 'total_ms'
+    assert snapshot['queries']
+    assert {'pools', 'replica', 'breakers', 'caches'} <= set(snapshot)
+
+    response = client.post('/admin/perf/queries/reset')
+    assert response.status_code == 302
+    assert query_stats.snapshot() == []
+
+
+def test_admin_page_is_admin_only(client, login_as):
+    login_as('tenant')
+    assert client.get('/admin/perf/queries?format=json').status_code == 302
+
+
+def main():
+    return pytest.main([__file__, '-q'])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
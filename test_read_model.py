@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Listing Read Model Tests
+Checks that listing_read_model follows the admin add/edit/delete paths, that
+a bulk rebuild repairs just the rows that drifted, that popularity scores
+come from property_performance, and that the default 'recommended' sort
+puts featured listings first, then the most popular.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import re
+
+import pytest
+
+from conftest import HOUSE_COUNT
+from modules.database import get_db_connection
+from modules.listing_events import poll_listing_changes
+from modules.read_model import (CONTACT_WEIGHT, READ_MODEL_COLUMNS, rebuild_listing_read_model,
+                                refresh_popularity)
+from modules.warmup import warm_worker
+
+FORM = {
+    'title': 'Read Model Lodge', 'description': 'Quiet rooms near the lorry station. ' * 5,
+    'region_id': '2', 'neighborhood_id': '4', 'exact_location': 'Adum',
+    'property_type': 'apartment', 'completion_status': 'completed', 'price': '950',
+    'contact_name': 'Site Admin', 'contact_phone': '0240000000', 'contact_email': 'admin@example.com',
+}
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm(app):
+    warm_worker(app)
+
+
+def _rows(app, where='', params=()):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"SELECT {', '.join(READ_MODEL_COLUMNS)} FROM listing_read_model {where} ORDER BY id",
+                       params)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+
+def test_follows_admin_writes(app, client, login_as):
+    login_as('admin')
+    assert client.post('/admin/add-house', data=FORM).status_code == 302
+    [row] = _rows(app, "WHERE title = %s", (FORM['title'],))
+    house_id = row['id']
+    try:
+        assert (row['region_name'], row['neighborhood_name']) == ('Ashanti', 'Adum')
+        assert len(row['description']) == 101
+        assert row['cover_image'] is None and row['popularity_score'] == 0
+        assert f'href="/house/{house_id}"' in client.get('/houses?region=2&sort=newest').get_data(as_text=True)
+
+        edited = dict(FORM, title='Read Model Villa', region_id='3', neighborhood_id='6', price='1200')
+        assert client.post(f'/admin/edit-house/{house_id}', data=edited).status_code == 302
+        [row] = _rows(app, "WHERE id = %s", (house_id,))
+        assert (row['title'], row['region_name'], row['neighborhood_name']) == ('Read Model Villa', 'Western', 'Takoradi')
+        assert float(row['price']) == 1200
+    finally:
+        client.post(f'/admin/delete-house/{house_id}')
+    assert _rows(app, "WHERE id = %s", (house_id,)) == []
+
+
+def test_rebuild_repairs_drifted_rows(app):
+    # Popularity moves with every tracked view, between refreshes; start in step
+    rebuild_listing_read_model()
+    poll_listing_changes(force=True)
+    before = _rows(app)
+    assert len(before) == HOUSE_COUNT
+    assert rebuild_listing_read_model() == 0
+
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("UPDATE listing_read_model SET title = %s WHERE id = 3", ('Stale title',))
+        cursor.execute("DELETE FROM listing_read_model WHERE id = 4")
+        conn.commit()
+        cursor.close()
+
+    assert rebuild_listing_read_model() == 2
+    assert _rows(app) == before
+    # Repaired rows reach the feed like any write
+    assert poll_listing_changes(force=True) == 2
+
+
+def test_popularity(app):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        refresh_popularity(cursor)
+        assert refresh_popularity(cursor) == 0                          # nothing moved since
+        [row] = _rows(app, "WHERE id = 47")
+        score = row['popularity_score']
+        cursor.execute("""
+            INSERT INTO property_performance (property_id, date, views_count, contacts_count)
+            VALUES (%s, DATE_SUB(CURRENT_DATE, INTERVAL 3 DAY), %s, %s),
+                   (%s, DATE_SUB(CURRENT_DATE, INTERVAL 90 DAY), %s, %s)
+        """, (47, 4, 2, 47, 500, 50))
+        try:
+            assert refresh_popularity(cursor) == 1
+            [row] = _rows(app, "WHERE id = 47")
+            assert row['popularity_score'] == score + 4 + 2 * CONTACT_WEIGHT     # the 90-day-old row is out
+            assert row['rank_score'] == row['popularity_score']                 # not featured
+        finally:
+            cursor.execute("DELETE FROM property_performance WHERE property_id = 47 AND date < CURRENT_DATE")
+            refresh_popularity(cursor)
+            conn.commit()
+            cursor.close()
+            poll_listing_changes(force=True)     # moved scores reach the feed like any write
+
+
+def _ids(client, url):
+    return [int(house_id) for house_id in re.findall(r'href="/house/(\d+)"', client.get(url).get_data(as_text=True))]
+
+
+def test_recommended_is_the_default_sort(app, client):
+    featured = [i + 1 for i in range(HOUSE_COUNT) if i % 7 == 0]
+    ranked = _ids(client, f'/houses?per_page={HOUSE_COUNT}')
+    assert ranked == _ids(client, f'/houses?sort=recommended&per_page={HOUSE_COUNT}')
+    assert sorted(ranked[:len(featured)]) == featured
+    assert _ids(client, '/')[0] == ranked[0]
+
+    # A burst of enquiries lifts a plain listing to the top of the rest
+    house_id = ranked[-1]
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO property_performance (property_id, date, views_count, contacts_count)
+            VALUES (%s, DATE_SUB(CURRENT_DATE, INTERVAL 1 DAY), %s, %s)
+        """, (house_id, 10, 100))
+        refresh_popularity(cursor)
+        conn.commit()
+        poll_listing_changes(force=True)
+    try:
+        assert _ids(client, f'/houses?per_page={HOUSE_COUNT}')[len(featured)] == house_id
+    finally:
+        with app.app_context():
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM property_performance WHERE property_id = %s AND date < CURRENT_DATE",
+                           (house_id,))
+            refresh_popularity(cursor)
+            conn.commit()
+            poll_listing_changes(force=True)
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
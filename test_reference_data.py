@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Reference Data Tests
+Checks /api/regions/<id>/neighborhoods and the house forms that use it, and
+that workers reload regions and neighborhoods only when their version moves.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import re
+
+import pytest
+
+from conftest import NEIGHBORHOODS
+from modules.database import get_db_connection
+from modules.reference_data import bump_reference_data_version, get_reference_version
+from modules.warmup import warm_worker
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm(app):
+    warm_worker(app)
+
+
+def _options(html, name='neighborhood_id'):
+    select = re.search(rf'<select[^>]*name="{name}".*?</select>', html, re.S).group(0)
+    return [label.strip() for value, label in re.findall(r'<option value="([^"]*)"[^>]*>([^<]*)<', select) if value]
+
+
+def test_neighborhoods_api(client):
+    response = client.get('/api/regions/2/neighborhoods')
+    assert response.status_code == 200
+    assert response.headers['X-DB-Queries'] == '0'
+    assert [n['name'] for n in response.get_json()['neighborhoods']] == sorted(NEIGHBORHOODS[2])
+
+    again = client.get('/api/regions/2/neighborhoods', headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
+    assert client.get('/api/regions/3/neighborhoods').headers['ETag'] != response.headers['ETag']
+
+    assert client.get('/api/regions/999/neighborhoods').status_code == 404
+
+
+def test_forms_only_ship_the_current_region(client, login_as):
+    login_as('admin')
+    assert _options(client.get('/admin/add-house').get_data(as_text=True)) == []
+
+    with client.application.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT region_id FROM houses WHERE id = 5")
+        region_id = cursor.fetchone()[0]
+    html = client.get('/admin/edit-house/5').get_data(as_text=True)
+    assert _options(html) == sorted(NEIGHBORHOODS[region_id])
+    assert 'js/neighborhood_picker.js' in html
+
+
+def test_reload_follows_the_version(app, client, monkeypatch):
+    monkeypatch.setenv('REFERENCE_DATA_TTL', '0')     # check the version on every use
+
+    # Unchanged version: one single-row query, no reload
+    response = client.get('/api/regions/2/neighborhoods')
+    assert response.headers['X-DB-Queries'] == '1'
+
+    with app.app_context():
+        version = get_reference_version()
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO neighborhoods (region_id, name) VALUES (%s, %s)", (2, 'Suame'))
+        neighborhood_id = cursor.lastrowid
+        conn.commit()
+
+    # Written without a bump: still the cached list
+    assert 'Suame' not in [n['name'] for n in client.get('/api/regions/2/neighborhoods').get_json()['neighborhoods']]
+
+    try:
+        with app.app_context():
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            bump_reference_data_version(cursor)
+            conn.commit()
+            assert get_reference_version() == version + 1
+        names = [n['name'] for n in client.get('/api/regions/2/neighborhoods').get_json()['neighborhoods']]
+        assert names == sorted(NEIGHBORHOODS[2] + ['Suame'])
+    finally:
+        with app.app_context():
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM neighborhoods WHERE id = %s", (neighborhood_id,))
+            bump_reference_data_version(cursor)
+            conn.commit()
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
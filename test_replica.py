@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Read Replica Tests
+Points DB_READ_PATH at a copy of the test database whose listing titles are
+marked, so every check can tell which side served a read: readonly=True reads
+go to the copy, a session that just wrote reads the primary, and a lagging or
+unreachable replica falls back to the primary.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import sqlite3
+
+import pytest
+
+from modules import database
+from modules.database import get_breaker, get_db_connection, get_replica_health, pin_reads_to_primary
+
+MARKER = 'Replica copy: '
+
+
+def _drop_replica_pool():
+    pool = database._pools.pop((os.getpid(), 'replica'), None)
+    if pool is not None:
+        pool.close_all()
+
+
+@pytest.fixture
+def replica(app, tmp_path, monkeypatch):
+    """A marked copy of the primary, configured as this worker's read replica"""
+    path = str(tmp_path / 'replica.db')
+    source, copy = sqlite3.connect(os.environ['DB_PATH']), sqlite3.connect(path)
+    source.backup(copy)
+    copy.execute("UPDATE listing_read_model SET title = ? || title", (MARKER,))
+    copy.execute("UPDATE houses SET title = ? || title", (MARKER,))
+    copy.commit()
+    source.close()
+    copy.close()
+
+    monkeypatch.setenv('DB_READ_PATH', path)
+    monkeypatch.setattr(database, '_replica_health', database.ReplicaHealth())
+    get_breaker('replica').record_success()
+    _drop_replica_pool()
+    yield path
+    _drop_replica_pool()
+    get_breaker('replica').record_success()
+
+
+def _title(app, readonly, house_id=1):
+    with app.test_request_context('/'):
+        conn = get_db_connection(readonly=readonly)
+        cursor = conn.cursor()
+        cursor.execute("SELECT title FROM houses WHERE id = %s", (house_id,))
+        title = cursor.fetchone()[0]
+        cursor.close()
+        conn.close()
+        return title
+
+
+def test_readonly_reads_go_to_the_replica(app, replica):
+    assert _title(app, readonly=True).startswith(MARKER)
+    assert not _title(app, readonly=False).startswith(MARKER)
+    assert get_replica_health()['fallbacks'] == 0
+
+
+def test_readonly_reads_without_a_replica_use_the_primary(app, monkeypatch):
+    monkeypatch.delenv('DB_READ_PATH', raising=False)
+    assert not _title(app, readonly=True).startswith(MARKER)
+
+
+def test_landlord_dashboard_reads_the_replica(client, login_as, replica):
+    login_as('landlord')
+    response = client.get('/admin/landlord-dashboard')
+    assert response.status_code == 200
+    assert MARKER.encode() in response.data
+
+
+def test_session_reads_the_primary_after_a_write(app, client, login_as, replica):
+    login_as('landlord')
+    conn = sqlite3.connect(os.environ['DB_PATH'])
+    conn.row_factory = sqlite3.Row
+    house = conn.execute("SELECT * FROM houses WHERE id = 1").fetchone()
+    conn.close()
+    form = {key: house[key] if house[key] is not None else ''
+            for key in ('title', 'description', 'region_id', 'neighborhood_id', 'exact_location',
+                        'latitude', 'longitude', 'property_type', 'completion_status', 'months_left',
+                        'price', 'contact_name', 'contact_phone', 'contact_email')}
+
+    response = client.post('/admin/landlord/edit-property/1', data=form)
+    assert response.status_code == 302
+    with client.session_transaction() as sess:
+        assert sess['_db_pin_until'] > 0
+
+    response = client.get('/admin/landlord-dashboard')
+    assert response.status_code == 200
+    assert MARKER.encode() not in response.data
+
+    # Once the pin expires the session is back on the replica
+    with client.session_transaction() as sess:
+        sess['_db_pin_until'] = 0
+    assert MARKER.encode() in client.get('/admin/landlord-dashboard').data
+
+
+def test_pin_covers_the_rest_of_the_request(app, replica):
+    with app.test_request_context('/'):
+        pin_reads_to_primary()
+        conn = get_db_connection(readonly=True)
+        cursor = conn.cursor()
+        cursor.execute("SELECT title FROM houses WHERE id = 1")
+        assert not cursor.fetchone()[0].startswith(MARKER)
+        cursor.close()
+
+
+@pytest.mark.parametrize('lag', [60.0, None])
+def test_lagging_replica_falls_back_to_the_primary(app, replica, monkeypatch, lag):
+    monkeypatch.setattr(database, '_measure_replica_lag', lambda conn: lag)
+    assert not _title(app, readonly=True).startswith(MARKER)
+    health = get_replica_health()
+    assert health['lag_seconds'] == lag
+    assert health['fallbacks'] == 1
+    assert not health['down']
+
+    # Caught up again: the next check sends reads back to the replica
+    monkeypatch.setenv('DB_READ_LAG_CHECK_INTERVAL', '0')
+    monkeypatch.setattr(database, '_measure_replica_lag', lambda conn: 0.0)
+    assert _title(app, readonly=True).startswith(MARKER)
+
+
+def test_unreachable_replica_falls_back_to_the_primary(app, replica, tmp_path, monkeypatch):
+    monkeypatch.setenv('DB_READ_PATH', str(tmp_path / 'missing' / 'replica.db'))
+    _drop_replica_pool()
+    assert not _title(app, readonly=True).startswith(MARKER)
+    assert get_replica_health()['down']
+
+    # While marked down the replica is not retried at all
+    monkeypatch.setenv('DB_READ_PATH', replica)
+    _drop_replica_pool()
+    assert not _title(app, readonly=True).startswith(MARKER)
+    assert get_replica_health()['fallbacks'] == 2
+
+
+def test_open_replica_circuit_falls_back_to_the_primary(app, replica):
+    get_breaker('replica').open()
+    assert not _title(app, readonly=True).startswith(MARKER)
+    assert get_replica_health()['fallbacks'] == 1
+
+
+def test_search_index_loads_from_the_primary(app, replica):
+    """A snapshot from a lagging replica could miss writes the feed has already passed"""
+    from modules.search_index import ListingIndex
+
+    with app.app_context():
+        index = ListingIndex()
+        index.load()
+    assert index.titles and not any(title.startswith(MARKER) for title in index.titles)
+
+
+
+def test_suggestions_load_from_the_primary(app, replica):
+    from modules.suggest import SuggestTrie
+
+    with app.app_context():
+        trie = SuggestTrie()
+        trie.load()
+    titles = [s.label for s in trie.suggestions.values() if s.kind == 'title']
+    assert titles and not any(title.startswith(MARKER) for title in titles)
+
+
+def test_fuzzy_index_loads_from_the_primary(app, replica):
+    from modules.fuzzy import FuzzyIndex
+
+    with app.app_context():
+        index = FuzzyIndex()
+        index.load()
+    assert index.counts and 'replica' not in index.counts
+
+
+def main():
+    return pytest.main([__file__, '-q'])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Request-Scoped Connection Tests
+Checks that everything in one request (or app context) shares a single
+pooled connection, that handing it back happens at teardown rather than on
+close(), and that the per-request counts reach the X-DB-* debug headers.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from modules.database import get_db_connection, get_pool, get_request_db_stats
+
+
+def _in_use():
+    return get_pool().stats()['in_use']
+
+
+def test_one_connection_per_app_context(app):
+    in_use = _in_use()
+    with app.app_context():
+        first = get_db_connection()
+        first.close()                       # a no-op: the context still holds it
+        second = get_db_connection()
+        assert second._conn is first._conn
+        assert _in_use() == in_use + 1
+        assert get_request_db_stats() == {'checkouts': 1, 'handles': 2, 'queries': 0}
+    assert _in_use() == in_use              # returned at teardown
+
+
+def test_cursors_are_buffered_for_nested_helpers(app):
+    with app.app_context():
+        outer = get_db_connection().cursor()
+        outer.execute("SELECT id FROM houses ORDER BY id LIMIT 3")
+        # A helper runs its own statement before the caller has read its rows
+        inner = get_db_connection().cursor()
+        inner.execute("SELECT COUNT(*) FROM users")
+        assert inner.fetchone()[0] == 3
+        assert [row[0] for row in outer.fetchall()] == [1, 2, 3]
+        assert get_request_db_stats()['queries'] == 2
+
+
+def test_outside_an_app_context_close_returns_the_connection():
+    in_use = _in_use()
+    conn = get_db_connection()
+    assert _in_use() == in_use + 1
+    conn.close()
+    assert _in_use() == in_use
+    assert get_request_db_stats() == {'checkouts': 0, 'handles': 0, 'queries': 0}
+
+
+def test_debug_headers_count_the_request(client, login_as):
+    login_as('tenant')
+    response = client.get('/profile')
+    assert response.status_code == 200
+    assert response.headers['X-DB-Connections'] == '1'
+    assert int(response.headers['X-DB-Handles']) >= 1
+    assert int(response.headers['X-DB-Queries']) >= 1
+
+    assert client.get('/login').headers['X-DB-Connections'] == '0'
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
@@ -65,7 +65,7 @@ def test_search_functionality():
         # Test regions
         cursor.execute("SELECT id, name FROM regions LIMIT 5")
         regions = cursor.fetchall()
-        print(f"\nAvailable regions: {[f\"{r['id']}: {r['name']}\" for r in regions]}")
+        print(f"\nAvailable regions: {[str(r['id']) + ': ' + r['name'] for r in regions]}")
         
         # Test each search case
         for i, test_case in enumerate(test_cases, 1):
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Search Index Tests
+Checks that the in-memory listing index returns what the SQL path returns,
+follows writes made by other workers through the listing_changes feed, and
+reports its memory use.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from conftest import HOUSE_COUNT
+from modules.database import get_db_connection
+from modules.listing_events import poll_listing_changes
+from modules.search_index import get_listing_index, get_search_index_stats
+from modules.warmup import warm_worker
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm(app):
+    warm_worker(app)
+
+
+def _sql_ids(app, where, params, order):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT h.id FROM listing_read_model h WHERE 1=1{where} ORDER BY {order} LIMIT 60", params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+@pytest.mark.parametrize('filters, where, params', [
+    ({}, '', []),
+    ({'region_id': 2}, ' AND h.region_id = %s', [2]),
+    ({'property_type': 'apartment'}, ' AND h.property_type = %s', ['apartment']),
+    ({'min_price': 1000, 'max_price': 2500}, ' AND h.price >= %s AND h.price <= %s', [1000, 2500]),
+])
+@pytest.mark.parametrize('sort, order', [
+    ('recommended', 'h.rank_score DESC, h.id DESC'),
+    ('newest', 'h.created_at DESC, h.id DESC'),
+    ('price_low', 'h.price ASC, h.id ASC'),
+    ('price_high', 'h.price DESC, h.id DESC'),
+    ('name', 'h.title ASC, h.id ASC'),
+])
+def test_index_matches_sql(app, filters, where, params, sort, order):
+    with app.app_context():
+        page = get_listing_index().search(filters, sort=sort, size=60)
+    assert [row['id'] for row in page.items] == _sql_ids(app, where, params, order)
+
+
+def test_index_follows_other_workers_writes(app):
+    """A change logged without notifying this worker arrives with the next poll"""
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("UPDATE houses SET price = %s WHERE id = 5", (99999,))
+        cursor.execute("INSERT INTO listing_changes (house_id, op) VALUES (%s, %s)", (5, 'upsert'))
+        conn.commit()
+        try:
+            assert poll_listing_changes(force=True) == 1
+            page = get_listing_index().search({'min_price': 50000}, sort='price_high', size=5)
+            assert [row['id'] for row in page.items] == [5]
+        finally:
+            cursor.execute("UPDATE houses SET price = %s WHERE id = 5", (300 + 4 * 37,))
+            cursor.execute("INSERT INTO listing_changes (house_id, op) VALUES (%s, %s)", (5, 'upsert'))
+            conn.commit()
+            poll_listing_changes(force=True)
+            assert get_listing_index().search({'min_price': 50000}).items == []
+
+
+def test_filters_start_from_the_smallest_posting(app):
+    with app.app_context():
+        index = get_listing_index()
+        scanned = index.scanned
+        page = index.search({'region_id': 2, 'property_type': 'apartment'}, sort='price_low', size=60)
+        matches = [row['id'] for row in page.items]
+        assert matches == _sql_ids(app, ' AND h.region_id = %s AND h.property_type = %s', [2, 'apartment'],
+                                   'h.price ASC, h.id ASC')
+        # One type's posting is checked, then only the matches are walked
+        assert index.scanned - scanned == len(index.type_postings[index._type_codes['apartment']]) + len(matches)
+        assert index.scanned - scanned < HOUSE_COUNT
+
+
+def test_writes_move_slots_within_the_sort_orders(app):
+    with app.app_context():
+        index = get_listing_index()
+        for sort in ('recommended', 'price_low', 'name'):
+            index.search({}, sort=sort)
+        orders = {sort: index._orders[sort] for sort in ('recommended', 'price_low', 'name')}
+
+        row = {'id': 7, 'title': 'Aaa first by name', 'description': '', 'price': 1,
+               'region_id': 3, 'property_type': 'house', 'created_at': None, 'rank_score': 10 ** 12}
+        with index._lock:
+            index._put(row)
+        try:
+            for sort, order in orders.items():
+                # Same lists, updated in place rather than rebuilt
+                assert index._orders[sort] is order
+                slots, keys = order
+                assert keys == sorted(keys)
+                assert slots[0] == index._slot[7]
+                assert len(slots) == index.live == HOUSE_COUNT
+            assert index._slot[7] in index.region_postings[3]
+            assert all(index._slot[7] not in index.region_postings[region] for region in (1, 2))
+        finally:
+            index.load()
+
+
+def test_name_sort_ignores_case(app):
+    from modules.listing_cache import _sort_key
+    from modules.search_index import ListingIndex
+
+    with app.app_context():
+        index = ListingIndex()
+        index.load()
+    for house_id, title in ((7, 'bungalow by the lagoon'), (8, 'APARTMENT block'), (9, 'apartment Annex')):
+        row = {'id': house_id, 'title': title, 'description': '', 'price': 500, 'region_id': 1,
+               'property_type': 'house', 'created_at': None, 'rank_score': 0}
+        index._put(row)
+
+    pages, cursor = [], ''
+    while True:
+        page = index.search({}, sort='name', cursor_token=cursor, size=7)
+        pages.extend(page.items)
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+    keys = [_sort_key('name', row['title'], row['id']) for row in pages]
+    assert len(pages) == HOUSE_COUNT
+    assert keys == sorted(keys)        # the same order the listing cache bounds pages by
+    titles = [row['title'] for row in pages]
+    assert titles[:2] == ['apartment Annex', 'APARTMENT block']
+    assert titles.index('bungalow by the lagoon') == sum(title.casefold() < 'bungalow' for title in titles)
+
+
+def test_memory_report(app):
+    with app.app_context():
+        get_listing_index()
+    report = get_search_index_stats()
+    assert report['live_listings'] == HOUSE_COUNT
+    assert report['tokens'] > 0
+    assert set(report['bytes']) == {'columns', 'postings', 'titles', 'row_tokens', 'id_lookup', 'sort_orders'}
+    assert report['total_bytes'] == sum(report['bytes'].values())
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+SQLite Dialect Shim Tests
+Checks that the MySQL constructs used by the app are rewritten for SQLite
+and behave the same way on a real (in-memory) SQLite database
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import datetime
+import pytest
+from mysql.connector import errors
+
+from modules.sqlite_backend import SQLiteConnection, translate, translate_ddl
+from modules.schema import TABLES
+
+
+def test_placeholders_outside_string_literals():
+    sql = translate("SELECT DATE_FORMAT(date, '%Y-%m') FROM t WHERE a = %s AND b LIKE '%s'")
+    assert sql == "SELECT DATE_FORMAT(date, '%Y-%m') FROM t WHERE a = ? AND b LIKE '%s'"
+
+
+def test_date_arithmetic():
+    assert translate("WHERE d >= DATE_SUB(CURRENT_DATE, INTERVAL 30 DAY)") == \
+        "WHERE d >= date('now', 'localtime', '-30 days')"
+    assert translate("WHERE t >= DATE_SUB(NOW(), INTERVAL 2 WEEK)") == \
+        "WHERE t >= datetime('now', 'localtime', '-14 days')"
+    assert translate("WHERE t >= DATE_SUB(NOW(), INTERVAL %s HOUR)") == \
+        "WHERE t >= datetime('now', 'localtime', '-' || ? || ' hours')"
+
+
+def test_upsert():
+    sql = translate("""
+        INSERT INTO t (k, n) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE n = n + VALUES(n), label = 'VALUES(n)'
+    """)
+    assert "ON CONFLICT DO UPDATE SET n = n + excluded.n, label = 'VALUES(n)'" in sql
+    assert "VALUES (?, ?)" in sql
+
+
+def test_ddl_moves_inline_indexes():
+    statements = translate_ddl(TABLES['property_views'])
+    assert 'INTEGER PRIMARY KEY AUTOINCREMENT' in statements[0]
+    assert 'INDEX' not in statements[0]
+    assert "CREATE INDEX IF NOT EXISTS property_views_idx_user_id ON property_views (user_id)" in statements
+
+
+@pytest.fixture
+def conn():
+    conn = SQLiteConnection(':memory:')
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS counters (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(50) NOT NULL,
+            day DATE NOT NULL,
+            hits INT DEFAULT 0,
+            amount DECIMAL(10,2) DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY unique_name_day (name, day)
+        )
+    """)
+    yield conn
+    conn.close()
+
+
+def test_upsert_and_dictionary_rows(conn):
+    cursor = conn.cursor(dictionary=True)
+    for _ in range(3):
+        cursor.execute("""
+            INSERT INTO counters (name, day, hits, amount) VALUES (%s, %s, 1, %s)
+            ON DUPLICATE KEY UPDATE hits = hits + VALUES(hits)
+        """, ('home', datetime.date.today(), 12.5))
+    cursor.execute("SELECT * FROM counters WHERE created_at >= DATE_SUB(NOW(), INTERVAL 1 DAY)")
+    row = cursor.fetchone()
+
+    assert row['hits'] == 3
+    assert row['day'] == datetime.date.today()
+    assert isinstance(row['created_at'], datetime.datetime)
+    assert str(row['amount']) == '12.5'
+
+
+def test_mysql_functions_and_errors(conn):
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO counters (name, day) VALUES (%s, %s)", ('a', '2024-03-05'))
+    cursor.execute("SELECT MONTH(day), YEAR(day), DATE_FORMAT(day, '%Y-%m') FROM counters")
+    assert cursor.fetchone() == (3, 2024, '2024-03')
+
+    with pytest.raises(errors.IntegrityError):
+        cursor.execute("INSERT INTO counters (name, day) VALUES (%s, %s)", ('a', '2024-03-05'))
+    with pytest.raises(errors.ProgrammingError):
+        cursor.execute("SELECT * FROM missing_table")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-q']))
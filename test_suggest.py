@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Autocomplete Tests
+Checks /api/suggest against the seeded listings: completions of titles,
+places and keywords ranked by listing count, answered from memory, and kept
+current as listings change.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from conftest import HOUSE_COUNT, NEIGHBORHOODS, PROPERTY_TYPES
+from modules.database import get_db_connection
+from modules.listing_events import record_listing_change
+from modules.suggest import get_suggest_trie
+from modules.warmup import warm_worker
+
+NEIGHBORHOOD_NAMES = [name for names in NEIGHBORHOODS.values() for name in names]
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm(app):
+    warm_worker(app)
+
+
+def _suggest(client, prefix, budget=0, **params):
+    response = client.get('/api/suggest', query_string={'q': prefix, **params})
+    assert response.status_code == 200
+    assert int(response.headers['X-DB-Queries']) <= budget
+    return response.get_json()['suggestions']
+
+
+def test_places_and_types_with_counts(client):
+    legon = _suggest(client, 'leg')[0]
+    assert (legon['text'], legon['kind']) == ('East Legon', 'neighborhood')
+    assert legon['count'] == sum(1 for i in range(HOUSE_COUNT)
+                                 if NEIGHBORHOOD_NAMES[i % len(NEIGHBORHOOD_NAMES)] == 'East Legon')
+
+    apartments = sum(1 for i in range(HOUSE_COUNT) if PROPERTY_TYPES[i % len(PROPERTY_TYPES)] == 'apartment')
+    for prefix in ('apa', 'Flat'):          # the label, or a PROPERTY_TYPE_MAPPING keyword
+        top = _suggest(client, prefix)[0]
+        assert (top['text'], top['kind'], top['value'], top['count']) == \
+            ('Apartment', 'property_type', 'apartment', apartments)
+
+    assert _suggest(client, 'kuma')[0]['text'] == 'Ashanti'     # REGION_MAPPING alias
+    assert _suggest(client, 'tem')[0]['kind'] == 'keyword'       # no such region seeded
+
+
+def test_ranked_and_limited(client):
+    suggestions = _suggest(client, 'a', limit=5)
+    assert len(suggestions) == 5
+    counts = [s['count'] for s in suggestions]
+    assert counts == sorted(counts, reverse=True)
+    assert _suggest(client, 'qqqq') == []
+    assert _suggest(client, '') == []
+
+    titles = _suggest(client, 'apartment in osu', limit=20)
+    assert titles and all(s['kind'] == 'title' and s['text'].startswith('Apartment in Osu') for s in titles)
+    # Longer than the trie's keys
+    assert [s['text'] for s in _suggest(client, 'well kept apartment in osu #4')] == []
+    long_prefix = _suggest(client, titles[0]['text'].lower())
+    assert titles[0]['text'] in [s['text'] for s in long_prefix]
+
+
+def test_follows_listing_writes(app, client):
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT title FROM houses WHERE id = 9")
+        title = cursor.fetchone()[0]
+        cursor.execute("UPDATE houses SET title = %s WHERE id = 9", ('Zebra Crossing Lodge',))
+        record_listing_change(cursor, 9)
+        conn.commit()
+
+    lodge = _suggest(client, 'cross', budget=1)     # re-reads just house 9
+    assert [(s['text'], s['count']) for s in lodge] == [('Zebra Crossing Lodge', 1)]
+    assert title not in [s['text'] for s in _suggest(client, title, limit=20)]
+
+    with app.app_context():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("UPDATE houses SET title = %s WHERE id = 9", (title,))
+        record_listing_change(cursor, 9)
+        conn.commit()
+
+    assert _suggest(client, 'zebra', budget=1) == []
+    assert title in [s['text'] for s in _suggest(client, title, limit=20)]
+
+
+def test_lookup_walks_only_the_typed_prefix(app):
+    with app.app_context():
+        trie = get_suggest_trie()
+    prefixes = ['a', 'ap', 'apartment in', 'os', 'leg', 'single room in madina', 'kum', 'x']
+    for prefix in prefixes:
+        trie.suggest(prefix)                # first lookups fill the node caches
+    visited, ranked, nodes = trie.visited, trie.ranked, trie.nodes
+    for prefix in prefixes:
+        trie.suggest(prefix)
+    # At most one node per typed character plus the root, whatever the trie's size
+    assert trie.visited - visited <= sum(len(prefix) + 1 for prefix in prefixes)
+    assert trie.visited - visited < nodes
+    assert trie.ranked == ranked            # answered from the cached rankings
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Worker Warmup Tests
+Checks what a gunicorn worker does before it accepts traffic (modules/warmup.py)
+and that gunicorn.conf.py picks its settings up from config.
+"""
+
+import sys
+import os
+import runpy
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from modules import database
+from modules.warmup import warm_worker
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_warm_worker(app):
+    app.jinja_env.cache.clear()
+    report = warm_worker(app)
+
+    assert 'primary' in report['connections']
+    assert database.get_pool().stats()['idle'] >= 1
+    assert report['reference_data']['regions'] > 0
+    assert report['reference_data']['neighborhoods'] > 0
+    assert report['template_errors'] == []
+    assert report['templates'] == len(app.jinja_env.list_templates(extensions=['html']))
+    assert len(app.jinja_env.cache) >= report['templates']
+
+
+def test_pools_are_created_with_the_app_config(app, monkeypatch):
+    for name, value in (('DB_POOL_SIZE', 10), ('DB_POOL_TIMEOUT', 3)):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.setitem(app.config, name, value)
+    key = (os.getpid(), 'primary')
+    previous = database._pools.pop(key)
+    try:
+        warm_worker(app)
+        pool = database._pools[key]
+        assert pool.stats()['size'] == 10
+        assert pool.timeout == 3
+    finally:
+        database._pools.pop(key).close_all()
+        database._pools[key] = previous
+
+
+def test_warm_forms_need_no_reference_queries(app, client, login_as):
+    warm_worker(app)
+    login_as('admin')
+    response = client.get('/admin/add-house')
+
+    assert response.status_code == 200
+    assert response.headers['X-DB-Queries'] == '0'
+
+
+def test_discard_inherited_pools_keeps_parent_sockets_open(app):
+    closed = []
+
+    class ParentPool:
+        def close_all(self):
+            closed.append(True)
+
+    parent_key = (os.getpid() + 1, 'primary')
+    database._pools[parent_key] = ParentPool()
+    database.discard_inherited_pools()
+
+    assert parent_key not in database._pools
+    assert closed == []
+
+
+def test_gunicorn_config_reads_server_settings(monkeypatch):
+    monkeypatch.setenv('PORT', '8123')
+    config = runpy.run_path(os.path.join(ROOT, 'gunicorn.conf.py'))
+
+    assert config['bind'] == '0.0.0.0:8123'
+    assert config['wsgi_app'] == 'wsgi:application'
+    assert config['worker_class'] == config['ServerConfig'].GUNICORN_WORKER_CLASS
+    assert config['threads'] == config['ServerConfig'].GUNICORN_THREADS
+    for hook in ('when_ready', 'post_fork', 'post_worker_init', 'worker_exit'):
+        assert callable(config[hook])
+
+
+def main():
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+if __name__ == "__main__":
+    main()